@@ -1,10 +1,72 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin as DjangoUserAdmin
+from django.core.paginator import Paginator
+from django.db import DatabaseError, connections
+from django.utils.functional import cached_property
 from django.utils.translation import gettext_lazy as _
+from .lookup import search_users
 from .models import User
 from .models import Project, Contributor, Issue, Comment
 
 
+def get_estimated_count(model, using):
+    """
+    Return the row count of the model table estimated by the database
+    statistics, or None if the database has no estimate.
+    """
+    connection = connections[using]
+    table = model._meta.db_table
+    try:
+        with connection.cursor() as cursor:
+            if connection.vendor == "postgresql":
+                cursor.execute(
+                    "SELECT reltuples::bigint FROM pg_class "
+                    "WHERE relname = %s",
+                    [table],
+                )
+                row = cursor.fetchone()
+                return row[0] if row and row[0] >= 0 else None
+            if connection.vendor == "sqlite":
+                # Filled by ANALYZE, the first number is the table row count.
+                cursor.execute(
+                    "SELECT stat FROM sqlite_stat1 WHERE tbl = %s LIMIT 1",
+                    [table],
+                )
+                row = cursor.fetchone()
+                return int(row[0].split()[0]) if row else None
+    except DatabaseError:
+        return None
+
+    return None
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginator using the estimated row count of huge unfiltered tables instead
+    of a full COUNT(*).
+    """
+
+    threshold = 100000
+
+    @cached_property
+    def count(self):
+        """Return the total number of objects, estimated on huge tables."""
+        queryset = self.object_list
+        if not queryset.query.where:
+            estimate = get_estimated_count(queryset.model, queryset.db)
+            if estimate is not None and estimate > self.threshold:
+                return estimate
+
+        return super().count
+
+
+class LargeTableAdmin(admin.ModelAdmin):
+    """Base admin model for tables too big to count or list in full."""
+
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+
 @admin.register(User)
 class UserAdmin(DjangoUserAdmin):
     """Define admin model for custom User model with no email field."""
@@ -45,8 +107,60 @@ class UserAdmin(DjangoUserAdmin):
     search_fields = ("email", "first_name", "last_name")
     ordering = ("email",)
 
+    def get_search_results(self, request, queryset, search_term):
+        """Search the users on the prefix index of their lookup terms."""
+        if not search_term.strip():
+            return queryset, False
+
+        return search_users(queryset, search_term), False
+
+
+@admin.register(Project)
+class ProjectAdmin(admin.ModelAdmin):
+    """Define admin model for Project model."""
+
+    list_display = ("id", "title", "type", "author_user", "is_deleted")
+    list_select_related = ("author_user",)
+    list_filter = ("type", "is_deleted")
+    autocomplete_fields = ("author_user",)
+    search_fields = ("title",)
+
+
+@admin.register(Contributor)
+class ContributorAdmin(LargeTableAdmin):
+    """Define admin model for Contributor model."""
+
+    list_display = ("id", "user", "project", "permission", "role")
+    list_select_related = ("user", "project")
+    list_filter = ("permission",)
+    autocomplete_fields = ("user", "project")
+
+
+@admin.register(Issue)
+class IssueAdmin(LargeTableAdmin):
+    """Define admin model for Issue model."""
+
+    list_display = (
+        "id",
+        "title",
+        "project",
+        "tag",
+        "priority",
+        "status",
+        "author_user",
+        "assignee_user",
+        "created_time",
+    )
+    list_select_related = ("project", "author_user", "assignee_user")
+    list_filter = ("status", "priority", "tag")
+    autocomplete_fields = ("project", "author_user", "assignee_user")
+
+
+@admin.register(Comment)
+class CommentAdmin(LargeTableAdmin):
+    """Define admin model for Comment model."""
 
-admin.site.register(Project)
-admin.site.register(Contributor)
-admin.site.register(Issue)
-admin.site.register(Comment)
+    list_display = ("id", "issue", "author_user", "created_time")
+    list_select_related = ("issue__project", "author_user")
+    raw_id_fields = ("issue",)
+    autocomplete_fields = ("author_user",)
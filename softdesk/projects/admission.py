@@ -0,0 +1,139 @@
+"""
+Provides the admission control of the API.
+
+Requests are sorted into route classes (authentication, reads, writes,
+exports), each with its own number of requests run at once. A request
+waits for a free slot at most the timeout of its class, and is rejected at
+once with a 503 response when too many requests already wait, so cheap
+routes keep answering while heavy ones saturate their own class.
+"""
+import re
+import threading
+from django.http import JsonResponse
+from .conf import get_setting
+
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+
+
+class RouteClassLimiter:
+    """Bounded number of running requests of a route class."""
+
+    def __init__(self, limit, queue, timeout):
+        self.limit = limit
+        self.queue = queue
+        self.timeout = timeout
+        self.running = 0
+        self.waiting = 0
+        self.admitted = 0
+        self.shed = 0
+        self._condition = threading.Condition()
+
+    def acquire(self):
+        """Wait for a free slot, return False if the request is shed."""
+        with self._condition:
+            if self.running >= self.limit:
+                if self.waiting >= self.queue:
+                    self.shed += 1
+                    return False
+                self.waiting += 1
+                try:
+                    has_slot = self._condition.wait_for(
+                        lambda: self.running < self.limit, self.timeout
+                    )
+                finally:
+                    self.waiting -= 1
+                if not has_slot:
+                    self.shed += 1
+                    return False
+            self.running += 1
+            self.admitted += 1
+
+            return True
+
+    def release(self):
+        with self._condition:
+            self.running -= 1
+            self._condition.notify()
+
+    def get_metrics(self):
+        """Return the limits and counters of the route class."""
+        with self._condition:
+            return {
+                "limit": self.limit,
+                "queue": self.queue,
+                "timeout": self.timeout,
+                "running": self.running,
+                "waiting": self.waiting,
+                "admitted": self.admitted,
+                "shed": self.shed,
+            }
+
+
+class AdmissionController:
+    """Route classes of the requests and their limiters."""
+
+    def __init__(self, routes, classes):
+        self.routes = [
+            (re.compile(pattern), route_class)
+            for pattern, route_class in routes
+        ]
+        self.limiters = {
+            route_class: RouteClassLimiter(
+                limits["LIMIT"], limits["QUEUE"], limits["TIMEOUT"]
+            )
+            for route_class, limits in classes.items()
+        }
+
+    def get_route_class(self, request):
+        """Return the route class of the request."""
+        for pattern, route_class in self.routes:
+            if pattern.match(request.path_info):
+                return route_class
+        if request.method in SAFE_METHODS:
+            return "read"
+        return "write"
+
+    def get_metrics(self):
+        """Return the metrics of every route class."""
+        return {
+            route_class: limiter.get_metrics()
+            for route_class, limiter in self.limiters.items()
+        }
+
+
+admission_controller = AdmissionController(
+    get_setting("ADMISSION_CONTROL", "ROUTES"),
+    get_setting("ADMISSION_CONTROL", "CLASSES"),
+)
+
+
+class AdmissionControlMiddleware:
+    """Middleware running or shedding each request in its route class."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.enabled = get_setting("ADMISSION_CONTROL", "ENABLED")
+
+    def __call__(self, request):
+        if not self.enabled:
+            return self.get_response(request)
+        route_class = admission_controller.get_route_class(request)
+        limiter = admission_controller.limiters.get(route_class)
+        if limiter is None:
+            return self.get_response(request)
+        if not limiter.acquire():
+            response = JsonResponse(
+                {
+                    "detail": "Le serveur est surchargé, "
+                    "veuillez réessayer plus tard."
+                },
+                status=503,
+            )
+            response["Retry-After"] = get_setting(
+                "ADMISSION_CONTROL", "RETRY_AFTER"
+            )
+            return response
+        try:
+            return self.get_response(request)
+        finally:
+            limiter.release()
@@ -0,0 +1,129 @@
+"""
+Provides the archive of the finished issues.
+
+Issues finished and without any activity (status change or comment) for
+AGE_DAYS days are moved with their comments from the issue and comment
+tables to the ArchivedIssue and ArchivedComment tables of their database,
+in batches each moved by set-based statements in its own transaction. The
+hot tables only keep the active work, the archived rows are still served
+by the detail routes and the "archived" filter of the lists.
+"""
+from datetime import timedelta
+from django.db import connections, transaction
+from django.db.models import Exists, OuterRef
+from django.utils import timezone
+from .conf import get_setting
+from .models import (
+    Issue,
+    Comment,
+    ArchivedIssue,
+    ArchivedComment,
+    IssueStatusChange,
+)
+from .sharding import get_project_databases
+
+
+def get_archivable_issues(cutoff):
+    """Return the finished issues without any activity since the cutoff."""
+    return (
+        Issue.objects.filter(status=Issue.DONE, created_time__lt=cutoff)
+        .exclude(
+            Exists(
+                IssueStatusChange.objects.filter(
+                    issue_id=OuterRef("id"), created_time__gte=cutoff
+                )
+            )
+        )
+        .exclude(
+            Exists(
+                Comment.objects.filter(
+                    issue_id=OuterRef("id"), created_time__gte=cutoff
+                )
+            )
+        )
+    )
+
+
+def get_where(cursor, column, ids):
+    """Return the clause selecting the rows whose column is one of the ids."""
+    column = cursor.db.ops.quote_name(column)
+    return f"{column} IN ({', '.join(['%s'] * len(ids))})"
+
+
+def copy_to_archive(cursor, model, archived_model, column, ids, extra=None):
+    """
+    Copy the rows of the model whose column is one of the ids into the
+    table of the archived model, the extra columns taking the given values.
+    """
+    extra = extra or {}
+    quote_name = cursor.db.ops.quote_name
+    columns = [
+        quote_name(field.column)
+        for field in archived_model._meta.concrete_fields
+        if field.column not in extra
+    ]
+    insert_columns = columns + [quote_name(name) for name in extra]
+    select_columns = columns + ["%s"] * len(extra)
+    cursor.execute(
+        f"INSERT INTO {quote_name(archived_model._meta.db_table)} "
+        f"({', '.join(insert_columns)}) "
+        f"SELECT {', '.join(select_columns)} "
+        f"FROM {quote_name(model._meta.db_table)} "
+        f"WHERE {get_where(cursor, column, ids)}",
+        [*extra.values(), *ids],
+    )
+
+
+def delete_rows(cursor, model, column, ids):
+    """Delete the rows of the model whose column is one of the ids."""
+    cursor.execute(
+        f"DELETE FROM {cursor.db.ops.quote_name(model._meta.db_table)} "
+        f"WHERE {get_where(cursor, column, ids)}",
+        ids,
+    )
+
+
+def archive_issues(age_days=None, batch_size=None, using=None):
+    """
+    Move the archivable issues and their comments to the archive tables of
+    the given database or of every project database, return the number of
+    archived issues.
+    """
+    age_days = age_days or get_setting("ISSUE_ARCHIVE", "AGE_DAYS")
+    batch_size = batch_size or get_setting("ISSUE_ARCHIVE", "BATCH_SIZE")
+    cutoff = timezone.now() - timedelta(days=age_days)
+    databases = [using] if using else get_project_databases()
+    total = 0
+    for database in databases:
+        connection = connections[database]
+        archived_time = connection.ops.adapt_datetimefield_value(
+            timezone.now()
+        )
+        while True:
+            with transaction.atomic(using=database):
+                ids = list(
+                    get_archivable_issues(cutoff)
+                    .using(database)
+                    .select_for_update()
+                    .order_by("id")
+                    .values_list("id", flat=True)[:batch_size]
+                )
+                if not ids:
+                    break
+                with connection.cursor() as cursor:
+                    copy_to_archive(
+                        cursor,
+                        Issue,
+                        ArchivedIssue,
+                        "id",
+                        ids,
+                        {"archived_time": archived_time},
+                    )
+                    copy_to_archive(
+                        cursor, Comment, ArchivedComment, "issue_id", ids
+                    )
+                    delete_rows(cursor, Comment, "issue_id", ids)
+                    delete_rows(cursor, Issue, "id", ids)
+            total += len(ids)
+
+    return total
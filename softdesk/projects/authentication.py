@@ -0,0 +1,17 @@
+"""
+Provides the authentication of the API requests.
+"""
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+from .revocation import revocation_filter
+
+
+class RevocableJWTAuthentication(JWTAuthentication):
+    """JSON web token authentication rejecting the revoked tokens."""
+
+    def get_validated_token(self, raw_token):
+        validated_token = super().get_validated_token(raw_token)
+        if revocation_filter.is_revoked(validated_token):
+            raise InvalidToken("Le jeton a été révoqué.")
+
+        return validated_token
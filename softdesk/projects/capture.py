@@ -0,0 +1,136 @@
+"""
+Provides the capture of the API traffic for the "replay_traffic" command.
+
+When enabled, the shape of a sample of the requests is appended to a JSON
+lines log: route, method, URL ids, allowed query parameters, body fields
+without their free text values, body size, role of the user in the
+project, response status and duration. Emails, passwords, texts and
+tokens are never written.
+"""
+import json
+import random
+import threading
+import time
+from django.http import QueryDict
+from .conf import get_setting
+
+ROLES = {1: "responsible", 2: "contributor"}
+
+
+def get_project_id(route, kwargs):
+    """Return the project id of the URL of the route, or None."""
+    if route.startswith("project-"):
+        return kwargs.get("pk")
+    return kwargs.get("project_pk")
+
+
+def get_role(request, project_id):
+    """Return the role of the user of the request, without any query."""
+    user = getattr(request, "user", None)
+    if user is None or not user.is_authenticated:
+        return "anonymous"
+    if user.is_superuser:
+        return "superuser"
+    if project_id is None:
+        return "user"
+    try:
+        contributor = request.membership_cache[int(project_id)]
+    except (AttributeError, KeyError, ValueError):
+        return "user"
+    if contributor is None:
+        return "outsider"
+
+    return ROLES[contributor.permission]
+
+
+def get_body_shape(request):
+    """
+    Return the fields of the request body, with the value of the allowed
+    fields and the length of the other ones.
+    """
+    content_type = request.content_type
+    if content_type == "application/json":
+        try:
+            data = json.loads(request.body or b"{}")
+        except ValueError:
+            return None
+    elif content_type == "application/x-www-form-urlencoded":
+        data = QueryDict(request.body).dict()
+    elif content_type == "multipart/form-data" and request.method == "POST":
+        # Parsed by Django, the REST framework reuses it.
+        data = request.POST.dict()
+    else:
+        return None
+    if not isinstance(data, dict):
+        return None
+    allowed_fields = get_setting("TRAFFIC_CAPTURE", "BODY_FIELDS")
+
+    return {
+        name: value if name in allowed_fields else len(str(value))
+        for name, value in data.items()
+    }
+
+
+class TrafficLog:
+    """Append-only JSON lines log shared by the threads of the process."""
+
+    def __init__(self, path):
+        self.path = path
+        self._file = None
+        self._lock = threading.Lock()
+
+    def write(self, record):
+        line = json.dumps(record, ensure_ascii=False, separators=(",", ":"))
+        with self._lock:
+            if self._file is None:
+                self._file = open(self.path, "a", encoding="utf-8")
+            self._file.write(line + "\n")
+            self._file.flush()
+
+
+class TrafficCaptureMiddleware:
+    """Middleware writing the shape of sampled requests to the traffic log."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.enabled = get_setting("TRAFFIC_CAPTURE", "ENABLED")
+        self.sample_rate = get_setting("TRAFFIC_CAPTURE", "SAMPLE_RATE")
+        self.log = TrafficLog(get_setting("TRAFFIC_CAPTURE", "PATH"))
+
+    def __call__(self, request):
+        if not self.enabled or random.random() >= self.sample_rate:
+            return self.get_response(request)
+        # Read before the views, which consume the request stream.
+        body = get_body_shape(request)
+        started_at = time.time()
+        start = time.perf_counter()
+        response = self.get_response(request)
+        duration = time.perf_counter() - start
+
+        # The admin site is left out, it isn't replayed.
+        match = request.resolver_match
+        if match is None or not match.url_name or "admin" in match.namespaces:
+            return response
+        allowed_params = get_setting("TRAFFIC_CAPTURE", "QUERY_PARAMS")
+        self.log.write(
+            {
+                "at": round(started_at, 3),
+                "route": match.view_name,
+                "method": request.method,
+                "kwargs": match.kwargs,
+                "query": {
+                    name: value
+                    for name, value in request.GET.items()
+                    if name in allowed_params
+                },
+                "body": body,
+                "size": int(request.META.get("CONTENT_LENGTH") or 0),
+                "role": get_role(
+                    request, get_project_id(match.view_name, match.kwargs)
+                ),
+                "status": response.status_code,
+                "duration": round(duration, 6),
+            }
+        )
+
+        return response
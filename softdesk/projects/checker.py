@@ -1,9 +1,42 @@
 """
 Provides checker functions for the "projects" application.
 """
+from contextlib import contextmanager, nullcontext
+from django.db import IntegrityError, transaction
 from rest_framework import serializers
-from rest_framework.exceptions import NotFound
-from .models import Project, Contributor, Issue, Comment, User
+from rest_framework.exceptions import NotFound, PermissionDenied
+from .models import (
+    Project,
+    Contributor,
+    Issue,
+    Comment,
+    User,
+    ArchivedIssue,
+    ArchivedComment,
+)
+
+
+@contextmanager
+def explain_integrity_error(*checks, using=None):
+    """
+    Run the block, and if the database rejects its write or its values run
+    the checks, which raise the error matching the violated rule.
+
+    The rules are enforced by the database in the write statement itself,
+    so the checks only cost queries when the write fails. Within a
+    transaction, the write of the block to the database is isolated in a
+    savepoint, for the checks to query once it failed.
+    """
+    block = nullcontext()
+    if transaction.get_connection(using).in_atomic_block:
+        block = transaction.atomic(using=using)
+    try:
+        with block:
+            yield
+    except (IntegrityError, ValueError):
+        for check in checks:
+            check()
+        raise
 
 
 def check_and_get_contributor_id(project_id, user_id):
@@ -28,7 +61,9 @@ def check_project_exist_in_db(project_id):
     """Raise exception if project object not found in database."""
     try:
         project_id = int(project_id)
-        if project_id not in Project.objects.values_list("id", flat=True):
+        if not Project.objects.filter(
+            id=project_id, is_deleted=False
+        ).exists():
             raise NotFound("Le numéro de projet indiqué n'existe pas.")
     except ValueError:
         raise NotFound("Le numéro de projet indiqué n'est pas un numéro.")
@@ -38,7 +73,7 @@ def check_issue_exist_in_db(issue_id):
     """Raise exception if issue object not found in database."""
     try:
         issue_id = int(issue_id)
-        if issue_id not in Issue.objects.values_list("id", flat=True):
+        if not Issue.objects.filter(id=issue_id).exists():
             raise NotFound("Le numéro de problème indiqué n'existe pas.")
     except ValueError:
         raise NotFound("Le numéro de problème indiqué n'est pas un numéro.")
@@ -48,7 +83,7 @@ def check_comment_exist_in_db(comment_id):
     """Raise exception if comment object not found in database."""
     try:
         comment_id = int(comment_id)
-        if comment_id not in Comment.objects.values_list("id", flat=True):
+        if not Comment.objects.filter(id=comment_id).exists():
             raise NotFound("Le numéro de commentaire indiqué n'existe pas.")
     except ValueError:
         raise NotFound("Le numéro de commentaire indiqué n'est pas un numéro.")
@@ -74,8 +109,63 @@ def check_issue_is_comment_attribut(issue_id, comment_id):
         )
 
 
+def check_issue_in_project(project_id, issue_id):
+    """Raise exception if the issue of the project isn't found in database."""
+    try:
+        if Issue.objects.filter(
+            id=int(issue_id), project_id=int(project_id)
+        ).exists():
+            return
+    except ValueError:
+        pass
+    check_issue_exist_in_db(issue_id)
+    check_project_is_issue_attribut(project_id, issue_id)
+
+
+def get_archived_issue(project_id, issue_id):
+    """Return the archived issue of the project, or None if not found."""
+    try:
+        return ArchivedIssue.objects.filter(
+            id=int(issue_id), project_id=int(project_id)
+        ).first()
+    except ValueError:
+        return None
+
+
+def get_archived_comment(issue_id, comment_id):
+    """Return the comment of the archived issue, or None if not found."""
+    try:
+        return ArchivedComment.objects.filter(
+            id=int(comment_id), issue_id=int(issue_id)
+        ).first()
+    except ValueError:
+        return None
+
+
+def check_issue_is_not_archived(project_id, issue_id):
+    """Raise exception if the issue of the project is archived."""
+    if get_archived_issue(project_id, issue_id) is not None:
+        raise PermissionDenied(
+            "Ce problème est archivé, il ne peut plus être modifié."
+        )
+
+
+def check_user_is_not_contributor(project_id, user_id):
+    """Raise exception if the user is already a contributor of the project."""
+    if Contributor.objects.filter(
+        project_id=project_id, user_id=user_id
+    ).exists():
+        raise serializers.ValidationError(
+            {"user": ["Cet utilisateur est déjà un contributeur du projet."]}
+        )
+
+
 def check_user_email_exist(email):
-    if not User.objects.filter(email=email):
+    """Return the user of the email or raise exception if not found."""
+    user = User.objects.filter(email=email, is_deleted=False).first()
+    if user is None:
         raise serializers.ValidationError(
             "Cet email d'utilisateur n'existe pas."
         )
+
+    return user
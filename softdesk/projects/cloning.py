@@ -0,0 +1,109 @@
+"""
+Provides the deep cloning of projects.
+
+The contributors, issues and comments of the project are copied by one
+INSERT ... SELECT statement each, in the transaction creating the clone,
+whatever their number. The comments are attached to the copies of their
+issues by matching the issues of both projects in id order.
+"""
+from django.db import connections, transaction
+from django.utils import timezone
+from .models import Project, Contributor, Issue, Comment
+from .sharding import get_shards, place_new_project
+
+
+def copy_rows(cursor, model, replaced_columns, select, params):
+    """
+    Insert a copy of the rows of the model selected by the FROM clause of
+    the select statement, the replaced columns taking the value of their
+    SQL expression.
+    """
+    quote_name = cursor.db.ops.quote_name
+    columns = [
+        quote_name(field.column)
+        for field in model._meta.concrete_fields
+        if not field.primary_key and field.column not in replaced_columns
+    ]
+    insert_columns = columns + [quote_name(name) for name in replaced_columns]
+    select_columns = [f"source.{column}" for column in columns]
+    select_columns += replaced_columns.values()
+    cursor.execute(
+        f"INSERT INTO {quote_name(model._meta.db_table)} "
+        f"({', '.join(insert_columns)}) "
+        f"SELECT {', '.join(select_columns)} {select}",
+        params,
+    )
+
+
+def clone_project(project, user, title=None, issues=False, comments=False):
+    """
+    Return a clone of the project authored by the user, with the other
+    contributors of the project and optionally its issues and comments.
+    """
+    using = project._state.db
+    connection = connections[using]
+    quote_name = connection.ops.quote_name
+    now = connection.ops.adapt_datetimefield_value(timezone.now())
+    placement = {}
+    if get_shards():
+        # The clone stays on the shard of the project to be copied there.
+        placement["id"] = place_new_project(using).id
+
+    with transaction.atomic(using=using):
+        clone = Project.objects.using(using).create(
+            title=title or f"{project.title} (copie)"[:128],
+            description=project.description,
+            type=project.type,
+            author_user=user,
+            **placement,
+        )
+        Contributor.objects.using(using).create(
+            user=user,
+            project=clone,
+            permission=Contributor.RESPONSIBLE,
+            role="Auteur",
+        )
+        with connection.cursor() as cursor:
+            copy_rows(
+                cursor,
+                Contributor,
+                {"project_id": "%s"},
+                f"FROM {quote_name(Contributor._meta.db_table)} source "
+                "WHERE source.project_id = %s AND source.user_id <> %s",
+                [clone.id, project.id, user.id],
+            )
+            if issues:
+                # Inserted in id order, the copies get their ids in the
+                # same order as the issues they copy.
+                copy_rows(
+                    cursor,
+                    Issue,
+                    {"project_id": "%s", "created_time": "%s"},
+                    f"FROM {quote_name(Issue._meta.db_table)} source "
+                    "WHERE source.project_id = %s ORDER BY source.id",
+                    [clone.id, now, project.id],
+                )
+            if issues and comments:
+                issue_table = quote_name(Issue._meta.db_table)
+                ranked_issues = (
+                    "(SELECT id, ROW_NUMBER() OVER (ORDER BY id) "
+                    f"AS issue_rank FROM {issue_table} WHERE project_id = %s)"
+                )
+                copy_rows(
+                    cursor,
+                    Comment,
+                    {
+                        "issue_id": "copied.id",
+                        "project_id": "%s",
+                        "created_time": "%s",
+                    },
+                    f"FROM {quote_name(Comment._meta.db_table)} source "
+                    f"JOIN {ranked_issues} issue "
+                    "ON issue.id = source.issue_id "
+                    f"JOIN {ranked_issues} copied "
+                    "ON copied.issue_rank = issue.issue_rank "
+                    "WHERE source.project_id = %s ORDER BY source.id",
+                    [clone.id, now, project.id, clone.id, project.id],
+                )
+
+    return clone
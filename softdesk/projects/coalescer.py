@@ -0,0 +1,148 @@
+"""
+Provides the optional group-commit write path of the "projects" application.
+
+On SQLite every write transaction pays its own lock and fsync. When enabled,
+creations are handed over to a worker thread which gathers the writes
+arriving within a few milliseconds and saves them in one transaction, each
+in its own savepoint, before returning every caller its own result. A
+caller waits at most a timeout, its write is dropped if not started yet.
+"""
+import contextvars
+import queue
+import threading
+import time
+from concurrent.futures import Future, TimeoutError
+from functools import partial
+from django.db import (
+    DEFAULT_DB_ALIAS,
+    close_old_connections,
+    router,
+    transaction,
+)
+from rest_framework import status
+from rest_framework.exceptions import APIException
+from .conf import get_setting
+
+
+class WriteTimeout(APIException):
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    default_detail = (
+        "L'enregistrement n'a pas pu être traité à temps, veuillez "
+        "réessayer."
+    )
+    default_code = "write_timeout"
+
+
+class WriteCoalescer:
+    """Worker thread running the submitted writes in batched transactions."""
+
+    def __init__(self, window, max_batch, timeout):
+        self.window = window
+        self.max_batch = max_batch
+        self.timeout = timeout
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def submit(self, write, using=DEFAULT_DB_ALIAS):
+        """
+        Run the write callable in a batched transaction of the database and
+        return its result once committed, or raise its exception.
+        """
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self.run, name="write-coalescer", daemon=True
+                )
+                self._thread.start()
+        future = Future()
+        context = contextvars.copy_context()
+        self._queue.put((using, partial(context.run, write), future))
+
+        try:
+            return future.result(self.timeout)
+        except TimeoutError:
+            if future.cancel():
+                raise WriteTimeout()
+        # Already running, the worker sets its outcome.
+        return future.result()
+
+    def run(self):
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.window
+            while len(batch) < self.max_batch:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=timeout))
+                except queue.Empty:
+                    break
+            batches = {}
+            for using, write, future in batch:
+                batches.setdefault(using, []).append((write, future))
+            for using, writes in batches.items():
+                # Connections dropped or past their age are replaced, as
+                # between requests.
+                close_old_connections()
+                try:
+                    self.write(writes, using)
+                except BaseException as exception:
+                    # The worker keeps running, no caller is left waiting.
+                    for _, future in writes:
+                        if not future.done():
+                            future.set_exception(exception)
+                finally:
+                    close_old_connections()
+
+    @staticmethod
+    def write(batch, using=DEFAULT_DB_ALIAS):
+        """Run the writes of the batch in one transaction of the database."""
+        outcomes = []
+        try:
+            with transaction.atomic(using=using):
+                for write, future in batch:
+                    # Cancelled by a caller past its timeout.
+                    if not future.set_running_or_notify_cancel():
+                        continue
+                    try:
+                        with transaction.atomic(using=using):
+                            outcomes.append((future, write(), None))
+                    except Exception as exception:
+                        outcomes.append((future, None, exception))
+        except Exception as exception:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(exception)
+            return
+
+        for future, result, exception in outcomes:
+            if exception is None:
+                future.set_result(result)
+            else:
+                future.set_exception(exception)
+
+
+write_coalescer = WriteCoalescer(
+    get_setting("WRITE_COALESCING", "WINDOW"),
+    get_setting("WRITE_COALESCING", "MAX_BATCH"),
+    get_setting("WRITE_COALESCING", "TIMEOUT"),
+)
+
+
+def save_serializer(serializer, **kwargs):
+    """
+    Save the serializer, through the write coalescer when it is enabled
+    and the caller isn't already in a transaction.
+    """
+    using = router.db_for_write(serializer.Meta.model) or DEFAULT_DB_ALIAS
+    if (
+        not get_setting("WRITE_COALESCING", "ENABLED")
+        or transaction.get_connection(using).in_atomic_block
+    ):
+        return serializer.save(**kwargs)
+
+    return write_coalescer.submit(
+        partial(serializer.save, **kwargs), using=using
+    )
@@ -0,0 +1,151 @@
+"""
+Provides the compression of the API responses.
+
+JSON responses of at least MIN_SIZE bytes are compressed with the best
+encoding accepted by the client, brotli when the "brotli" package is
+installed, else gzip. Hot pages are often rendered to the same bytes
+(identical lists, responses shared by the single-flight), so the compressed
+bytes are kept in a small LRU cache keyed by the digest of the content, and
+recompressed only when the content changes.
+"""
+import gzip
+import hashlib
+import re
+import threading
+from collections import OrderedDict
+from django.utils.cache import patch_vary_headers
+from .conf import get_setting
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+ACCEPT_ENCODING_PATTERN = re.compile(
+    r"^\s*([\w*-]+)\s*(?:;\s*q\s*=\s*([\d.]+))?\s*$"
+)
+
+
+def get_encodings():
+    """Return the supported encodings, by order of preference."""
+    return ["br", "gzip"] if brotli is not None else ["gzip"]
+
+
+def negotiate_encoding(accept_encoding):
+    """Return the preferred supported encoding accepted, or None."""
+    qualities = {}
+    for item in accept_encoding.split(","):
+        match = ACCEPT_ENCODING_PATTERN.match(item)
+        if match is None:
+            continue
+        try:
+            quality = float(match.group(2) or 1)
+        except ValueError:
+            continue
+        qualities[match.group(1).lower()] = quality
+    accepted = [
+        encoding
+        for encoding in get_encodings()
+        if qualities.get(encoding, qualities.get("*", 0)) > 0
+    ]
+    if not accepted:
+        return None
+
+    return max(accepted, key=lambda encoding: qualities.get(encoding, 0))
+
+
+def compress(content, encoding):
+    """Return the content compressed with the encoding."""
+    if encoding == "br":
+        return brotli.compress(
+            content,
+            mode=brotli.MODE_TEXT,
+            quality=get_setting("RESPONSE_COMPRESSION", "BROTLI_QUALITY"),
+        )
+    return gzip.compress(
+        content,
+        compresslevel=get_setting("RESPONSE_COMPRESSION", "GZIP_LEVEL"),
+        mtime=0,
+    )
+
+
+class CompressedCache:
+    """LRU cache of compressed contents, keyed by encoding and digest."""
+
+    def __init__(self):
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get_compressed(self, content, encoding):
+        """Return the compressed content, from the cache when possible."""
+        size = get_setting("RESPONSE_COMPRESSION", "CACHE_SIZE")
+        key = (encoding, hashlib.blake2b(content, digest_size=16).digest())
+        with self._lock:
+            compressed = self._entries.get(key)
+            if compressed is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return compressed
+            self.misses += 1
+        compressed = compress(content, encoding)
+        with self._lock:
+            self._entries[key] = compressed
+            while len(self._entries) > size:
+                self._entries.popitem(last=False)
+
+        return compressed
+
+
+compressed_cache = CompressedCache()
+
+
+class CompressionMiddleware:
+    """Middleware compressing the large enough responses."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.enabled = get_setting("RESPONSE_COMPRESSION", "ENABLED")
+        self.min_size = get_setting("RESPONSE_COMPRESSION", "MIN_SIZE")
+        # The HTML pages carry the CSRF token and are left out, against
+        # compression side channel attacks.
+        self.content_types = get_setting(
+            "RESPONSE_COMPRESSION", "CONTENT_TYPES"
+        )
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if not self.enabled or not self.is_compressible(response):
+            return response
+        # The response depends on the header even when sent uncompressed.
+        patch_vary_headers(response, ("Accept-Encoding",))
+        encoding = negotiate_encoding(
+            request.META.get("HTTP_ACCEPT_ENCODING", "")
+        )
+        if encoding is None:
+            return response
+
+        compressed = compressed_cache.get_compressed(
+            response.content, encoding
+        )
+        if len(compressed) >= len(response.content):
+            return response
+        response.content = compressed
+        response["Content-Length"] = str(len(compressed))
+        response["Content-Encoding"] = encoding
+        # The compressed representation differs from the one of the ETag.
+        etag = response.get("ETag")
+        if etag and etag.startswith('"'):
+            response["ETag"] = "W/" + etag
+
+        return response
+
+    def is_compressible(self, response):
+        if response.streaming or response.has_header("Content-Encoding"):
+            return False
+        content_type = response.get("Content-Type", "").split(";")[0]
+        if content_type.strip() not in self.content_types:
+            return False
+
+        return len(response.content) >= self.min_size
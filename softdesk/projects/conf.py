@@ -0,0 +1,102 @@
+"""
+Provides the settings of the "projects" application.
+
+Each feature reads a dict of the Django settings named after it, the keys
+missing from the dict taking their value in DEFAULTS.
+"""
+from django.conf import settings
+
+DEFAULTS = {
+    "EVENT_STREAM": {
+        "PATH": "/events/",
+        "QUEUE_SIZE": 100,
+        "KEEPALIVE": 15,
+    },
+    "WRITE_COALESCING": {
+        "ENABLED": False,
+        "WINDOW": 0.005,
+        "MAX_BATCH": 100,
+        "TIMEOUT": 30,
+    },
+    "SINGLE_FLIGHT": {
+        "ENABLED": False,
+    },
+    "SHARDING": {
+        "SHARDS": [],
+    },
+    "ADMISSION_CONTROL": {
+        "ENABLED": True,
+        "RETRY_AFTER": 1,
+        "ROUTES": [
+            (r"^/signup/bulk/", "export"),
+            (r"^/(login|signup|myinfo)/", "auth"),
+            (r"^/projects/(batch|\d+/(timeline|cycle-time))/", "export"),
+        ],
+        "CLASSES": {
+            "auth": {"LIMIT": 4, "QUEUE": 16, "TIMEOUT": 0.5},
+            "read": {"LIMIT": 8, "QUEUE": 32, "TIMEOUT": 2},
+            "write": {"LIMIT": 4, "QUEUE": 16, "TIMEOUT": 2},
+            "export": {"LIMIT": 2, "QUEUE": 4, "TIMEOUT": 0.1},
+        },
+    },
+    "TRAFFIC_CAPTURE": {
+        "ENABLED": False,
+        "PATH": "traffic.jsonl",
+        "SAMPLE_RATE": 1.0,
+        "QUERY_PARAMS": [
+            "limit",
+            "offset",
+            "cursor",
+            "since",
+            "until",
+            "archived",
+        ],
+        "BODY_FIELDS": ["tag", "priority", "status", "permission", "type"],
+    },
+    "PROFILING": {
+        "ENABLED": False,
+        "HEADER": "X-Profile",
+        "SECRET": None,
+        "SAMPLE_RATE": 0.0,
+        "PATH": "profiles",
+        "MAX_PROFILES": 100,
+    },
+    "TOKEN_REVOCATION": {
+        "CAPACITY": 100000,
+        "ERROR_RATE": 0.001,
+        "SYNC_INTERVAL": 1,
+        "REBUILD_INTERVAL": 300,
+    },
+    "USER_PROVISIONING": {
+        "BATCH_SIZE": 500,
+        "WORKERS": None,
+        "REQUEST_WORKERS": 2,
+        "MAX_REQUEST_ROWS": 1000,
+    },
+    "ISSUE_ARCHIVE": {
+        "AGE_DAYS": 365,
+        "BATCH_SIZE": 500,
+    },
+    "RESPONSE_COMPRESSION": {
+        "ENABLED": True,
+        "MIN_SIZE": 1024,
+        "CONTENT_TYPES": ["application/json"],
+        "GZIP_LEVEL": 6,
+        "BROTLI_QUALITY": 5,
+        "CACHE_SIZE": 256,
+    },
+    "IDEMPOTENCY": {
+        "HEADER": "Idempotency-Key",
+        "CACHE": "default",
+        "TIMEOUT": 86400,
+        "IN_FLIGHT_TIMEOUT": 60,
+        "MAX_KEY_LENGTH": 255,
+    },
+}
+
+
+def get_setting(namespace, name):
+    """Return the value of the setting of the namespace, or its default."""
+    return getattr(settings, namespace, {}).get(
+        name, DEFAULTS[namespace][name]
+    )
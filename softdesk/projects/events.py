@@ -0,0 +1,269 @@
+"""
+Provides the live event stream of the "projects" application.
+
+Model signals publish create/update/delete events to an in-process broker
+and the ASGI application pushes them to connected users as server-sent
+events, so clients no longer have to poll issues and comments. A stream is
+closed once its token expires or is revoked.
+"""
+import asyncio
+import json
+import threading
+import time
+from urllib.parse import parse_qs
+
+from asgiref.sync import sync_to_async
+from rest_framework.exceptions import APIException
+from rest_framework.settings import api_settings
+from .conf import get_setting
+from .models import Contributor
+from .revocation import revocation_filter
+from .sharding import get_project_databases
+
+
+class Subscription:
+    """Bounded event queue of one connected user."""
+
+    def __init__(self, loop, user, project_ids):
+        self.loop = loop
+        self.user_id = user.id
+        self.is_superuser = user.is_superuser
+        self.project_ids = set(project_ids)
+        self.queue = asyncio.Queue(
+            maxsize=get_setting("EVENT_STREAM", "QUEUE_SIZE")
+        )
+        self.overflowed = False
+
+    def offer(self, event):
+        """
+        Queue the event if the user can see it.
+
+        Runs in the event loop of the subscription. A consumer too slow to
+        keep up with its queue is dropped: pending events are discarded and
+        a final "overflow" event asks the client to resynchronize.
+        """
+        if self.overflowed:
+            return
+        if event["type"] == "contributor" and event["user_id"] == self.user_id:
+            if event["action"] == "deleted":
+                self.project_ids.discard(event["project_id"])
+            else:
+                self.project_ids.add(event["project_id"])
+        if not self.is_superuser and (
+            event["project_id"] not in self.project_ids
+        ):
+            return
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.overflowed = True
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait({"type": "overflow"})
+
+
+class EventBroker:
+    """In-process publish/subscribe broker, safe to publish from any thread."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscriptions = set()
+
+    @property
+    def has_subscribers(self):
+        """Return True if at least one stream is connected."""
+        return bool(self._subscriptions)
+
+    def subscribe(self, subscription):
+        with self._lock:
+            self._subscriptions.add(subscription)
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            self._subscriptions.discard(subscription)
+
+    def publish(self, event):
+        """Hand the event over to the event loop of every subscription."""
+        with self._lock:
+            subscriptions = list(self._subscriptions)
+        for subscription in subscriptions:
+            try:
+                subscription.loop.call_soon_threadsafe(
+                    subscription.offer, event
+                )
+            except RuntimeError:
+                # The event loop of the subscription is already closed.
+                self.unsubscribe(subscription)
+
+
+broker = EventBroker()
+
+
+class _TokenRequest:
+    """Minimal request object accepted by the authentication classes."""
+
+    def __init__(self, token):
+        self.META = {"HTTP_AUTHORIZATION": f"Bearer {token}"}
+
+
+def authenticate_token(token):
+    """
+    Return the user and the validated token, or None if no authenticator
+    accepts the token.
+    """
+    request = _TokenRequest(token)
+    for authentication_class in api_settings.DEFAULT_AUTHENTICATION_CLASSES:
+        try:
+            result = authentication_class().authenticate(request)
+        except APIException:
+            return None
+        if result is not None:
+            return result
+    return None
+
+
+def is_token_active(validated_token):
+    """Return True if the validated token is neither expired nor revoked."""
+    if validated_token.get("exp", float("inf")) <= time.time():
+        return False
+
+    return not revocation_filter.is_revoked(validated_token)
+
+
+def get_project_id_list(user):
+    """Return project id list of the user."""
+    return [
+        project_id
+        for database in get_project_databases()
+        for project_id in Contributor.objects.using(database)
+        .filter(user_id=user.id)
+        .values_list("project_id", flat=True)
+    ]
+
+
+def get_scope_token(scope):
+    """Return the JWT of the "Authorization" header or "token" parameter."""
+    for name, value in scope["headers"]:
+        if name == b"authorization":
+            parts = value.decode("latin-1").split()
+            if len(parts) == 2 and parts[0] == "Bearer":
+                return parts[1]
+    query = parse_qs(scope.get("query_string", b"").decode("latin-1"))
+    return query.get("token", [None])[0]
+
+
+def format_event(event):
+    """Return the event encoded as a server-sent event message."""
+    data = json.dumps(event, separators=(",", ":"))
+    return f"event: {event['type']}\ndata: {data}\n\n".encode()
+
+
+class EventStreamApplication:
+    """ASGI application serving the event stream, other paths are delegated."""
+
+    def __init__(self, application):
+        self.application = application
+        self.path = get_setting("EVENT_STREAM", "PATH")
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] != self.path:
+            return await self.application(scope, receive, send)
+
+        token = get_scope_token(scope)
+        result = None
+        if token:
+            result = await sync_to_async(authenticate_token)(token)
+        if result is None:
+            await self.send_error(
+                send, 401, "Un jeton d'accès valide est requis."
+            )
+            return
+        user, validated_token = result
+        project_id_list = await sync_to_async(get_project_id_list)(user)
+
+        subscription = Subscription(
+            asyncio.get_running_loop(), user, project_id_list
+        )
+        broker.subscribe(subscription)
+        try:
+            await self.stream(subscription, validated_token, receive, send)
+        finally:
+            broker.unsubscribe(subscription)
+
+    async def stream(self, subscription, validated_token, receive, send):
+        """
+        Push queued events until the client disconnects, overflows or its
+        token is no longer active.
+        """
+        await send(
+            {
+                "type": "http.response.start",
+                "status": 200,
+                "headers": [
+                    (b"content-type", b"text/event-stream"),
+                    (b"cache-control", b"no-cache"),
+                    (b"x-accel-buffering", b"no"),
+                ],
+            }
+        )
+        keepalive = get_setting("EVENT_STREAM", "KEEPALIVE")
+        disconnect = asyncio.ensure_future(self.wait_disconnect(receive))
+        try:
+            while True:
+                get = asyncio.ensure_future(subscription.queue.get())
+                # Woken up at the expiration of the token at the latest.
+                timeout = min(
+                    keepalive,
+                    max(
+                        0,
+                        validated_token.get("exp", float("inf"))
+                        - time.time(),
+                    ),
+                )
+                done, _ = await asyncio.wait(
+                    {get, disconnect},
+                    timeout=timeout,
+                    return_when=asyncio.FIRST_COMPLETED,
+                )
+                if get not in done:
+                    get.cancel()
+                    if disconnect in done:
+                        return
+                if not await sync_to_async(is_token_active)(validated_token):
+                    break
+                if get not in done:
+                    body = b": keep-alive\n\n"
+                else:
+                    event = get.result()
+                    body = format_event(event)
+                await send(
+                    {
+                        "type": "http.response.body",
+                        "body": body,
+                        "more_body": True,
+                    }
+                )
+                if get in done and event["type"] == "overflow":
+                    break
+            await send({"type": "http.response.body", "body": b""})
+        finally:
+            disconnect.cancel()
+
+    @staticmethod
+    async def wait_disconnect(receive):
+        while True:
+            message = await receive()
+            if message["type"] == "http.disconnect":
+                return
+
+    @staticmethod
+    async def send_error(send, status, detail):
+        body = json.dumps({"detail": detail}).encode()
+        await send(
+            {
+                "type": "http.response.start",
+                "status": status,
+                "headers": [(b"content-type", b"application/json")],
+            }
+        )
+        await send({"type": "http.response.body", "body": body})
@@ -0,0 +1,149 @@
+"""
+Provides the issue status history and the cycle time reports.
+
+Every status change is recorded and immediately added to the daily rollup
+of its project, keyed by tag, priority and a logarithmic bucket of the time
+spent in the left status. Reports only read the rollups: counts are summed
+and the median and 90th percentile are read from the merged buckets.
+"""
+import math
+from django.db import IntegrityError, router, transaction
+from django.db.models import F, Sum
+from django.utils import timezone
+from .models import Issue, IssueStatusChange, IssueStatusRollup
+
+#: Upper bound in seconds of the first duration bucket, each next bucket is
+#: BUCKET_GROWTH times wider, the last one being unbounded.
+FIRST_BUCKET_BOUND = 60
+BUCKET_GROWTH = math.sqrt(2)
+BUCKET_COUNT = 48
+
+
+def get_bucket(seconds):
+    """Return the duration bucket of the number of seconds."""
+    if seconds <= FIRST_BUCKET_BOUND:
+        return 0
+    bucket = math.ceil(
+        math.log(seconds / FIRST_BUCKET_BOUND, BUCKET_GROWTH) - 1e-9
+    )
+    return min(bucket, BUCKET_COUNT - 1)
+
+
+def get_bucket_bound(bucket):
+    """Return the upper bound in seconds of the duration bucket."""
+    return FIRST_BUCKET_BOUND * BUCKET_GROWTH**bucket
+
+
+def record_status_change(issue, from_status, author_user):
+    """Record the status change of the issue and update its rollup."""
+    previous_change_time = (
+        IssueStatusChange.objects.filter(issue=issue)
+        .values_list("created_time", flat=True)
+        .first()
+    )
+    change = IssueStatusChange.objects.create(
+        issue=issue,
+        project_id=issue.project_id,
+        from_status=from_status,
+        to_status=issue.status,
+        author_user=author_user,
+    )
+    duration = change.created_time - (
+        previous_change_time or issue.created_time
+    )
+    add_to_rollup(issue, change, duration.total_seconds())
+
+    return change
+
+
+def add_to_rollup(issue, change, seconds):
+    """Count the status change in the daily rollup of its project."""
+    key = {
+        "project_id": change.project_id,
+        "day": timezone.localdate(change.created_time),
+        "from_status": change.from_status,
+        "to_status": change.to_status,
+        "tag": issue.tag,
+        "priority": issue.priority,
+        "bucket": get_bucket(seconds),
+    }
+    increment = {
+        "count": F("count") + 1,
+        "duration_sum": F("duration_sum") + seconds,
+    }
+    # The rollups are on the database of the change, a shard's.
+    using = router.db_for_write(IssueStatusRollup, instance=change)
+    rollups = IssueStatusRollup.objects.using(using)
+    if rollups.filter(**key).update(**increment):
+        return
+    try:
+        with transaction.atomic(using=using):
+            rollups.create(**key, count=1, duration_sum=seconds)
+    except IntegrityError:
+        # Created meanwhile by a concurrent status change.
+        rollups.filter(**key).update(**increment)
+
+
+def get_percentile(buckets, count, percentile):
+    """Return the percentile of the durations counted in the buckets."""
+    rank = math.ceil(count * percentile)
+    seen = 0
+    for bucket in sorted(buckets):
+        seen += buckets[bucket]
+        if seen >= rank:
+            return get_bucket_bound(bucket)
+
+    return None
+
+
+def get_cycle_time_report(project_id, since, until):
+    """
+    Return the time spent in each status by tag and priority, and the
+    daily throughput of finished issues, between the two days included.
+    """
+    rollups = IssueStatusRollup.objects.filter(
+        project_id=project_id, day__gte=since, day__lte=until
+    )
+    groups = {}
+    for row in (
+        rollups.values("from_status", "tag", "priority", "bucket")
+        .annotate(count=Sum("count"), duration_sum=Sum("duration_sum"))
+        .order_by()
+    ):
+        group = groups.setdefault(
+            (row["from_status"], row["tag"], row["priority"]),
+            {"count": 0, "duration_sum": 0, "buckets": {}},
+        )
+        group["count"] += row["count"]
+        group["duration_sum"] += row["duration_sum"]
+        group["buckets"][row["bucket"]] = row["count"]
+
+    statuses = dict(Issue.ISSUE_STATUS)
+    tags = dict(Issue.ISSUE_TAG)
+    priorities = dict(Issue.ISSUE_PRIORITY)
+    cycle_time = [
+        {
+            "status": statuses[status],
+            "tag": tags[tag],
+            "priority": priorities[priority],
+            "count": group["count"],
+            "mean": group["duration_sum"] / group["count"],
+            "median": get_percentile(group["buckets"], group["count"], 0.5),
+            "p90": get_percentile(group["buckets"], group["count"], 0.9),
+        }
+        for (status, tag, priority), group in sorted(groups.items())
+    ]
+    throughput = [
+        {"day": row["day"], "count": row["count"]}
+        for row in rollups.filter(to_status=Issue.DONE)
+        .values("day")
+        .annotate(count=Sum("count"))
+        .order_by("day")
+    ]
+
+    return {
+        "since": since,
+        "until": until,
+        "cycle_time": cycle_time,
+        "throughput": throughput,
+    }
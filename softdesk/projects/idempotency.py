@@ -0,0 +1,128 @@
+"""
+Provides the idempotency keys of the create requests.
+
+A create request sent with an "Idempotency-Key" header reserves the key of
+its user in a cache, bounded and expiring, then stores its rendered
+response there. A retry with the same key is answered with the stored
+response without running the permission checks, the validation or the
+insert again, a retry arriving while the first request runs is refused.
+"""
+import hashlib
+from django.core.cache import caches
+from django.http import HttpResponse, RawPostDataException
+from rest_framework import status
+from rest_framework.exceptions import APIException
+from .conf import get_setting
+
+#: Headers of the stored responses kept on replay.
+STORED_HEADERS = ("Location",)
+
+
+class IdempotencyConflict(APIException):
+    status_code = status.HTTP_409_CONFLICT
+    default_detail = (
+        "Une requête avec cette clé d'idempotence est en cours, "
+        "veuillez réessayer plus tard."
+    )
+    default_code = "idempotency_conflict"
+
+
+class IdempotencyKeyReused(APIException):
+    status_code = status.HTTP_422_UNPROCESSABLE_ENTITY
+    default_detail = (
+        "Cette clé d'idempotence a déjà été utilisée pour une autre "
+        "requête."
+    )
+    default_code = "idempotency_key_reused"
+
+
+class IdempotentReplay(Exception):
+    """Raised to answer a request with the stored response of its key."""
+
+    def __init__(self, response):
+        super().__init__()
+        self.response = response
+
+
+def get_store():
+    """Return the cache storing the idempotency keys."""
+    return caches[get_setting("IDEMPOTENCY", "CACHE")]
+
+
+def get_cache_key(user_id, path, key):
+    """Return the cache key of the idempotency key of the user and path."""
+    digest = hashlib.blake2b(
+        f"{user_id}:{path}:{key}".encode(), digest_size=16
+    ).hexdigest()
+
+    return f"idempotency:{digest}"
+
+
+def get_fingerprint(request):
+    """Return the digest of the body of the Django request."""
+    try:
+        body = request.body
+    except RawPostDataException:
+        # Already parsed as a form by a middleware.
+        body = request.POST.urlencode().encode()
+    else:
+        # Clients may draw another multipart boundary for a retry.
+        boundary = request.content_params.get("boundary")
+        if request.content_type == "multipart/form-data" and boundary:
+            body = body.replace(boundary.encode("latin-1"), b"")
+
+    return hashlib.blake2b(body, digest_size=16).hexdigest()
+
+
+def reserve(cache_key, fingerprint):
+    """
+    Reserve the key for the request of the fingerprint, or raise the
+    replay of its stored response or the error of its state.
+    """
+    store = get_store()
+    entry = {"fingerprint": fingerprint, "response": None}
+    if store.add(
+        cache_key, entry, get_setting("IDEMPOTENCY", "IN_FLIGHT_TIMEOUT")
+    ):
+        return
+    entry = store.get(cache_key)
+    if entry is None:
+        # Expired in between, reserved again.
+        return reserve(cache_key, fingerprint)
+    if entry["fingerprint"] != fingerprint:
+        raise IdempotencyKeyReused()
+    if entry["response"] is None:
+        raise IdempotencyConflict()
+    status_code, content_type, content, headers = entry["response"]
+    response = HttpResponse(
+        content, status=status_code, content_type=content_type
+    )
+    for name, value in headers.items():
+        response[name] = value
+    response["Idempotent-Replayed"] = "true"
+
+    raise IdempotentReplay(response)
+
+
+def store_response(cache_key, fingerprint, response):
+    """Store the rendered response of the key."""
+    headers = {
+        name: response[name]
+        for name in STORED_HEADERS
+        if response.has_header(name)
+    }
+    entry = {
+        "fingerprint": fingerprint,
+        "response": (
+            response.status_code,
+            response["Content-Type"],
+            response.content,
+            headers,
+        ),
+    }
+    get_store().set(cache_key, entry, get_setting("IDEMPOTENCY", "TIMEOUT"))
+
+
+def release(cache_key):
+    """Release the key, for a new request to use it."""
+    get_store().delete(cache_key)
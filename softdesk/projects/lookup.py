@@ -0,0 +1,116 @@
+"""
+Provides the lookup of users by the prefixes of their email and names.
+
+The email and the names of each user are split into normalized words,
+lowercase ASCII letters and digits, stored as UserLookupTerm rows. A search
+matches the users having a term starting with each word of the query, each
+word being a range scan of the (term, user) index whatever the number of
+users, instead of a scan of the user table.
+"""
+import re
+import unicodedata
+from django.db import transaction
+from django.db.models import Q
+from .models import Contributor, UserLookupTerm
+from .sharding import get_project_databases, get_shards
+
+#: Maximal number of words of a query.
+MAX_QUERY_WORDS = 5
+
+#: Maximal number of users returned by the lookup.
+MAX_RESULTS = 20
+
+TERM_FIELDS = ("email", "first_name", "last_name")
+
+NOT_ALPHANUMERIC = re.compile(r"[^a-z0-9]+")
+
+
+def get_words(text):
+    """Return the normalized words of the text."""
+    text = unicodedata.normalize("NFKD", text or "")
+    text = text.encode("ascii", "ignore").decode().lower()
+
+    return [word for word in NOT_ALPHANUMERIC.split(text) if word]
+
+
+def get_user_terms(user):
+    """Return the lookup terms of the user."""
+    max_length = UserLookupTerm._meta.get_field("term").max_length
+    return {
+        word[:max_length]
+        for name in TERM_FIELDS
+        for word in get_words(getattr(user, name))
+    }
+
+
+def get_prefix_upper_bound(prefix):
+    """
+    Return the first string following every string starting with the
+    prefix, for strings of lowercase letters and digits, or None if there
+    is no such string.
+    """
+    # Digits sort before letters in the binary and linguistic collations.
+    characters = list(prefix)
+    while characters:
+        last = characters.pop()
+        if last != "z":
+            following = "a" if last == "9" else chr(ord(last) + 1)
+            return "".join(characters) + following
+
+    return None
+
+
+def get_prefix_filter(word):
+    """Return the filter of the terms starting with the word."""
+    condition = Q(term__gte=word)
+    upper_bound = get_prefix_upper_bound(word)
+    if upper_bound is not None:
+        condition &= Q(term__lt=upper_bound)
+
+    return condition
+
+
+def search_users(queryset, query):
+    """Return the users of the queryset matching every word of the query."""
+    words = get_words(query)[:MAX_QUERY_WORDS]
+    if not words:
+        return queryset.none()
+    for word in words:
+        queryset = queryset.filter(
+            id__in=UserLookupTerm.objects.filter(
+                get_prefix_filter(word)
+            ).values("user_id")
+        )
+
+    return queryset
+
+
+def filter_co_contributors(users, user):
+    """Return the users of the queryset sharing a project with the user."""
+    contributors = Contributor.objects.filter(
+        project__contributor__user_id=user.id, project__is_deleted=False
+    )
+    if not get_shards():
+        return users.filter(id__in=contributors.values("user_id"))
+    # The contributors are on the shards, away from the users.
+    user_ids = {
+        user_id
+        for database in get_project_databases()
+        for user_id in contributors.using(database).values_list(
+            "user_id", flat=True
+        )
+    }
+
+    return users.filter(id__in=user_ids)
+
+
+def index_users(users):
+    """Replace the lookup terms of the users."""
+    users = [user for user in users if user.pk is not None]
+    with transaction.atomic():
+        UserLookupTerm.objects.filter(user__in=users).delete()
+        UserLookupTerm.objects.bulk_create(
+            UserLookupTerm(user=user, term=term)
+            for user in users
+            for term in sorted(get_user_terms(user))
+        )
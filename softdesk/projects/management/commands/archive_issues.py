@@ -0,0 +1,38 @@
+"""
+Management command moving the finished issues to the archive tables.
+"""
+from django.core.management.base import BaseCommand
+from projects.archive import archive_issues
+
+
+class Command(BaseCommand):
+    help = (
+        "Move the finished issues without activity for the given number of "
+        "days, with their comments, to the archive tables in batches. "
+        "Meant to be run periodically as a background job."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--days",
+            type=int,
+            default=None,
+            help="Days without activity, from ISSUE_ARCHIVE by default.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=None,
+            help="Number of issues moved per transaction.",
+        )
+        parser.add_argument(
+            "--database",
+            default=None,
+            help="Database to archive, every project database by default.",
+        )
+
+    def handle(self, *args, **options):
+        count = archive_issues(
+            options["days"], options["batch_size"], options["database"]
+        )
+        self.stdout.write(self.style.SUCCESS(f"{count} issue(s) archived."))
@@ -0,0 +1,123 @@
+"""
+Management command comparing label and integer encodings of issue choices.
+"""
+import os
+import random
+import sqlite3
+import tempfile
+import time
+from django.core.management.base import BaseCommand
+from projects.models import Issue
+
+ENCODINGS = {
+    "label": {
+        "column_type": "varchar(12)",
+        "tag": [label for _, label in Issue.ISSUE_TAG],
+        "priority": [label for _, label in Issue.ISSUE_PRIORITY],
+        "status": [label for _, label in Issue.ISSUE_STATUS],
+    },
+    "integer": {
+        "column_type": "smallint",
+        "tag": [code for code, _ in Issue.ISSUE_TAG],
+        "priority": [code for code, _ in Issue.ISSUE_PRIORITY],
+        "status": [code for code, _ in Issue.ISSUE_STATUS],
+    },
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed a scratch SQLite database with issues stored with label and "
+        "integer choices, then compare index sizes and filter speed."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=200000)
+        parser.add_argument("--projects", type=int, default=100)
+        parser.add_argument("--queries", type=int, default=2000)
+        parser.add_argument("--seed", type=int, default=0)
+
+    def handle(self, *args, **options):
+        with tempfile.TemporaryDirectory() as directory:
+            for name, encoding in ENCODINGS.items():
+                path = os.path.join(directory, f"{name}.sqlite3")
+                connection = sqlite3.connect(path)
+                try:
+                    table_pages, index_pages, page_size = self.seed(
+                        connection, encoding, options
+                    )
+                    duration = self.time_filters(
+                        connection, encoding, options
+                    )
+                finally:
+                    connection.close()
+                self.stdout.write(
+                    f"{name:>8}: table {table_pages * page_size / 1024:,.0f} "
+                    f"KiB, indexes {index_pages * page_size / 1024:,.0f} KiB, "
+                    f"{duration / options['queries'] * 1e6:,.1f} µs/filter"
+                )
+
+    def seed(self, connection, encoding, options):
+        """Fill the issue table, return table and index pages, page size."""
+        column_type = encoding["column_type"]
+        connection.execute(
+            "CREATE TABLE issue (id integer PRIMARY KEY, "
+            f"project_id bigint NOT NULL, tag {column_type} NOT NULL, "
+            f"priority {column_type} NOT NULL, "
+            f"status {column_type} NOT NULL)"
+        )
+        generator = random.Random(options["seed"])
+        rows = (
+            (
+                generator.randrange(options["projects"]),
+                generator.choice(encoding["tag"]),
+                generator.choice(encoding["priority"]),
+                generator.choice(encoding["status"]),
+            )
+            for _ in range(options["rows"])
+        )
+        with connection:
+            connection.executemany(
+                "INSERT INTO issue (project_id, tag, priority, status) "
+                "VALUES (?, ?, ?, ?)",
+                rows,
+            )
+        table_pages = self.page_count(connection)
+        with connection:
+            connection.execute(
+                "CREATE INDEX issue_project_status ON issue "
+                "(project_id, status)"
+            )
+            for column in ("tag", "priority", "status"):
+                connection.execute(
+                    f"CREATE INDEX issue_{column} ON issue ({column})"
+                )
+        index_pages = self.page_count(connection) - table_pages
+        page_size = connection.execute("PRAGMA page_size").fetchone()[0]
+
+        return table_pages, index_pages, page_size
+
+    @staticmethod
+    def page_count(connection):
+        return connection.execute("PRAGMA page_count").fetchone()[0]
+
+    @staticmethod
+    def time_filters(connection, encoding, options):
+        """Return the duration of the filters on project and status."""
+        generator = random.Random(options["seed"])
+        filters = [
+            (
+                generator.randrange(options["projects"]),
+                generator.choice(encoding["status"]),
+            )
+            for _ in range(options["queries"])
+        ]
+        start = time.perf_counter()
+        for project_id, status in filters:
+            connection.execute(
+                "SELECT id, tag, priority FROM issue "
+                "WHERE project_id = ? AND status = ?",
+                (project_id, status),
+            ).fetchall()
+
+        return time.perf_counter() - start
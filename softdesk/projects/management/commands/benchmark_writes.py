@@ -0,0 +1,97 @@
+"""
+Management command comparing the direct and group-commit comment creation.
+"""
+import statistics
+import threading
+import time
+from django.core.management.base import BaseCommand
+from django.db import OperationalError, connection
+from projects.coalescer import WriteCoalescer
+from projects.models import Project, Issue, Comment
+from projects.purge import purge_object
+
+
+class Command(BaseCommand):
+    help = (
+        "Create comments from concurrent threads, one transaction each and "
+        "then through the write coalescer, and report throughput and "
+        "latencies. Rows are created in a scratch project purged at the "
+        "end: run it against a copy of the database."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--comments", type=int, default=2000)
+        parser.add_argument("--concurrency", type=int, default=16)
+        parser.add_argument("--window", type=float, default=0.005)
+        parser.add_argument("--max-batch", type=int, default=100)
+
+    def handle(self, *args, **options):
+        project = Project.objects.create(
+            title="Benchmark", description="Benchmark", type="Back-End"
+        )
+        issue = Issue.objects.create(
+            title="Benchmark",
+            desc="Benchmark",
+            tag=Issue.TASK,
+            priority=Issue.LOW,
+            status=Issue.TO_DO,
+            project=project,
+        )
+        coalescer = WriteCoalescer(options["window"], options["max_batch"])
+        try:
+            for name, write in (
+                ("direct", lambda create: create()),
+                ("coalesced", coalescer.submit),
+            ):
+                self.report(name, self.run(issue, write, options))
+        finally:
+            purge_object(project)
+
+    @staticmethod
+    def run(issue, write, options):
+        """Return the duration, latencies and error count of the run."""
+        latencies = []
+        errors = []
+        per_thread = options["comments"] // options["concurrency"]
+
+        def create_comments():
+            try:
+                for _ in range(per_thread):
+                    start = time.perf_counter()
+                    try:
+                        write(
+                            lambda: Comment.objects.create(
+                                description="Benchmark", issue=issue
+                            )
+                        )
+                    except OperationalError:
+                        errors.append(1)
+                    else:
+                        latencies.append(time.perf_counter() - start)
+            finally:
+                connection.close()
+
+        threads = [
+            threading.Thread(target=create_comments)
+            for _ in range(options["concurrency"])
+        ]
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        return time.perf_counter() - start, latencies, len(errors)
+
+    def report(self, name, result):
+        duration, latencies, errors = result
+        if not latencies:
+            self.stdout.write(f"{name:>9}: {errors} error(s)")
+            return
+        quantiles = statistics.quantiles(latencies, n=100)
+        self.stdout.write(
+            f"{name:>9}: {len(latencies) / duration:,.0f} writes/s, "
+            f"p50 {quantiles[49] * 1000:.1f} ms, "
+            f"p99 {quantiles[98] * 1000:.1f} ms, "
+            f"max {max(latencies) * 1000:.1f} ms, {errors} error(s)"
+        )
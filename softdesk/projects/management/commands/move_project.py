@@ -0,0 +1,91 @@
+"""
+Management command moving a project to another shard database.
+"""
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from projects.models import (
+    Project,
+    ProjectPlacement,
+    Contributor,
+    Issue,
+    Comment,
+    ArchivedIssue,
+    ArchivedComment,
+    IssueStatusChange,
+    IssueStatusRollup,
+)
+from projects.purge import DEFAULT_CHUNK_SIZE, purge_rows
+from projects.sharding import get_project_shard, get_shards
+
+#: Models of the project rows, in the order they are copied.
+PROJECT_MODELS = (
+    Contributor,
+    Issue,
+    Comment,
+    ArchivedIssue,
+    ArchivedComment,
+    IssueStatusChange,
+    IssueStatusRollup,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Copy a project and its rows to another shard database, keeping "
+        "their ids, point its placement to it and purge the former copy. "
+        "Writes to the project during the move are not supported: run it "
+        "while the project isn't used."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("project_id", type=int)
+        parser.add_argument("shard")
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=DEFAULT_CHUNK_SIZE,
+            help="Number of rows copied or deleted per statement.",
+        )
+
+    def handle(self, *args, **options):
+        project_id = options["project_id"]
+        target = options["shard"]
+        chunk_size = options["chunk_size"]
+        if target not in get_shards():
+            raise CommandError(f"{target} is not a shard database.")
+        source = get_project_shard(project_id)
+        if source == target:
+            raise CommandError(f"Project {project_id} is already on {target}.")
+        project = Project.objects.using(source).filter(id=project_id).first()
+        if project is None:
+            raise CommandError(f"Project {project_id} does not exist.")
+
+        with transaction.atomic(using=target):
+            Project.objects.using(target).bulk_create([project])
+            for model in PROJECT_MODELS:
+                rows = model.objects.using(source).filter(
+                    project_id=project_id
+                )
+                self.copy(model, rows, target, chunk_size)
+        ProjectPlacement.objects.update_or_create(
+            id=project_id, defaults={"shard": target}
+        )
+        purge_rows(Project, "id = %s", [project_id], chunk_size, source)
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Project {project_id} moved from {source} to {target}."
+            )
+        )
+
+    @staticmethod
+    def copy(model, rows, using, chunk_size):
+        """Insert the rows in the database by chunks, keeping their ids."""
+        chunk = []
+        for row in rows.order_by("pk").iterator(chunk_size=chunk_size):
+            chunk.append(row)
+            if len(chunk) == chunk_size:
+                model.objects.using(using).bulk_create(chunk)
+                chunk = []
+        if chunk:
+            model.objects.using(using).bulk_create(chunk)
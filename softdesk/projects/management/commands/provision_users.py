@@ -0,0 +1,70 @@
+"""
+Management command creating users in bulk from a CSV or NDJSON file.
+"""
+import json
+from django.core.management.base import BaseCommand, CommandError
+from projects.provisioning import (
+    FORMATS,
+    get_format,
+    provision_users,
+    read_rows,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Create the users of a CSV file with a header, or of a NDJSON file, "
+        "having the email, password, first_name and last_name fields. The "
+        "rows are validated and their passwords hashed on every core, the "
+        "invalid rows are reported and the other ones created."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path")
+        parser.add_argument(
+            "--format",
+            choices=FORMATS,
+            default=None,
+            help="Format of the file, from its extension by default.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=None,
+            help="Number of users inserted per statement.",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=None,
+            help="Number of hashing processes, one per core by default.",
+        )
+
+    def handle(self, *args, **options):
+        format = options["format"] or get_format(options["path"])
+        if format is None:
+            raise CommandError(
+                f"Unknown file format, use --format with one of {FORMATS}."
+            )
+        try:
+            file = open(options["path"], encoding="utf-8-sig", newline="")
+        except OSError as exception:
+            raise CommandError(f"Unreadable file: {exception}")
+        with file:
+            result = provision_users(
+                read_rows(file, format),
+                options["batch_size"],
+                options["workers"],
+            )
+
+        for error in result["errors"]:
+            self.stderr.write(
+                f"Row {error['row']}: "
+                + json.dumps(error["errors"], ensure_ascii=False)
+            )
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{result['created']} user(s) created, "
+                f"{len(result['errors'])} row(s) refused."
+            )
+        )
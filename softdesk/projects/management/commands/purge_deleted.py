@@ -0,0 +1,44 @@
+"""
+Management command purging the soft-deleted projects and users.
+"""
+from django.core.management.base import BaseCommand
+from projects.purge import DEFAULT_CHUNK_SIZE, purge_deleted
+from projects.revocation import purge_expired_revocations
+
+
+class Command(BaseCommand):
+    help = (
+        "Purge the soft-deleted projects and users in chunks, and the "
+        "revocations of expired tokens. "
+        "Meant to be run periodically as a background job."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=DEFAULT_CHUNK_SIZE,
+            help="Number of rows deleted or updated per transaction.",
+        )
+        parser.add_argument(
+            "--database",
+            default=None,
+            help="Database to purge, every project database by default.",
+        )
+
+    def handle(self, *args, **options):
+        project_count, user_count = purge_deleted(
+            options["chunk_size"], options["database"]
+        )
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{project_count} project(s) and {user_count} user(s) purged."
+            )
+        )
+        if options["database"] in (None, "default"):
+            revocation_count = purge_expired_revocations()
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"{revocation_count} expired revocation(s) purged."
+                )
+            )
@@ -0,0 +1,229 @@
+"""
+Management command replaying a captured traffic log against this build.
+"""
+import json
+import queue
+import random
+import statistics
+import threading
+import time
+from urllib.parse import urlencode
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.urls import NoReverseMatch, reverse
+from rest_framework.test import APIClient
+from projects.models import Contributor, User
+from projects.capture import ROLES, get_project_id
+from projects.sharding import use_project_shard
+
+#: Body fields filled with the email of the replaying user.
+EMAIL_FIELDS = ("user", "assignee_user", "email")
+
+
+class Command(BaseCommand):
+    help = (
+        "Replay the requests of a traffic log written by the capture "
+        "middleware, in their recorded order and pace, against a seeded "
+        "copy of the database, and report the latency and error deltas of "
+        "each route. Each request runs as a user of the database having "
+        "the recorded role in the project of its URL. Writes are replayed: "
+        "run it against a copy of the database."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("log")
+        parser.add_argument("--concurrency", type=int, default=8)
+        parser.add_argument(
+            "--speed",
+            type=float,
+            default=1.0,
+            help="Time scaling of the recorded pace, 0 to replay at once.",
+        )
+        parser.add_argument("--limit", type=int, default=None)
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument(
+            "--host",
+            default="localhost",
+            help="Host of the replayed requests, one of ALLOWED_HOSTS.",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            with open(options["log"], encoding="utf-8") as log:
+                records = [json.loads(line) for line in log if line.strip()]
+        except (OSError, ValueError) as exception:
+            raise CommandError(f"Unreadable traffic log: {exception}")
+        records.sort(key=lambda record: record["at"])
+        records = records[: options["limit"]]
+        if not records:
+            raise CommandError("The traffic log is empty.")
+
+        self.seed = options["seed"]
+        self.users = {}
+        results = self.replay(records, options)
+        self.report(records, results)
+
+    def replay(self, records, options):
+        """Return the status and duration of each replayed request."""
+        results = [None] * len(records)
+        pending = queue.Queue(maxsize=options["concurrency"] * 2)
+
+        def work():
+            client = APIClient(SERVER_NAME=options["host"])
+            try:
+                while True:
+                    item = pending.get()
+                    if item is None:
+                        return
+                    index, record = item
+                    results[index] = self.send(client, index, record)
+            finally:
+                for connection in connections.all():
+                    connection.close()
+
+        workers = [
+            threading.Thread(target=work)
+            for _ in range(options["concurrency"])
+        ]
+        for worker in workers:
+            worker.start()
+        first_at = records[0]["at"]
+        start = time.monotonic()
+        for index, record in enumerate(records):
+            if options["speed"]:
+                delay = (record["at"] - first_at) / options["speed"]
+                time.sleep(max(0, start + delay - time.monotonic()))
+            pending.put((index, record))
+        for _ in workers:
+            pending.put(None)
+        for worker in workers:
+            worker.join()
+
+        return results
+
+    def send(self, client, index, record):
+        """Replay the record, return its status and duration."""
+        try:
+            path = reverse(record["route"], kwargs=record["kwargs"])
+        except NoReverseMatch:
+            return None
+        project_id = get_project_id(record["route"], record["kwargs"])
+        user = self.get_user(index, record["role"], project_id)
+        client.force_authenticate(user)
+        data = None
+        if record["body"] is not None:
+            data = {
+                name: self.get_body_value(name, value, user)
+                for name, value in record["body"].items()
+            }
+        method = getattr(client, record["method"].lower())
+        start = time.perf_counter()
+        if record["method"] in ("GET", "HEAD", "OPTIONS"):
+            response = method(path, record["query"])
+        else:
+            # The query string stays in the URL, the body is the record's.
+            response = method(
+                f"{path}?{urlencode(record['query'])}", data, format="json"
+            )
+
+        return response.status_code, time.perf_counter() - start
+
+    @staticmethod
+    def get_body_value(name, value, user):
+        """Return the replayed value of a body field of the record."""
+        if name in EMAIL_FIELDS and user is not None:
+            return user.email
+        if isinstance(value, int) and not isinstance(value, bool):
+            return "x" * value
+        return value
+
+    def get_user(self, index, role, project_id):
+        """Return a user of the database having the role, or None."""
+        key = (role, project_id)
+        if key not in self.users:
+            self.users[key] = self.get_user_ids(role, project_id)
+        user_ids = self.users[key]
+        if not user_ids:
+            return None
+        user_id = random.Random(f"{self.seed}:{index}").choice(user_ids)
+
+        return User.objects.get(id=user_id)
+
+    @staticmethod
+    def get_user_ids(role, project_id):
+        """Return the sorted ids of the users having the role."""
+        users = User.objects.filter(is_active=True, is_deleted=False)
+        if role == "anonymous":
+            return []
+        if role == "superuser":
+            users = users.filter(is_superuser=True)
+        else:
+            users = users.filter(is_superuser=False)
+        if role in ROLES.values() or role == "outsider":
+            with use_project_shard(project_id):
+                contributors = list(
+                    Contributor.objects.filter(
+                        project_id=project_id
+                    ).values_list("user_id", "permission")
+                )
+            if role == "outsider":
+                users = users.exclude(id__in=[id for id, _ in contributors])
+            else:
+                return sorted(
+                    id
+                    for id, permission in contributors
+                    if ROLES[permission] == role
+                )
+
+        return sorted(users.values_list("id", flat=True))
+
+    def report(self, records, results):
+        routes = {}
+        for record, result in zip(records, results):
+            route = routes.setdefault(
+                (record["method"], record["route"]),
+                {
+                    "recorded": [],
+                    "replayed": [],
+                    "recorded_errors": 0,
+                    "replayed_errors": 0,
+                    "changed": 0,
+                },
+            )
+            route["recorded"].append(record["duration"])
+            route["recorded_errors"] += record["status"] >= 500
+            if result is None:
+                route["replayed_errors"] += 1
+                route["changed"] += 1
+                continue
+            status, duration = result
+            route["replayed"].append(duration)
+            route["replayed_errors"] += status >= 500
+            route["changed"] += status != record["status"]
+
+        self.stdout.write(
+            f"{'route':<40} {'count':>6} {'p50 rec':>8} {'p50 rep':>8} "
+            f"{'p95 rec':>8} {'p95 rep':>8} {'5xx rec':>7} {'5xx rep':>7} "
+            f"{'changed':>7}"
+        )
+        for (method, name), route in sorted(routes.items()):
+            self.stdout.write(
+                f"{method + ' ' + name:<40} {len(route['recorded']):>6} "
+                f"{get_ms(route['recorded'], 50):>8} "
+                f"{get_ms(route['replayed'], 50):>8} "
+                f"{get_ms(route['recorded'], 95):>8} "
+                f"{get_ms(route['replayed'], 95):>8} "
+                f"{route['recorded_errors']:>7} {route['replayed_errors']:>7} "
+                f"{route['changed']:>7}"
+            )
+
+
+def get_ms(durations, percentile):
+    """Return the percentile of the durations in milliseconds, as text."""
+    if not durations:
+        return "-"
+    if len(durations) == 1:
+        return f"{durations[0] * 1000:.1f}"
+    quantiles = statistics.quantiles(durations, n=100)
+
+    return f"{quantiles[percentile - 1] * 1000:.1f}"
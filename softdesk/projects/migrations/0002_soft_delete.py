@@ -0,0 +1,23 @@
+# Generated by Django 4.0.5 on 2026-10-19 19:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='project',
+            name='is_deleted',
+            field=models.BooleanField(default=False, help_text='Projet supprimé en attente de purge.'),
+        ),
+        migrations.AddField(
+            model_name='user',
+            name='is_deleted',
+            field=models.BooleanField(default=False, help_text='Utilisateur supprimé en attente de purge.'),
+        ),
+    ]
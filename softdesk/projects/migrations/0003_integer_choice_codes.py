@@ -0,0 +1,89 @@
+# Generated by Django 4.0.5 on 2026-10-19 19:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("projects", "0002_soft_delete"),
+    ]
+
+    operations = [
+        # The label fields are made nullable so that the migrations can be
+        # reversed once they are removed.
+        migrations.AlterField(
+            model_name="contributor",
+            name="permission",
+            field=models.CharField(
+                choices=[
+                    ("Responsable", "Responsable"),
+                    ("Contributeur", "Contributeur"),
+                ],
+                max_length=12,
+                null=True,
+            ),
+        ),
+        migrations.AlterField(
+            model_name="issue",
+            name="tag",
+            field=models.CharField(
+                choices=[
+                    ("BUG", "BUG"),
+                    ("AMÉLIORATION", "AMÉLIORATION"),
+                    ("TÂCHE", "TÂCHE"),
+                ],
+                help_text="Balise du problème (BUG, AMÉLIORATION ou TÂCHE).",
+                max_length=12,
+                null=True,
+            ),
+        ),
+        migrations.AlterField(
+            model_name="issue",
+            name="priority",
+            field=models.CharField(
+                choices=[
+                    ("FAIBLE", "FAIBLE"),
+                    ("MOYENNE", "MOYENNE"),
+                    ("ÉLEVÉE", "ÉLEVÉE"),
+                ],
+                help_text="Priorité du problème (FAIBLE, MOYENNE ou ÉLEVÉE).",
+                max_length=7,
+                null=True,
+            ),
+        ),
+        migrations.AlterField(
+            model_name="issue",
+            name="status",
+            field=models.CharField(
+                choices=[
+                    ("À FAIRE", "À FAIRE"),
+                    ("EN COURS", "EN COURS"),
+                    ("TERMINÉ", "TERMINÉ"),
+                ],
+                help_text="Statut du problème (À faire, En cours ou Terminé).",
+                max_length=8,
+                null=True,
+            ),
+        ),
+        migrations.AddField(
+            model_name="contributor",
+            name="permission_code",
+            field=models.PositiveSmallIntegerField(null=True),
+        ),
+        migrations.AddField(
+            model_name="issue",
+            name="tag_code",
+            field=models.PositiveSmallIntegerField(null=True),
+        ),
+        migrations.AddField(
+            model_name="issue",
+            name="priority_code",
+            field=models.PositiveSmallIntegerField(null=True),
+        ),
+        migrations.AddField(
+            model_name="issue",
+            name="status_code",
+            field=models.PositiveSmallIntegerField(null=True),
+        ),
+    ]
@@ -0,0 +1,77 @@
+"""
+Convert the choice labels of contributors and issues to integer codes.
+
+Rows are converted by primary key ranges, one transaction per chunk, so the
+write lock is released between chunks on large tables.
+"""
+from django.db import migrations, transaction
+from django.db.models import Case, Max, Value, When
+
+CHUNK_SIZE = 5000
+
+CODES = {
+    "Contributor": {
+        "permission": {"Responsable": 1, "Contributeur": 2},
+    },
+    "Issue": {
+        "tag": {"BUG": 1, "AMÉLIORATION": 2, "TÂCHE": 3},
+        "priority": {"FAIBLE": 1, "MOYENNE": 2, "ÉLEVÉE": 3},
+        "status": {"À FAIRE": 1, "EN COURS": 2, "TERMINÉ": 3},
+    },
+}
+
+
+def convert_in_chunks(model, updates):
+    last_id = model.objects.aggregate(last_id=Max("id"))["last_id"] or 0
+    for start in range(0, last_id + 1, CHUNK_SIZE):
+        with transaction.atomic():
+            model.objects.filter(
+                id__gte=start, id__lt=start + CHUNK_SIZE
+            ).update(**updates)
+
+
+def labels_to_codes(apps, schema_editor):
+    for model_name, fields in CODES.items():
+        model = apps.get_model("projects", model_name)
+        convert_in_chunks(
+            model,
+            {
+                f"{field}_code": Case(
+                    *[
+                        When(**{field: label}, then=Value(code))
+                        for label, code in codes.items()
+                    ]
+                )
+                for field, codes in fields.items()
+            },
+        )
+
+
+def codes_to_labels(apps, schema_editor):
+    for model_name, fields in CODES.items():
+        model = apps.get_model("projects", model_name)
+        convert_in_chunks(
+            model,
+            {
+                field: Case(
+                    *[
+                        When(**{f"{field}_code": code}, then=Value(label))
+                        for label, code in codes.items()
+                    ]
+                )
+                for field, codes in fields.items()
+            },
+        )
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ("projects", "0003_integer_choice_codes"),
+    ]
+
+    operations = [
+        migrations.RunPython(labels_to_codes, codes_to_labels),
+    ]
@@ -0,0 +1,62 @@
+# Generated by Django 4.0.5 on 2026-10-19 19:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("projects", "0004_convert_choice_labels"),
+    ]
+
+    operations = [
+        migrations.RemoveField(model_name="contributor", name="permission"),
+        migrations.RemoveField(model_name="issue", name="tag"),
+        migrations.RemoveField(model_name="issue", name="priority"),
+        migrations.RemoveField(model_name="issue", name="status"),
+        migrations.RenameField(
+            model_name="contributor",
+            old_name="permission_code",
+            new_name="permission",
+        ),
+        migrations.RenameField(
+            model_name="issue", old_name="tag_code", new_name="tag"
+        ),
+        migrations.RenameField(
+            model_name="issue", old_name="priority_code", new_name="priority"
+        ),
+        migrations.RenameField(
+            model_name="issue", old_name="status_code", new_name="status"
+        ),
+        migrations.AlterField(
+            model_name="contributor",
+            name="permission",
+            field=models.PositiveSmallIntegerField(
+                choices=[(1, "Responsable"), (2, "Contributeur")]
+            ),
+        ),
+        migrations.AlterField(
+            model_name="issue",
+            name="tag",
+            field=models.PositiveSmallIntegerField(
+                choices=[(1, "BUG"), (2, "AMÉLIORATION"), (3, "TÂCHE")],
+                help_text="Balise du problème (BUG, AMÉLIORATION ou TÂCHE).",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="issue",
+            name="priority",
+            field=models.PositiveSmallIntegerField(
+                choices=[(1, "FAIBLE"), (2, "MOYENNE"), (3, "ÉLEVÉE")],
+                help_text="Priorité du problème (FAIBLE, MOYENNE ou ÉLEVÉE).",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="issue",
+            name="status",
+            field=models.PositiveSmallIntegerField(
+                choices=[(1, "À FAIRE"), (2, "EN COURS"), (3, "TERMINÉ")],
+                help_text="Statut du problème (À faire, En cours ou Terminé).",
+            ),
+        ),
+    ]
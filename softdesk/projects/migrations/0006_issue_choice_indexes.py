@@ -0,0 +1,28 @@
+# Generated by Django 4.0.5 on 2026-10-19 19:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0005_replace_choice_labels'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='issue',
+            name='priority',
+            field=models.PositiveSmallIntegerField(choices=[(1, 'FAIBLE'), (2, 'MOYENNE'), (3, 'ÉLEVÉE')], db_index=True, help_text='Priorité du problème (FAIBLE, MOYENNE ou ÉLEVÉE).'),
+        ),
+        migrations.AlterField(
+            model_name='issue',
+            name='status',
+            field=models.PositiveSmallIntegerField(choices=[(1, 'À FAIRE'), (2, 'EN COURS'), (3, 'TERMINÉ')], db_index=True, help_text='Statut du problème (À faire, En cours ou Terminé).'),
+        ),
+        migrations.AlterField(
+            model_name='issue',
+            name='tag',
+            field=models.PositiveSmallIntegerField(choices=[(1, 'BUG'), (2, 'AMÉLIORATION'), (3, 'TÂCHE')], db_index=True, help_text='Balise du problème (BUG, AMÉLIORATION ou TÂCHE).'),
+        ),
+    ]
@@ -0,0 +1,63 @@
+# Generated by Django 4.0.5 on 2026-10-19 20:10
+
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+import django.db.models.deletion
+
+
+def copy_issue_project(apps, schema_editor):
+    Comment = apps.get_model("projects", "Comment")
+    Issue = apps.get_model("projects", "Issue")
+    Comment.objects.update(
+        project_id=Subquery(
+            Issue.objects.filter(id=OuterRef("issue_id")).values(
+                "project_id"
+            )[:1]
+        )
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("projects", "0006_issue_choice_indexes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="comment",
+            name="project",
+            field=models.ForeignKey(
+                editable=False,
+                help_text="Projet du problème, copié pour filtrer sans jointure.",
+                null=True,
+                on_delete=django.db.models.deletion.CASCADE,
+                to="projects.project",
+            ),
+        ),
+        migrations.RunPython(copy_issue_project, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name="comment",
+            name="project",
+            field=models.ForeignKey(
+                editable=False,
+                help_text="Projet du problème, copié pour filtrer sans jointure.",
+                on_delete=django.db.models.deletion.CASCADE,
+                to="projects.project",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="comment",
+            index=models.Index(
+                fields=["project", "-created_time", "-id"],
+                name="projects_co_project_a035de_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="issue",
+            index=models.Index(
+                fields=["project", "-created_time", "-id"],
+                name="projects_is_project_25b352_idx",
+            ),
+        ),
+    ]
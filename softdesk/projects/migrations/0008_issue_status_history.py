@@ -0,0 +1,60 @@
+# Generated by Django 4.0.5 on 2026-10-19 19:37
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0007_comment_project'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='IssueStatusRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('from_status', models.PositiveSmallIntegerField(choices=[(1, 'À FAIRE'), (2, 'EN COURS'), (3, 'TERMINÉ')])),
+                ('to_status', models.PositiveSmallIntegerField(choices=[(1, 'À FAIRE'), (2, 'EN COURS'), (3, 'TERMINÉ')])),
+                ('tag', models.PositiveSmallIntegerField(choices=[(1, 'BUG'), (2, 'AMÉLIORATION'), (3, 'TÂCHE')])),
+                ('priority', models.PositiveSmallIntegerField(choices=[(1, 'FAIBLE'), (2, 'MOYENNE'), (3, 'ÉLEVÉE')])),
+                ('bucket', models.PositiveSmallIntegerField(help_text='Tranche de durée passée dans le statut quitté.')),
+                ('count', models.PositiveIntegerField(default=0)),
+                ('duration_sum', models.FloatField(default=0, help_text='Somme des durées en secondes.')),
+                ('project', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='projects.project')),
+            ],
+            options={
+                'ordering': ['day'],
+            },
+        ),
+        migrations.CreateModel(
+            name='IssueStatusChange',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('from_status', models.PositiveSmallIntegerField(choices=[(1, 'À FAIRE'), (2, 'EN COURS'), (3, 'TERMINÉ')], help_text='Statut quitté.')),
+                ('to_status', models.PositiveSmallIntegerField(choices=[(1, 'À FAIRE'), (2, 'EN COURS'), (3, 'TERMINÉ')], help_text='Nouveau statut.')),
+                ('created_time', models.DateTimeField(auto_now_add=True)),
+                ('author_user', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL)),
+                ('issue', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='projects.issue')),
+                ('project', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='projects.project')),
+            ],
+            options={
+                'ordering': ['-created_time'],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='issuestatusrollup',
+            constraint=models.UniqueConstraint(fields=('project', 'day', 'from_status', 'to_status', 'tag', 'priority', 'bucket'), name='unique_issue_status_rollup'),
+        ),
+        migrations.AddIndex(
+            model_name='issuestatuschange',
+            index=models.Index(fields=['issue', '-created_time'], name='projects_is_issue_i_e477fc_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='issuestatuschange',
+            index=models.Index(fields=['project', '-created_time', '-id'], name='projects_is_project_9d598f_idx'),
+        ),
+    ]
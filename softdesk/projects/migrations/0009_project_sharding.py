@@ -0,0 +1,81 @@
+# Generated by Django 4.0.5 on 2026-10-19 19:39
+
+from django.conf import settings
+from django.core.management.color import no_style
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def place_existing_projects(apps, schema_editor):
+    using = schema_editor.connection.alias
+    Project = apps.get_model("projects", "Project")
+    ProjectPlacement = apps.get_model("projects", "ProjectPlacement")
+    ProjectPlacement.objects.using(using).bulk_create(
+        [
+            ProjectPlacement(id=project_id, shard=using)
+            for project_id in Project.objects.using(using).values_list(
+                "id", flat=True
+            )
+        ],
+        batch_size=1000,
+    )
+    # New projects take their ids from the placements, past the existing
+    # ones. Explicit ids don't move the sequence on every database.
+    connection = schema_editor.connection
+    with connection.cursor() as cursor:
+        for sql in connection.ops.sequence_reset_sql(
+            no_style(), [ProjectPlacement]
+        ):
+            cursor.execute(sql)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0008_issue_status_history'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProjectPlacement',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('shard', models.CharField(help_text='Base de données du projet.', max_length=64)),
+            ],
+        ),
+        migrations.AlterField(
+            model_name='comment',
+            name='author_user',
+            field=models.ForeignKey(db_constraint=False, null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AlterField(
+            model_name='contributor',
+            name='user',
+            field=models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AlterField(
+            model_name='issue',
+            name='assignee_user',
+            field=models.ForeignKey(db_constraint=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='Issue_assignee_user', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AlterField(
+            model_name='issue',
+            name='author_user',
+            field=models.ForeignKey(db_constraint=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='Issue_author_user', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AlterField(
+            model_name='issuestatuschange',
+            name='author_user',
+            field=models.ForeignKey(db_constraint=False, null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AlterField(
+            model_name='project',
+            name='author_user',
+            field=models.ForeignKey(db_constraint=False, null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.RunPython(
+            place_existing_projects,
+            migrations.RunPython.noop,
+            hints={"model_name": "projectplacement"},
+        ),
+    ]
@@ -0,0 +1,185 @@
+"""
+Enforce the project rules of issue assignees and comments in the database.
+
+An issue can only be assigned to a contributor of its project and a comment
+must belong to the project of its issue. Triggers check both in the insert
+or update statement itself, and removing a contributor unassigns their
+issues of the project.
+"""
+from django.db import migrations
+
+UNASSIGN_FORMER_CONTRIBUTORS = """
+UPDATE projects_issue SET assignee_user_id = NULL
+WHERE assignee_user_id IS NOT NULL AND NOT EXISTS (
+    SELECT 1 FROM projects_contributor
+    WHERE project_id = projects_issue.project_id
+    AND user_id = projects_issue.assignee_user_id
+)
+"""
+
+ASSIGNEE_IS_NOT_CONTRIBUTOR = """
+NEW.assignee_user_id IS NOT NULL AND NOT EXISTS (
+    SELECT 1 FROM projects_contributor
+    WHERE project_id = NEW.project_id AND user_id = NEW.assignee_user_id
+)
+"""
+
+ISSUE_IS_NOT_IN_PROJECT = """
+NOT EXISTS (
+    SELECT 1 FROM projects_issue
+    WHERE id = NEW.issue_id AND project_id = NEW.project_id
+)
+"""
+
+UNASSIGN_CONTRIBUTOR = """
+UPDATE projects_issue SET assignee_user_id = NULL
+WHERE project_id = OLD.project_id AND assignee_user_id = OLD.user_id;
+"""
+
+SQLITE_TRIGGERS = [
+    f"""
+    CREATE TRIGGER projects_issue_assignee_insert
+    BEFORE INSERT ON projects_issue
+    WHEN {ASSIGNEE_IS_NOT_CONTRIBUTOR}
+    BEGIN SELECT RAISE(ABORT, 'issue_assignee_not_contributor'); END
+    """,
+    f"""
+    CREATE TRIGGER projects_issue_assignee_update
+    BEFORE UPDATE OF assignee_user_id, project_id ON projects_issue
+    WHEN (
+        NEW.assignee_user_id IS NOT OLD.assignee_user_id
+        OR NEW.project_id IS NOT OLD.project_id
+    ) AND {ASSIGNEE_IS_NOT_CONTRIBUTOR}
+    BEGIN SELECT RAISE(ABORT, 'issue_assignee_not_contributor'); END
+    """,
+    f"""
+    CREATE TRIGGER projects_comment_issue_insert
+    BEFORE INSERT ON projects_comment
+    WHEN {ISSUE_IS_NOT_IN_PROJECT}
+    BEGIN SELECT RAISE(ABORT, 'comment_issue_not_in_project'); END
+    """,
+    f"""
+    CREATE TRIGGER projects_comment_issue_update
+    BEFORE UPDATE OF issue_id, project_id ON projects_comment
+    WHEN (
+        NEW.issue_id IS NOT OLD.issue_id
+        OR NEW.project_id IS NOT OLD.project_id
+    ) AND {ISSUE_IS_NOT_IN_PROJECT}
+    BEGIN SELECT RAISE(ABORT, 'comment_issue_not_in_project'); END
+    """,
+    f"""
+    CREATE TRIGGER projects_contributor_unassign
+    AFTER DELETE ON projects_contributor
+    BEGIN {UNASSIGN_CONTRIBUTOR} END
+    """,
+]
+
+POSTGRESQL_TRIGGERS = [
+    f"""
+    CREATE FUNCTION projects_issue_assignee_check() RETURNS trigger AS $$
+    BEGIN
+        IF TG_OP = 'UPDATE'
+        AND NEW.assignee_user_id IS NOT DISTINCT FROM OLD.assignee_user_id
+        AND NEW.project_id = OLD.project_id THEN
+            RETURN NEW;
+        END IF;
+        IF {ASSIGNEE_IS_NOT_CONTRIBUTOR} THEN
+            RAISE EXCEPTION 'issue_assignee_not_contributor'
+            USING ERRCODE = 'foreign_key_violation';
+        END IF;
+        RETURN NEW;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE TRIGGER projects_issue_assignee
+    BEFORE INSERT OR UPDATE OF assignee_user_id, project_id
+    ON projects_issue
+    FOR EACH ROW EXECUTE FUNCTION projects_issue_assignee_check()
+    """,
+    f"""
+    CREATE FUNCTION projects_comment_issue_check() RETURNS trigger AS $$
+    BEGIN
+        IF TG_OP = 'UPDATE'
+        AND NEW.issue_id = OLD.issue_id
+        AND NEW.project_id = OLD.project_id THEN
+            RETURN NEW;
+        END IF;
+        IF {ISSUE_IS_NOT_IN_PROJECT} THEN
+            RAISE EXCEPTION 'comment_issue_not_in_project'
+            USING ERRCODE = 'foreign_key_violation';
+        END IF;
+        RETURN NEW;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE TRIGGER projects_comment_issue
+    BEFORE INSERT OR UPDATE OF issue_id, project_id ON projects_comment
+    FOR EACH ROW EXECUTE FUNCTION projects_comment_issue_check()
+    """,
+    f"""
+    CREATE FUNCTION projects_contributor_unassign() RETURNS trigger AS $$
+    BEGIN
+        {UNASSIGN_CONTRIBUTOR}
+        RETURN OLD;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE TRIGGER projects_contributor_unassign
+    AFTER DELETE ON projects_contributor
+    FOR EACH ROW EXECUTE FUNCTION projects_contributor_unassign()
+    """,
+]
+
+SQLITE_DROPS = [
+    "DROP TRIGGER projects_issue_assignee_insert",
+    "DROP TRIGGER projects_issue_assignee_update",
+    "DROP TRIGGER projects_comment_issue_insert",
+    "DROP TRIGGER projects_comment_issue_update",
+    "DROP TRIGGER projects_contributor_unassign",
+]
+
+POSTGRESQL_DROPS = [
+    "DROP TRIGGER projects_issue_assignee ON projects_issue",
+    "DROP FUNCTION projects_issue_assignee_check()",
+    "DROP TRIGGER projects_comment_issue ON projects_comment",
+    "DROP FUNCTION projects_comment_issue_check()",
+    "DROP TRIGGER projects_contributor_unassign ON projects_contributor",
+    "DROP FUNCTION projects_contributor_unassign()",
+]
+
+
+def create_triggers(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor not in ("sqlite", "postgresql"):
+        return
+    schema_editor.execute(UNASSIGN_FORMER_CONTRIBUTORS)
+    triggers = SQLITE_TRIGGERS if vendor == "sqlite" else POSTGRESQL_TRIGGERS
+    for sql in triggers:
+        schema_editor.execute(sql)
+
+
+def drop_triggers(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor not in ("sqlite", "postgresql"):
+        return
+    for sql in SQLITE_DROPS if vendor == "sqlite" else POSTGRESQL_DROPS:
+        schema_editor.execute(sql)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("projects", "0009_project_sharding"),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            create_triggers,
+            drop_triggers,
+            # Routed with the project tables, onto every shard.
+            hints={"model_name": "issue"},
+        ),
+    ]
@@ -0,0 +1,61 @@
+# Generated by Django 4.0.5 on 2026-10-19 19:58
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0011_revoked_token'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='issuestatuschange',
+            name='issue',
+            field=models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.CASCADE, to='projects.issue'),
+        ),
+        migrations.CreateModel(
+            name='ArchivedIssue',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('title', models.CharField(help_text='Titre du problème.', max_length=128)),
+                ('desc', models.CharField(help_text='Description du problème.', max_length=2048)),
+                ('tag', models.PositiveSmallIntegerField(choices=[(1, 'BUG'), (2, 'AMÉLIORATION'), (3, 'TÂCHE')])),
+                ('priority', models.PositiveSmallIntegerField(choices=[(1, 'FAIBLE'), (2, 'MOYENNE'), (3, 'ÉLEVÉE')])),
+                ('status', models.PositiveSmallIntegerField(choices=[(1, 'À FAIRE'), (2, 'EN COURS'), (3, 'TERMINÉ')])),
+                ('created_time', models.DateTimeField()),
+                ('archived_time', models.DateTimeField(help_text="Date du déplacement du problème dans l'archive.")),
+                ('assignee_user', models.ForeignKey(db_constraint=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='ArchivedIssue_assignee_user', to=settings.AUTH_USER_MODEL)),
+                ('author_user', models.ForeignKey(db_constraint=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='ArchivedIssue_author_user', to=settings.AUTH_USER_MODEL)),
+                ('project', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='projects.project')),
+            ],
+            options={
+                'ordering': ['-created_time'],
+            },
+        ),
+        migrations.CreateModel(
+            name='ArchivedComment',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('description', models.CharField(help_text='Description du commentaire.', max_length=2048)),
+                ('created_time', models.DateTimeField()),
+                ('author_user', models.ForeignKey(db_constraint=False, null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL)),
+                ('issue', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='projects.archivedissue')),
+                ('project', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='projects.project')),
+            ],
+            options={
+                'ordering': ['-created_time'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='archivedissue',
+            index=models.Index(fields=['project', '-created_time', '-id'], name='projects_ar_project_38ea95_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='archivedcomment',
+            index=models.Index(fields=['issue', '-created_time'], name='projects_ar_issue_i_a643f8_idx'),
+        ),
+    ]
@@ -0,0 +1,49 @@
+# Generated by Django 4.0.5 on 2026-10-19 20:01
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def index_existing_users(apps, schema_editor):
+    from projects.lookup import get_user_terms
+
+    User = apps.get_model("projects", "User")
+    UserLookupTerm = apps.get_model("projects", "UserLookupTerm")
+    terms = []
+    for user in User.objects.iterator(chunk_size=1000):
+        terms.extend(
+            UserLookupTerm(user_id=user.id, term=term)
+            for term in get_user_terms(user)
+        )
+        if len(terms) >= 1000:
+            UserLookupTerm.objects.bulk_create(terms)
+            terms = []
+    UserLookupTerm.objects.bulk_create(terms)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0012_issue_archive'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserLookupTerm',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('term', models.CharField(max_length=128)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='lookup_terms', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='userlookupterm',
+            index=models.Index(fields=['term', 'user'], name='projects_us_term_100960_idx'),
+        ),
+        migrations.RunPython(
+            index_existing_users,
+            migrations.RunPython.noop,
+            hints={"model_name": "userlookupterm"},
+        ),
+    ]
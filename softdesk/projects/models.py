@@ -49,6 +49,10 @@ class User(AbstractUser):
     email = models.EmailField(_("email address"), unique=True)
     first_name = models.CharField(max_length=128)
     last_name = models.CharField(max_length=128)
+    is_deleted = models.BooleanField(
+        default=False,
+        help_text="Utilisateur supprimé en attente de purge.",
+    )
 
     USERNAME_FIELD = "email"
     REQUIRED_FIELDS = []
@@ -68,6 +72,27 @@ class User(AbstractUser):
         return f"{self.id}, {self.email}"
 
 
+class UserLookupTerm(models.Model):
+    """
+    User lookup term model.
+
+    Normalized word of the email or of the names of a user, searched by
+    prefix on its index by the user lookup and the admin search.
+    """
+
+    user = models.ForeignKey(
+        User, on_delete=models.CASCADE, related_name="lookup_terms"
+    )
+    term = models.CharField(max_length=128)
+
+    class Meta:
+        indexes = [models.Index(fields=["term", "user"])]
+
+    def __str__(self):
+        """String for representing the Model object."""
+        return f"user: {self.user_id}, {self.term}"
+
+
 class Project(models.Model):
     """Project model."""
 
@@ -87,7 +112,12 @@ class Project(models.Model):
         choices=PROJECT_TYPE_CHOICES,
         help_text="Type du projet (back-end, front-end, iOS ou Android).",
     )
-    author_user = models.ForeignKey(User, null=True, on_delete=models.SET_NULL)
+    author_user = models.ForeignKey(
+        User, null=True, on_delete=models.SET_NULL, db_constraint=False
+    )
+    is_deleted = models.BooleanField(
+        default=False, help_text="Projet supprimé en attente de purge."
+    )
 
     class Meta:
         ordering = ["pk"]
@@ -102,18 +132,38 @@ class Project(models.Model):
         return self.pk
 
 
+class ProjectPlacement(models.Model):
+    """
+    Project placement model.
+
+    When sharding is enabled, the id of the placement is the id of the
+    project and the placement tells which shard database holds the project.
+    """
+
+    shard = models.CharField(
+        max_length=64, help_text="Base de données du projet."
+    )
+
+    def __str__(self):
+        """String for representing the Model object."""
+        return f"project: {self.id}, shard: {self.shard}"
+
+
 class Contributor(models.Model):
     """Contributor model."""
 
+    RESPONSIBLE = 1
+    CONTRIBUTOR = 2
     PERMISSION_CHOICES = [
-        ("Responsable", "Responsable"),
-        ("Contributeur", "Contributeur"),
+        (RESPONSIBLE, "Responsable"),
+        (CONTRIBUTOR, "Contributeur"),
     ]
 
-    user = models.ForeignKey(User, on_delete=models.CASCADE)
+    user = models.ForeignKey(
+        User, on_delete=models.CASCADE, db_constraint=False
+    )
     project = models.ForeignKey(Project, on_delete=models.CASCADE)
-    permission = models.CharField(
-        max_length=12,
+    permission = models.PositiveSmallIntegerField(
         choices=PERMISSION_CHOICES,
     )
     role = models.CharField(
@@ -135,38 +185,47 @@ class Contributor(models.Model):
 class Issue(models.Model):
     """Issue model."""
 
+    BUG = 1
+    IMPROVEMENT = 2
+    TASK = 3
     ISSUE_TAG = [
-        ("BUG", "BUG"),
-        ("AMÉLIORATION", "AMÉLIORATION"),
-        ("TÂCHE", "TÂCHE"),
+        (BUG, "BUG"),
+        (IMPROVEMENT, "AMÉLIORATION"),
+        (TASK, "TÂCHE"),
     ]
+    LOW = 1
+    MEDIUM = 2
+    HIGH = 3
     ISSUE_PRIORITY = [
-        ("FAIBLE", "FAIBLE"),
-        ("MOYENNE", "MOYENNE"),
-        ("ÉLEVÉE", "ÉLEVÉE"),
+        (LOW, "FAIBLE"),
+        (MEDIUM, "MOYENNE"),
+        (HIGH, "ÉLEVÉE"),
     ]
+    TO_DO = 1
+    IN_PROGRESS = 2
+    DONE = 3
     ISSUE_STATUS = [
-        ("À FAIRE", "À FAIRE"),
-        ("EN COURS", "EN COURS"),
-        ("TERMINÉ", "TERMINÉ"),
+        (TO_DO, "À FAIRE"),
+        (IN_PROGRESS, "EN COURS"),
+        (DONE, "TERMINÉ"),
     ]
 
     title = models.CharField(max_length=128, help_text="Titre du problème.")
     desc = models.CharField(
         max_length=2048, help_text="Description du problème."
     )
-    tag = models.CharField(
-        max_length=12,
+    tag = models.PositiveSmallIntegerField(
+        db_index=True,
         choices=ISSUE_TAG,
         help_text="Balise du problème (BUG, AMÉLIORATION ou TÂCHE).",
     )
-    priority = models.CharField(
-        max_length=7,
+    priority = models.PositiveSmallIntegerField(
+        db_index=True,
         choices=ISSUE_PRIORITY,
         help_text="Priorité du problème (FAIBLE, MOYENNE ou ÉLEVÉE).",
     )
-    status = models.CharField(
-        max_length=8,
+    status = models.PositiveSmallIntegerField(
+        db_index=True,
         choices=ISSUE_STATUS,
         help_text="Statut du problème (À faire, En cours ou Terminé).",
     )
@@ -176,17 +235,22 @@ class Issue(models.Model):
         null=True,
         on_delete=models.SET_NULL,
         related_name="Issue_author_user",
+        db_constraint=False,
     )
     assignee_user = models.ForeignKey(
         User,
         null=True,
         on_delete=models.SET_NULL,
         related_name="Issue_assignee_user",
+        db_constraint=False,
     )
     created_time = models.DateTimeField(auto_now_add=True)
 
     class Meta:
         ordering = ["-created_time"]
+        indexes = [
+            models.Index(fields=["project", "-created_time", "-id"])
+        ]
 
     def __str__(self):
         """String for representing the Model object."""
@@ -199,18 +263,216 @@ class Comment(models.Model):
     description = models.CharField(
         max_length=2048, help_text="Description du commentaire."
     )
-    author_user = models.ForeignKey(User, null=True, on_delete=models.SET_NULL)
+    author_user = models.ForeignKey(
+        User, null=True, on_delete=models.SET_NULL, db_constraint=False
+    )
     issue = models.ForeignKey(Issue, on_delete=models.CASCADE)
+    project = models.ForeignKey(
+        Project,
+        on_delete=models.CASCADE,
+        editable=False,
+        help_text="Projet du problème, copié pour filtrer sans jointure.",
+    )
     created_time = models.DateTimeField(auto_now_add=True)
 
     class Meta:
         ordering = ["-created_time"]
+        indexes = [
+            models.Index(fields=["project", "-created_time", "-id"])
+        ]
 
     def __str__(self):
         """String for representing the Model object."""
         return f"comment: {self.id}; issue: {self.issue}"
 
+    def save(self, *args, **kwargs):
+        """Copy the project of the issue before saving the comment."""
+        if self.project_id is None:
+            self.project_id = self.issue.project_id
+        super().save(*args, **kwargs)
+
+    @property
+    def comment_id(self):
+        """Return pk attribut of the object."""
+        return self.pk
+
+
+class ArchivedIssue(models.Model):
+    """
+    Archived issue model.
+
+    Finished issue moved out of the issue table by the "archive_issues"
+    command, keeping its id. Archived issues are read only.
+    """
+
+    id = models.BigIntegerField(primary_key=True)
+    title = models.CharField(max_length=128, help_text="Titre du problème.")
+    desc = models.CharField(
+        max_length=2048, help_text="Description du problème."
+    )
+    tag = models.PositiveSmallIntegerField(choices=Issue.ISSUE_TAG)
+    priority = models.PositiveSmallIntegerField(choices=Issue.ISSUE_PRIORITY)
+    status = models.PositiveSmallIntegerField(choices=Issue.ISSUE_STATUS)
+    project = models.ForeignKey(Project, on_delete=models.CASCADE)
+    author_user = models.ForeignKey(
+        User,
+        null=True,
+        on_delete=models.SET_NULL,
+        related_name="ArchivedIssue_author_user",
+        db_constraint=False,
+    )
+    assignee_user = models.ForeignKey(
+        User,
+        null=True,
+        on_delete=models.SET_NULL,
+        related_name="ArchivedIssue_assignee_user",
+        db_constraint=False,
+    )
+    created_time = models.DateTimeField()
+    archived_time = models.DateTimeField(
+        help_text="Date du déplacement du problème dans l'archive."
+    )
+
+    class Meta:
+        ordering = ["-created_time"]
+        indexes = [
+            models.Index(fields=["project", "-created_time", "-id"])
+        ]
+
+    def __str__(self):
+        """String for representing the Model object."""
+        return f"archived issue: {self.id}, {self.title}"
+
+
+class ArchivedComment(models.Model):
+    """Archived comment model, comment of an archived issue."""
+
+    id = models.BigIntegerField(primary_key=True)
+    description = models.CharField(
+        max_length=2048, help_text="Description du commentaire."
+    )
+    author_user = models.ForeignKey(
+        User, null=True, on_delete=models.SET_NULL, db_constraint=False
+    )
+    issue = models.ForeignKey(ArchivedIssue, on_delete=models.CASCADE)
+    project = models.ForeignKey(Project, on_delete=models.CASCADE)
+    created_time = models.DateTimeField()
+
+    class Meta:
+        ordering = ["-created_time"]
+        indexes = [models.Index(fields=["issue", "-created_time"])]
+
+    def __str__(self):
+        """String for representing the Model object."""
+        return f"archived comment: {self.id}; issue: {self.issue_id}"
+
     @property
     def comment_id(self):
         """Return pk attribut of the object."""
         return self.pk
+
+
+class IssueStatusChange(models.Model):
+    """Issue status transition model."""
+
+    # Without constraint, the transitions of an issue stay in the history
+    # when it is moved to the archive.
+    issue = models.ForeignKey(
+        Issue, on_delete=models.CASCADE, db_constraint=False
+    )
+    project = models.ForeignKey(Project, on_delete=models.CASCADE)
+    from_status = models.PositiveSmallIntegerField(
+        choices=Issue.ISSUE_STATUS, help_text="Statut quitté."
+    )
+    to_status = models.PositiveSmallIntegerField(
+        choices=Issue.ISSUE_STATUS, help_text="Nouveau statut."
+    )
+    author_user = models.ForeignKey(
+        User, null=True, on_delete=models.SET_NULL, db_constraint=False
+    )
+    created_time = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ["-created_time"]
+        indexes = [
+            models.Index(fields=["issue", "-created_time"]),
+            models.Index(fields=["project", "-created_time", "-id"]),
+        ]
+
+    def __str__(self):
+        """String for representing the Model object."""
+        return (
+            f"issue: {self.issue_id}, "
+            f"{self.get_from_status_display()} -> "
+            f"{self.get_to_status_display()}"
+        )
+
+
+class IssueStatusRollup(models.Model):
+    """
+    Daily rollup of the issue status transitions of a project.
+
+    Each row counts the transitions of one day between two statuses, for
+    issues of one tag and priority, whose time spent in the left status
+    falls in one duration bucket.
+    """
+
+    project = models.ForeignKey(Project, on_delete=models.CASCADE)
+    day = models.DateField()
+    from_status = models.PositiveSmallIntegerField(choices=Issue.ISSUE_STATUS)
+    to_status = models.PositiveSmallIntegerField(choices=Issue.ISSUE_STATUS)
+    tag = models.PositiveSmallIntegerField(choices=Issue.ISSUE_TAG)
+    priority = models.PositiveSmallIntegerField(choices=Issue.ISSUE_PRIORITY)
+    bucket = models.PositiveSmallIntegerField(
+        help_text="Tranche de durée passée dans le statut quitté."
+    )
+    count = models.PositiveIntegerField(default=0)
+    duration_sum = models.FloatField(
+        default=0, help_text="Somme des durées en secondes."
+    )
+
+    class Meta:
+        ordering = ["day"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=[
+                    "project",
+                    "day",
+                    "from_status",
+                    "to_status",
+                    "tag",
+                    "priority",
+                    "bucket",
+                ],
+                name="unique_issue_status_rollup",
+            )
+        ]
+
+    def __str__(self):
+        """String for representing the Model object."""
+        return f"project: {self.project_id}, day: {self.day}"
+
+
+class RevokedToken(models.Model):
+    """
+    Revoked token model.
+
+    Revokes the token of the jti, or when the jti is empty every token of
+    the user issued before the revocation.
+    """
+
+    jti = models.CharField(max_length=255, blank=True, db_index=True)
+    user = models.ForeignKey(
+        User, null=True, on_delete=models.CASCADE, db_constraint=False
+    )
+    created_time = models.DateTimeField(auto_now_add=True)
+    expires_at = models.DateTimeField(
+        help_text="Date après laquelle les jetons révoqués ont expiré."
+    )
+
+    class Meta:
+        ordering = ["id"]
+
+    def __str__(self):
+        """String for representing the Model object."""
+        return f"jti: {self.jti or '*'}, user: {self.user_id}"
@@ -2,7 +2,8 @@
 Custom permissions.
 """
 from rest_framework import permissions
-from .models import Comment, Contributor, Issue
+from rest_framework.exceptions import NotFound
+from .models import Contributor
 from .checker import check_project_exist_in_db
 
 
@@ -20,6 +21,43 @@ class IsAuthor(permissions.BasePermission):
         return False
 
 
+def get_membership_cache(request):
+    """
+    Return the project memberships of the connected user already fetched
+    for this request.
+
+    The cache lives on the Django request, so it is shared by every
+    permission checked during the request and by the sub-requests of a
+    batch.
+    """
+    http_request = getattr(request, "_request", request)
+    try:
+        return http_request.membership_cache
+    except AttributeError:
+        http_request.membership_cache = {}
+        return http_request.membership_cache
+
+
+def get_connected_contributor(request, project_id):
+    """
+    Return the contributor object of the connected user for the project,
+    or None if the user isn't a contributor of the project.
+    """
+    try:
+        project_id = int(project_id)
+    except (TypeError, ValueError):
+        raise NotFound("Le numéro de projet indiqué n'est pas un numéro.")
+    cache = get_membership_cache(request)
+    if project_id not in cache:
+        cache[project_id] = Contributor.objects.filter(
+            project_id=project_id,
+            user_id=request.user.id,
+            project__is_deleted=False,
+        ).first()
+
+    return cache[project_id]
+
+
 class IsContributor(permissions.BasePermission):
     """Custom permission to check if connected user is project contributor."""
 
@@ -31,37 +69,22 @@ class IsContributor(permissions.BasePermission):
         if request.user.is_superuser:
             return True
 
-        project_id = None
         if view.basename == "project" and view.detail is False:
             return True
         if view.basename == "project" and view.detail is True:
             project_id = request.parser_context["kwargs"]["pk"]
-        if view.basename != "project":
+        else:
             project_id = request.parser_context["kwargs"]["project_pk"]
+        if get_connected_contributor(request, project_id):
+            return True
         check_project_exist_in_db(project_id)
-        if project_id:
-            try:
-                if Contributor.objects.filter(
-                    project_id=int(project_id), user_id=request.user.id
-                ):
-                    return True
-            except Contributor.DoesNotExist:
-                return False
 
         return False
 
     def has_object_permission(self, request, view, obj):
         if request.user.is_superuser:
             return True
-        if type(obj) == Comment:
-            issue_id = obj.issue_id
-            issue = Issue.objects.get(id=issue_id)
-            project_id = issue.project_id
-        else:
-            project_id = obj.project_id
-        if Contributor.objects.filter(
-            project_id=int(project_id), user_id=request.user.id
-        ):
+        if get_connected_contributor(request, obj.project_id):
             return True
 
         return False
@@ -79,17 +102,12 @@ class IsResponsibleContributor(permissions.BasePermission):
             return True
 
         project_id = request.parser_context["kwargs"]["project_pk"]
-        check_project_exist_in_db(project_id)
-        try:
-            if (
-                Contributor.objects.get(
-                    project_id=int(project_id), user_id=request.user.id
-                ).permission
-                == "Responsable"
-            ):
-                return True
-        except Contributor.DoesNotExist:
+        contributor = get_connected_contributor(request, project_id)
+        if contributor is None:
+            check_project_exist_in_db(project_id)
             return False
+        if contributor.permission == Contributor.RESPONSIBLE:
+            return True
 
         return False
 
@@ -97,12 +115,8 @@ class IsResponsibleContributor(permissions.BasePermission):
         if request.user.is_superuser:
             return True
 
-        if (
-            Contributor.objects.get(
-                project_id=int(obj.project_id), user_id=request.user.id
-            ).permission
-            == "Responsable"
-        ):
+        contributor = get_connected_contributor(request, obj.project_id)
+        if contributor and contributor.permission == Contributor.RESPONSIBLE:
             return True
 
         return False
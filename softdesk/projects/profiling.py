@@ -0,0 +1,135 @@
+"""
+Provides the on-demand profiling of the API requests.
+
+A request is run under the profiler when it carries the profiling header
+set to the configured secret, or when it is drawn by the sampling rate.
+Without a secret, the header is ignored. The statistics of a requested
+profile are only kept when the view also authenticated a superuser. They
+are saved as a pstats file in the directory of its route, the oldest files
+being removed beyond the configured number. Other requests only pay a
+header lookup.
+"""
+import cProfile
+import random
+import re
+import secrets
+import threading
+import time
+from pathlib import Path
+from .conf import get_setting
+
+#: Names of the route directories and profile files, "." and ".." excluded.
+NAME_PATTERN = re.compile(r"^\w[\w.-]*$")
+
+
+def get_profile_directory():
+    """Return the directory of the saved profiles."""
+    return Path(get_setting("PROFILING", "PATH"))
+
+
+def is_superuser_request(request):
+    """Return True if the request was authenticated as a superuser's."""
+    # Set by the authentication of the view, once the request has run.
+    user = getattr(request, "user", None)
+
+    return user is not None and user.is_superuser
+
+
+def get_profiles():
+    """Return the saved profiles, newest first."""
+    profiles = []
+    for path in get_profile_directory().glob("*/*.prof"):
+        stat = path.stat()
+        profiles.append(
+            {
+                "route": path.parent.name,
+                "name": path.name,
+                "size": stat.st_size,
+                "created_time": stat.st_mtime,
+            }
+        )
+
+    return sorted(
+        profiles, key=lambda profile: profile["created_time"], reverse=True
+    )
+
+
+def get_profile_path(route, name):
+    """Return the path of the saved profile, or None if it doesn't exist."""
+    if not NAME_PATTERN.match(route) or not NAME_PATTERN.match(name):
+        return None
+    path = get_profile_directory() / route / name
+    if path.suffix != ".prof" or not path.is_file():
+        return None
+
+    return path
+
+
+class ProfilingMiddleware:
+    """Middleware running the requested or sampled requests under cProfile."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.enabled = get_setting("PROFILING", "ENABLED")
+        header = get_setting("PROFILING", "HEADER")
+        self.header = "HTTP_" + header.upper().replace("-", "_")
+        self.secret = get_setting("PROFILING", "SECRET")
+        self.sample_rate = get_setting("PROFILING", "SAMPLE_RATE")
+        # Only one profiler can be active at a time in the process.
+        self._lock = threading.Lock()
+
+    def __call__(self, request):
+        if not self.enabled:
+            return self.get_response(request)
+        requested = self.is_requested(request)
+        if not requested and not self.is_sampled():
+            return self.get_response(request)
+        if not self._lock.acquire(blocking=False):
+            return self.get_response(request)
+        try:
+            profiler = cProfile.Profile()
+            start = time.perf_counter()
+            profiler.enable()
+            try:
+                response = self.get_response(request)
+            finally:
+                profiler.disable()
+            duration = time.perf_counter() - start
+        finally:
+            self._lock.release()
+        if not requested or is_superuser_request(request):
+            self.save(request, profiler, duration)
+
+        return response
+
+    def is_requested(self, request):
+        """Return True if the request carries the header with the secret."""
+        value = request.META.get(self.header)
+        if not self.secret or value is None:
+            return False
+
+        return secrets.compare_digest(
+            value.encode("latin-1", "replace"), self.secret.encode()
+        )
+
+    def is_sampled(self):
+        return bool(self.sample_rate) and random.random() < self.sample_rate
+
+    @staticmethod
+    def save(request, profiler, duration):
+        """Save the statistics in the directory of the route of the request."""
+        match = request.resolver_match
+        route = match.view_name if match and match.view_name else "unresolved"
+        directory = get_profile_directory() / re.sub(r"[^\w.-]", "_", route)
+        directory.mkdir(parents=True, exist_ok=True)
+        name = (
+            f"{time.strftime('%Y%m%dT%H%M%S')}-{request.method}-"
+            f"{duration * 1000:.0f}ms-{secrets.token_hex(4)}.prof"
+        )
+        profiler.dump_stats(directory / name)
+
+        profiles = get_profiles()
+        for profile in profiles[get_setting("PROFILING", "MAX_PROFILES") :]:
+            (
+                get_profile_directory() / profile["route"] / profile["name"]
+            ).unlink(missing_ok=True)
@@ -0,0 +1,230 @@
+"""
+Provides the bulk provisioning of users from CSV or NDJSON files.
+
+Each row is validated like a sign up, password validators included, and
+its password hashed in a pool: a process pool spread over the cores for
+the command, a small thread pool shared by the requests of the process
+for the API. The valid rows are inserted in bulk_create batches, while the
+workers already prepare the next batch, and the invalid ones are reported
+with their row number.
+"""
+import csv
+import json
+import os
+import threading
+import django
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.password_validation import validate_password
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError, transaction
+from .conf import get_setting
+from .lookup import index_users
+from .models import User, UserManager
+
+FORMATS = ("csv", "ndjson")
+
+#: Fields of the rows, validated with the User model fields.
+USER_FIELDS = ("email", "first_name", "last_name")
+
+DUPLICATE_EMAIL_ERROR = "Un utilisateur avec cet email existe déjà."
+
+
+_request_pool = None
+_request_pool_lock = threading.Lock()
+
+
+def get_request_pool():
+    """Return the thread pool hashing the passwords of the API requests."""
+    global _request_pool
+    with _request_pool_lock:
+        if _request_pool is None:
+            workers = get_setting("USER_PROVISIONING", "REQUEST_WORKERS")
+            _request_pool = ThreadPoolExecutor(
+                max_workers=workers, thread_name_prefix="provisioning"
+            )
+
+    return _request_pool
+
+
+def get_format(filename):
+    """Return the format of the file from its extension, or None."""
+    extension = os.path.splitext(filename)[1].lstrip(".").lower()
+    if extension == "jsonl":
+        return "ndjson"
+
+    return extension if extension in FORMATS else None
+
+
+def read_rows(lines, format):
+    """Yield the rows of the CSV or NDJSON lines, as dicts or errors."""
+    if format == "csv":
+        yield from csv.DictReader(lines)
+        return
+    for line in lines:
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError:
+            row = None
+        if not isinstance(row, dict):
+            row = ValidationError("Ligne JSON invalide.")
+        yield row
+
+
+def prepare_user(row):
+    """
+    Return the fields of the user of the row with its hashed password, or
+    the errors of the row. Run in the workers of the pool, without any
+    query.
+    """
+    if isinstance(row, ValidationError):
+        return None, {"row": row.messages}
+
+    fields = {}
+    errors = {}
+    for name in USER_FIELDS:
+        value = str(row.get(name) or "").strip()
+        if name == "email":
+            value = UserManager.normalize_email(value)
+        try:
+            fields[name] = User._meta.get_field(name).clean(value, None)
+        except ValidationError as exception:
+            errors[name] = exception.messages
+    password = str(row.get("password") or "")
+    if not password:
+        errors["password"] = ["Ce champ est obligatoire."]
+    elif not errors:
+        try:
+            validate_password(password, user=User(**fields))
+        except ValidationError as exception:
+            errors["password"] = exception.messages
+    if errors:
+        return None, errors
+    fields["password"] = make_password(password)
+
+    return fields, None
+
+
+def insert_users(users):
+    """Insert the users in bulk, return the errors of the ones refused."""
+    try:
+        with transaction.atomic():
+            User.objects.bulk_create(users.values())
+        return {}
+    except IntegrityError:
+        pass
+
+    # A concurrent insert took one of the emails, the batch is inserted
+    # one user at a time to find it.
+    errors = {}
+    for number, user in users.items():
+        try:
+            with transaction.atomic():
+                user.save(force_insert=True)
+        except IntegrityError:
+            errors[number] = {"email": [DUPLICATE_EMAIL_ERROR]}
+
+    return errors
+
+
+def provision_users(rows, batch_size=None, workers=None, pool=None):
+    """
+    Create the users of the rows, return the number of created users and
+    the errors of the other rows by row number, the first row being 1.
+
+    The passwords are hashed in the given pool of the number of workers,
+    or in a process pool made for the call.
+    """
+    batch_size = batch_size or get_setting("USER_PROVISIONING", "BATCH_SIZE")
+    workers = (
+        workers
+        or get_setting("USER_PROVISIONING", "WORKERS")
+        or os.cpu_count()
+        or 1
+    )
+    if pool is None:
+        # The workers set Django up, whatever the start method of the pool.
+        with ProcessPoolExecutor(
+            max_workers=workers, initializer=django.setup
+        ) as pool:
+            return provision_users(rows, batch_size, workers, pool)
+
+    result = {"created": 0, "errors": []}
+    seen_emails = set()
+
+    def add_batch(numbers, prepared):
+        users = {}
+        for number, (fields, errors) in zip(numbers, prepared):
+            if errors is None and fields["email"] in seen_emails:
+                errors = {"email": [DUPLICATE_EMAIL_ERROR]}
+            if errors is not None:
+                result["errors"].append({"row": number, "errors": errors})
+                continue
+            seen_emails.add(fields["email"])
+            users[number] = User(**fields)
+        existing_emails = set(
+            User.objects.filter(
+                email__in=[user.email for user in users.values()]
+            ).values_list("email", flat=True)
+        )
+        for number, user in list(users.items()):
+            if user.email in existing_emails:
+                del users[number]
+                errors = {"email": [DUPLICATE_EMAIL_ERROR]}
+                result["errors"].append({"row": number, "errors": errors})
+        insert_errors = insert_users(users)
+        result["created"] += len(users) - len(insert_errors)
+        # Bulk inserts send no signal, the users are indexed here.
+        index_users(
+            User.objects.filter(
+                email__in=[
+                    user.email
+                    for number, user in users.items()
+                    if number not in insert_errors
+                ]
+            )
+        )
+        result["errors"].extend(
+            {"row": number, "errors": errors}
+            for number, errors in insert_errors.items()
+        )
+
+    pending = None
+    for batch in get_batches(rows, batch_size):
+        # The next batch is hashed while the previous one is inserted.
+        submitted = submit_batch(pool, batch, workers)
+        if pending is not None:
+            add_batch(*pending)
+        pending = submitted
+    if pending is not None:
+        add_batch(*pending)
+
+    result["errors"].sort(key=lambda error: error["row"])
+
+    return result
+
+
+def get_batches(rows, batch_size):
+    """Yield the numbered rows in lists of the batch size."""
+    batch = []
+    for number, row in enumerate(rows, start=1):
+        batch.append((number, row))
+        if len(batch) == batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def submit_batch(pool, batch, workers):
+    """Submit the rows of the batch to the pool, return their results."""
+    numbers = [number for number, _ in batch]
+    prepared = pool.map(
+        prepare_user,
+        [row for _, row in batch],
+        chunksize=max(1, len(batch) // (workers * 4)),
+    )
+
+    return numbers, prepared
@@ -0,0 +1,118 @@
+"""
+Provides the purge of soft-deleted objects of the "projects" application.
+
+Deleting through the ORM collector loads every cascaded row into memory and
+holds the write lock for the whole cascade. The purge walks the relations
+instead and runs set-based statements in bounded chunks, each chunk in its
+own transaction, before deleting the remaining object through the ORM.
+"""
+from django.db import connections, models, router, transaction
+from .models import Project, ProjectPlacement, User
+from .sharding import get_project_databases
+
+DEFAULT_CHUNK_SIZE = 1000
+
+
+def run_in_chunks(sql, params, chunk_size, using):
+    """Execute the chunked statement until it affects less than a chunk."""
+    total = 0
+    while True:
+        with transaction.atomic(using=using):
+            with connections[using].cursor() as cursor:
+                cursor.execute(sql, [*params, chunk_size])
+                rowcount = cursor.rowcount
+        total += rowcount
+        if rowcount < chunk_size:
+            return total
+
+
+def purge_relations(model, selection, params, chunk_size, using):
+    """
+    Delete or detach in chunks the rows related to the rows of the model
+    selected by the subquery, and return the number of deleted rows.
+    """
+    quote_name = connections[using].ops.quote_name
+    total = 0
+    for relation in model._meta.related_objects:
+        related_model = relation.related_model
+        if relation.many_to_many or not router.allow_migrate_model(
+            using, related_model
+        ):
+            continue
+        related_table = quote_name(related_model._meta.db_table)
+        related_pk = quote_name(related_model._meta.pk.column)
+        column = quote_name(relation.field.column)
+        where = f"{column} IN ({selection})"
+        if relation.on_delete == models.CASCADE:
+            total += purge_rows(
+                related_model, where, params, chunk_size, using
+            )
+        elif relation.on_delete == models.SET_NULL:
+            run_in_chunks(
+                f"UPDATE {related_table} SET {column} = NULL "
+                f"WHERE {related_pk} IN (SELECT {related_pk} "
+                f"FROM {related_table} WHERE {where} LIMIT %s)",
+                params,
+                chunk_size,
+                using,
+            )
+
+    return total
+
+
+def purge_rows(model, where, params, chunk_size, using):
+    """
+    Delete in chunks the rows of the model matching the where clause, with
+    their cascade, and return the number of deleted rows.
+    """
+    quote_name = connections[using].ops.quote_name
+    table = quote_name(model._meta.db_table)
+    pk = quote_name(model._meta.pk.column)
+    selection = f"SELECT {pk} FROM {table} WHERE {where}"
+    total = purge_relations(model, selection, params, chunk_size, using)
+    total += run_in_chunks(
+        f"DELETE FROM {table} WHERE {pk} IN ({selection} LIMIT %s)",
+        params,
+        chunk_size,
+        using,
+    )
+
+    return total
+
+
+def purge_object(instance, chunk_size=DEFAULT_CHUNK_SIZE, using=None):
+    """Purge the relations of the instance in chunks, then delete it."""
+    using = using or instance._state.db
+    purge_relations(type(instance), "%s", [instance.pk], chunk_size, using)
+    # What is left (permissions, groups...) is small and deleted by the
+    # collector, which also sends the signals of the instance.
+    instance.delete(using=using)
+
+
+def purge_deleted(chunk_size=DEFAULT_CHUNK_SIZE, using=None):
+    """
+    Purge every soft-deleted project and user, return their numbers. The
+    projects are purged on the given database or on every project database,
+    the users on the default one after their rows of the project databases.
+    """
+    databases = [using] if using else get_project_databases()
+    project_count = 0
+    user_count = 0
+    for database in databases:
+        projects = Project.objects.using(database).filter(is_deleted=True)
+        for project in projects:
+            project_id = project.id
+            purge_object(project, chunk_size, database)
+            ProjectPlacement.objects.filter(id=project_id).delete()
+            project_count += 1
+    if using not in (None, "default"):
+        return project_count, user_count
+
+    for user in User.objects.using("default").filter(is_deleted=True):
+        for database in get_project_databases():
+            if database != "default":
+                purge_relations(User, "%s", [user.pk], chunk_size, database)
+        purge_object(user, chunk_size, "default")
+        user_count += 1
+
+    return project_count, user_count
@@ -0,0 +1,189 @@
+"""
+Provides the revocation of the JSON web tokens.
+
+Revocations are rows of the RevokedToken table. Each worker keeps a Bloom
+filter of the revoked jtis and the time of the latest revocation of each
+user, fed with the new rows at most every SYNC_INTERVAL seconds and rebuilt
+every REBUILD_INTERVAL seconds to drop the expired ones. A token missing
+from the filter and issued after the latest revocation of its user is
+valid without any query, only the rare other tokens are looked up in the
+table.
+"""
+import hashlib
+import math
+import threading
+import time
+from datetime import datetime, timedelta, timezone as dt_timezone
+from django.db.models import Q
+from django.utils import timezone
+from rest_framework_simplejwt.settings import api_settings
+from .conf import get_setting
+from .models import RevokedToken
+
+
+class BloomFilter:
+    """Set of strings answering "maybe" or "surely not" in a few bits."""
+
+    def __init__(self, capacity, error_rate):
+        self.size = max(
+            64, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)
+        )
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+
+    def get_positions(self, key):
+        digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], "little")
+        step = int.from_bytes(digest[8:], "little") | 1
+        return [
+            (first + index * step) % self.size
+            for index in range(self.hash_count)
+        ]
+
+    def add(self, key):
+        for position in self.get_positions(key):
+            self.bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, key):
+        return all(
+            self.bits[position >> 3] & (1 << (position & 7))
+            for position in self.get_positions(key)
+        )
+
+
+class RevocationFilter:
+    """Bloom filter of the unexpired revocations, synced with the table."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._bloom = None
+        # Timestamp, in whole seconds as the "iat" claim, of the latest
+        # revocation of every token of each user.
+        self._user_revoked_at = {}
+        self._last_id = 0
+        self._synced_at = 0
+        self._built_at = 0
+
+    def sync(self):
+        """Add the new revocations, or rebuild the filter when due."""
+        now = time.monotonic()
+        interval = get_setting("TOKEN_REVOCATION", "SYNC_INTERVAL")
+        if now - self._synced_at < interval:
+            return
+        with self._lock:
+            if now - self._synced_at < interval:
+                return
+            rebuild = self._bloom is None or now - self._built_at >= (
+                get_setting("TOKEN_REVOCATION", "REBUILD_INTERVAL")
+            )
+            revocations = RevokedToken.objects.filter(
+                expires_at__gt=timezone.now()
+            )
+            if not rebuild:
+                revocations = revocations.filter(id__gt=self._last_id)
+            rows = list(
+                revocations.values_list(
+                    "id", "jti", "user_id", "created_time"
+                )
+            )
+            # is_revoked() reads without the lock: a rebuilt filter is only
+            # swapped in once filled, while adding to the current one only
+            # sets bits and raises timestamps.
+            if rebuild:
+                bloom = BloomFilter(
+                    max(
+                        get_setting("TOKEN_REVOCATION", "CAPACITY"),
+                        2 * len(rows),
+                    ),
+                    get_setting("TOKEN_REVOCATION", "ERROR_RATE"),
+                )
+                user_revoked_at = {}
+            else:
+                bloom = self._bloom
+                user_revoked_at = self._user_revoked_at
+            for id, jti, user_id, created_time in rows:
+                self._add(bloom, user_revoked_at, jti, user_id, created_time)
+                self._last_id = max(self._last_id, id)
+            if rebuild:
+                self._bloom, self._user_revoked_at = bloom, user_revoked_at
+                self._built_at = now
+            self._synced_at = now
+
+    @staticmethod
+    def _add(bloom, user_revoked_at, jti, user_id, created_time):
+        if jti:
+            bloom.add(jti)
+            return
+        revoked_at = int(created_time.timestamp())
+        if revoked_at > user_revoked_at.get(str(user_id), 0):
+            user_revoked_at[str(user_id)] = revoked_at
+
+    def add(self, revocation):
+        """Add a revocation made by this worker at once."""
+        self.sync()
+        with self._lock:
+            self._add(
+                self._bloom,
+                self._user_revoked_at,
+                revocation.jti,
+                revocation.user_id,
+                revocation.created_time,
+            )
+
+    def is_revoked(self, token):
+        """Return True if the validated token has been revoked."""
+        self.sync()
+        jti = token.get(api_settings.JTI_CLAIM)
+        user_id = token.get(api_settings.USER_ID_CLAIM)
+        issued_at = token.get("iat", 0)
+        # Tokens issued after the latest revocation of their user, or in
+        # the same second as the claim has no finer precision, are kept.
+        if (
+            self._user_revoked_at.get(str(user_id), 0) <= issued_at
+            and jti not in self._bloom
+        ):
+            return False
+
+        next_second = datetime.fromtimestamp(
+            issued_at, dt_timezone.utc
+        ) + timedelta(seconds=1)
+        return RevokedToken.objects.filter(
+            Q(jti=jti)
+            | Q(jti="", user_id=user_id, created_time__gte=next_second),
+            expires_at__gt=timezone.now(),
+        ).exists()
+
+
+revocation_filter = RevocationFilter()
+
+
+def revoke_token(token):
+    """Revoke the validated token until its expiration."""
+    revocation = RevokedToken.objects.create(
+        jti=token[api_settings.JTI_CLAIM],
+        user_id=token.get(api_settings.USER_ID_CLAIM),
+        expires_at=datetime.fromtimestamp(token["exp"], dt_timezone.utc),
+    )
+    revocation_filter.add(revocation)
+
+    return revocation
+
+
+def revoke_user_tokens(user):
+    """Revoke every token of the user issued until now."""
+    revocation = RevokedToken.objects.create(
+        user=user,
+        expires_at=timezone.now() + api_settings.REFRESH_TOKEN_LIFETIME,
+    )
+    revocation_filter.add(revocation)
+
+    return revocation
+
+
+def purge_expired_revocations():
+    """Delete the revocations of expired tokens, return their number."""
+    count, _ = RevokedToken.objects.filter(
+        expires_at__lte=timezone.now()
+    ).delete()
+
+    return count
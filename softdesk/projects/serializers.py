@@ -3,8 +3,33 @@ Provides serializers for objects of "projects" application.
 """
 from rest_framework import serializers
 from django.contrib.auth.password_validation import validate_password
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.serializers import TokenRefreshSerializer
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
 from .models import User, Project, Contributor, Issue, Comment
-from .checker import check_user_email_exist, check_and_get_contributor_id
+from .checker import check_user_email_exist
+from .revocation import revocation_filter
+
+
+class LabelChoiceField(serializers.ChoiceField):
+    """
+    Choice field of a model field storing small integers, read and written
+    with the labels of its choices.
+    """
+
+    def __init__(self, choices, **kwargs):
+        self.codes = {label: code for code, label in choices}
+        super().__init__(choices=[label for _, label in choices], **kwargs)
+        self.labels = {code: label for code, label in choices}
+
+    def to_internal_value(self, data):
+        return self.codes[super().to_internal_value(data)]
+
+    def to_representation(self, value):
+        if value in ("", None):
+            return value
+        return self.labels[value]
 
 
 class SignUpSerializer(serializers.ModelSerializer):
@@ -61,29 +86,41 @@ class ProjectSerializer(serializers.ModelSerializer):
         )
 
 
+class ProjectCloneSerializer(serializers.Serializer):
+    """Options of a project clone serializer."""
+
+    title = serializers.CharField(max_length=128, required=False)
+    issues = serializers.BooleanField(default=False)
+    comments = serializers.BooleanField(default=False)
+
+    def validate(self, attrs):
+        if attrs["comments"] and not attrs["issues"]:
+            raise serializers.ValidationError(
+                {
+                    "comments": [
+                        "Les commentaires ne peuvent être copiés sans leurs "
+                        "problèmes."
+                    ]
+                }
+            )
+
+        return attrs
+
+
 class ContributorSerializer(serializers.ModelSerializer):
     """Contributor object serializer."""
 
     project_id = serializers.ReadOnlyField()
     user_id = serializers.ReadOnlyField()
     user = serializers.EmailField(write_only=True)
+    permission = LabelChoiceField(choices=Contributor.PERMISSION_CHOICES)
 
     def validate_user(self, value):
-        """Return user object or raise validation error."""
-        check_user_email_exist(value)
-        project_id = self.context["request"].parser_context["kwargs"][
-            "project_pk"
-        ]
-        user = User.objects.get(email=value)
-        if self.context["request"].method == "POST":
-            if Contributor.objects.filter(
-                project_id=project_id, user_id=user.id
-            ):
-                raise serializers.ValidationError(
-                    "Cet utilisateur est déjà un contributeur du projet."
-                )
-
-        return user
+        """
+        Return user object or raise validation error. Adding a user twice
+        to the project is rejected by the database on save.
+        """
+        return check_user_email_exist(value)
 
     class Meta:
         model = Contributor
@@ -100,6 +137,7 @@ class ContributorAutoAssignUserSerializer(serializers.ModelSerializer):
     """Contributor with hidden user field object serializer."""
 
     user = serializers.HiddenField(default="")
+    permission = LabelChoiceField(choices=Contributor.PERMISSION_CHOICES)
 
     class Meta:
         model = Contributor
@@ -119,17 +157,16 @@ class IssueSerializer(serializers.ModelSerializer):
     author_user_id = serializers.ReadOnlyField()
     assignee_user_id = serializers.ReadOnlyField()
     assignee_user = serializers.EmailField(write_only=True)
+    tag = LabelChoiceField(choices=Issue.ISSUE_TAG)
+    priority = LabelChoiceField(choices=Issue.ISSUE_PRIORITY)
+    status = LabelChoiceField(choices=Issue.ISSUE_STATUS)
 
     def validate_assignee_user(self, value):
-        """Return user object or raise validation error."""
-        check_user_email_exist(value)
-        project_id = self.context["request"].parser_context["kwargs"][
-            "project_pk"
-        ]
-        user = User.objects.get(email=value)
-        check_and_get_contributor_id(project_id, user.id)
-
-        return user
+        """
+        Return user object or raise validation error. An assignee who isn't
+        a contributor of the project is rejected by the database on save.
+        """
+        return check_user_email_exist(value)
 
     class Meta:
         model = Issue
@@ -163,3 +200,63 @@ class CommentSerializer(serializers.ModelSerializer):
             "issue_id",
             "created_time",
         )
+
+
+class RevocableTokenRefreshSerializer(TokenRefreshSerializer):
+    """Token refresh serializer rejecting the revoked refresh tokens."""
+
+    def validate(self, attrs):
+        refresh = self.token_class(attrs["refresh"])
+        if revocation_filter.is_revoked(refresh):
+            raise TokenError("Le jeton a été révoqué.")
+
+        return super().validate(attrs)
+
+
+class TokenRevokeSerializer(serializers.Serializer):
+    """Revocation of the refresh token of the session serializer."""
+
+    refresh = serializers.CharField(required=False)
+
+    def validate_refresh(self, value):
+        try:
+            refresh = RefreshToken(value)
+        except TokenError as exception:
+            raise serializers.ValidationError(exception.args[0])
+        user_id = self.context["request"].user.pk
+        if str(refresh.get(api_settings.USER_ID_CLAIM)) != str(user_id):
+            raise serializers.ValidationError(
+                "Ce jeton n'appartient pas à l'utilisateur."
+            )
+
+        return refresh
+
+
+class BatchRequestSerializer(serializers.Serializer):
+    """Sub-request of a batch serializer."""
+
+    method = serializers.ChoiceField(choices=["GET"], default="GET")
+    path = serializers.RegexField(
+        r"^/projects/",
+        max_length=2048,
+        error_messages={
+            "invalid": "Seuls les chemins /projects/ peuvent être groupés."
+        },
+    )
+
+
+class BatchSerializer(serializers.Serializer):
+    """Batch of read sub-requests serializer."""
+
+    requests = BatchRequestSerializer(many=True, max_length=20)
+
+
+class TimelineEventSerializer(serializers.Serializer):
+    """Project timeline event serializer."""
+
+    type = serializers.CharField()
+    id = serializers.IntegerField()
+    issue_id = serializers.IntegerField()
+    author_user_id = serializers.IntegerField(allow_null=True)
+    label = serializers.CharField()
+    created_time = serializers.DateTimeField()
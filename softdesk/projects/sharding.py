@@ -0,0 +1,250 @@
+"""
+Provides the horizontal sharding of the "projects" application.
+
+When SHARDING["SHARDS"] lists database aliases, each project lives with its
+contributors, issues, comments, archived issues and status history on one
+of these shard databases, recorded by its ProjectPlacement on the default
+database which also keeps the users. Views route their queries to the
+shard of the project of their URL, the cross-project listing fans out to
+every shard.
+
+Each shard allocates the ids of its rows in its own range, so that the rows
+of a project keep their ids when the project is moved to another shard.
+"""
+import heapq
+from contextlib import contextmanager
+from contextvars import ContextVar
+from itertools import islice
+from django.core.management.color import no_style
+from django.db import connections, transaction
+from .conf import get_setting
+
+SHARDED_MODELS = {
+    "project",
+    "contributor",
+    "issue",
+    "comment",
+    "archivedissue",
+    "archivedcomment",
+    "issuestatuschange",
+    "issuestatusrollup",
+}
+
+#: Size of the id range of each shard, 2**40 ids.
+SHARD_ID_RANGE = 1 << 40
+
+current_shard = ContextVar("current_shard", default=None)
+
+
+def get_shards():
+    """Return the aliases of the shard databases, empty if disabled."""
+    return get_setting("SHARDING", "SHARDS")
+
+
+def get_project_databases():
+    """Return the aliases of the databases holding projects."""
+    return get_shards() or ["default"]
+
+
+def is_sharded(model):
+    """Return True if the rows of the model are placed on shards."""
+    return (
+        model._meta.app_label == "projects"
+        and model._meta.model_name in SHARDED_MODELS
+    )
+
+
+def get_project_shard(project_id):
+    """Return the alias of the database holding the project."""
+    from .models import ProjectPlacement
+
+    shards = get_shards()
+    if not shards:
+        return "default"
+    shard = (
+        ProjectPlacement.objects.using("default")
+        .filter(id=project_id)
+        .values_list("shard", flat=True)
+        .first()
+    )
+
+    # Unknown projects are looked for on the first shard, which holds
+    # the projects created before sharding was enabled.
+    return shard or shards[0]
+
+
+def place_new_project(shard=None):
+    """
+    Allocate the id of a new project on the shard, or on a shard picked by
+    id, and return its placement.
+    """
+    from .models import ProjectPlacement
+
+    if shard is not None:
+        return ProjectPlacement.objects.using("default").create(shard=shard)
+    shards = get_shards()
+    placement = ProjectPlacement.objects.using("default").create(shard="")
+    placement.shard = shards[placement.id % len(shards)]
+    placement.save(using="default", update_fields=["shard"])
+
+    return placement
+
+
+def place_existing_projects():
+    """
+    Record the placement of the projects of the default database created
+    while sharding was disabled, and move the placement ids past them so
+    that new projects never take their ids.
+    """
+    from .models import Project, ProjectPlacement
+
+    connection = connections["default"]
+    quote_name = connection.ops.quote_name
+    placement_table = quote_name(ProjectPlacement._meta.db_table)
+    with transaction.atomic(using="default"), connection.cursor() as cursor:
+        cursor.execute(
+            f"INSERT INTO {placement_table} (id, shard) "
+            "SELECT project.id, %s "
+            f"FROM {quote_name(Project._meta.db_table)} project "
+            f"WHERE NOT EXISTS (SELECT 1 FROM {placement_table} placement "
+            "WHERE placement.id = project.id)",
+            ["default"],
+        )
+        # Explicit ids don't move the sequence on every database.
+        for sql in connection.ops.sequence_reset_sql(
+            no_style(), [ProjectPlacement]
+        ):
+            cursor.execute(sql)
+
+
+@contextmanager
+def use_project_shard(project_id):
+    """Route the unhinted queries of the block to the shard of the project."""
+    shard = None
+    if get_shards():
+        try:
+            shard = get_project_shard(int(project_id))
+        except (TypeError, ValueError):
+            pass
+    token = current_shard.set(shard)
+    try:
+        yield shard
+    finally:
+        current_shard.reset(token)
+
+
+class ProjectShardRouter:
+    """Database router placing project data on the shard of its project."""
+
+    def db_for_read(self, model, **hints):
+        if not get_shards():
+            return None
+        if not is_sharded(model):
+            return "default"
+        # Related objects of other models, such as users, are ignored.
+        instance = hints.get("instance")
+        if instance is not None and is_sharded(type(instance)):
+            if instance._state.db:
+                return instance._state.db
+            project_id = getattr(instance, "project_id", None)
+            if project_id is not None:
+                return get_project_shard(project_id)
+
+        return current_shard.get()
+
+    db_for_write = db_for_read
+
+    def allow_relation(self, obj1, obj2, **hints):
+        if get_shards():
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        shards = get_shards()
+        if not shards:
+            return None
+        if app_label == "projects" and model_name in SHARDED_MODELS:
+            # Also created empty on the default database, so that deleting
+            # a user there finds no related rows instead of no table.
+            return db in shards or db == "default"
+
+        return db == "default"
+
+
+class ShardedQuerySet:
+    """
+    Ordered and sliceable union of one queryset evaluated on every shard,
+    accepted by the paginators in place of a queryset.
+    """
+
+    def __init__(self, queryset, key):
+        self.queryset = queryset
+        self.key = key
+
+    def count(self):
+        return sum(
+            self.queryset.using(shard).count() for shard in get_shards()
+        )
+
+    def __len__(self):
+        return self.count()
+
+    def __iter__(self):
+        return heapq.merge(
+            *[self.queryset.using(shard) for shard in get_shards()],
+            key=self.key,
+        )
+
+    def __getitem__(self, index):
+        if not isinstance(index, slice):
+            return next(islice(self, index, index + 1))
+        querysets = [self.queryset.using(shard) for shard in get_shards()]
+        if index.stop is not None:
+            querysets = [queryset[: index.stop] for queryset in querysets]
+        merged = heapq.merge(*querysets, key=self.key)
+
+        return list(islice(merged, index.start, index.stop, index.step))
+
+
+def reserve_id_range(using):
+    """
+    Move the id sequences of the sharded tables of the shard database to
+    the start of its id range, if they are below it.
+    """
+    shards = get_shards()
+    if using not in shards:
+        return
+    start = shards.index(using) * SHARD_ID_RANGE
+    if not start:
+        return
+    from django.apps import apps
+
+    connection = connections[using]
+    with connection.cursor() as cursor:
+        for model in apps.get_app_config("projects").get_models():
+            if not is_sharded(model):
+                continue
+            table = model._meta.db_table
+            if connection.vendor == "sqlite":
+                cursor.execute(
+                    "SELECT seq FROM sqlite_sequence WHERE name = %s", [table]
+                )
+                row = cursor.fetchone()
+                if row is None:
+                    cursor.execute(
+                        "INSERT INTO sqlite_sequence (name, seq) "
+                        "VALUES (%s, %s)",
+                        [table, start],
+                    )
+                elif row[0] < start:
+                    cursor.execute(
+                        "UPDATE sqlite_sequence SET seq = %s WHERE name = %s",
+                        [start, table],
+                    )
+            elif connection.vendor == "postgresql":
+                cursor.execute(
+                    "SELECT setval(pg_get_serial_sequence(%s, 'id'), "
+                    f"GREATEST(%s, (SELECT MAX(id) FROM "
+                    f"{connection.ops.quote_name(table)})))",
+                    [table, start],
+                )
@@ -0,0 +1,85 @@
+"""
+Signal receivers of the "projects" application.
+"""
+from functools import partial
+from django.db import transaction
+from django.db.models.signals import post_delete, post_migrate, post_save
+from django.dispatch import receiver
+from .events import broker
+from .lookup import TERM_FIELDS, index_users
+from .models import Project, Contributor, Issue, Comment, User
+from .sharding import get_shards, place_existing_projects, reserve_id_range
+
+
+def get_event(instance, action):
+    """Return the live event describing the change of the instance."""
+    event = {
+        "type": type(instance).__name__.lower(),
+        "action": action,
+        "id": instance.pk,
+    }
+    if isinstance(instance, Project):
+        event["project_id"] = instance.pk
+    else:
+        event["project_id"] = instance.project_id
+    if isinstance(instance, Comment):
+        event["issue_id"] = instance.issue_id
+    if isinstance(instance, Contributor):
+        event["user_id"] = instance.user_id
+
+    return event
+
+
+@receiver(post_save, sender=Project)
+@receiver(post_save, sender=Contributor)
+@receiver(post_save, sender=Issue)
+@receiver(post_save, sender=Comment)
+def publish_save_event(sender, instance, created, using, **kwargs):
+    """Publish a created or updated event once the transaction commits."""
+    if not broker.has_subscribers:
+        return
+    if created:
+        action = "created"
+    elif getattr(instance, "is_deleted", False):
+        action = "deleted"
+    else:
+        action = "updated"
+    event = get_event(instance, action)
+    # Bound to the transaction of the database of the row, a shard's.
+    transaction.on_commit(partial(broker.publish, event), using=using)
+
+
+@receiver(post_delete, sender=Project)
+@receiver(post_delete, sender=Contributor)
+@receiver(post_delete, sender=Issue)
+@receiver(post_delete, sender=Comment)
+def publish_delete_event(sender, instance, using, **kwargs):
+    """Publish a deleted event once the transaction commits."""
+    if not broker.has_subscribers:
+        return
+    event = get_event(instance, "deleted")
+    transaction.on_commit(partial(broker.publish, event), using=using)
+
+
+@receiver(post_migrate)
+def reserve_shard_id_range(sender, using, **kwargs):
+    """Start the ids of a migrated shard database in its own range."""
+    if sender.name == "projects":
+        reserve_id_range(using)
+
+
+@receiver(post_migrate)
+def place_unplaced_projects(sender, using, **kwargs):
+    """Place the projects created before sharding was enabled."""
+    if sender.name == "projects" and using == "default" and get_shards():
+        place_existing_projects()
+
+
+@receiver(post_save, sender=User)
+def index_user_lookup_terms(sender, instance, update_fields, raw, **kwargs):
+    """Update the lookup terms of the saved user."""
+    if raw:
+        return
+    if update_fields is not None and update_fields.isdisjoint(TERM_FIELDS):
+        return
+    index_users([instance])
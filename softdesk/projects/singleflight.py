@@ -0,0 +1,53 @@
+"""
+Provides the single-flight computation of identical concurrent reads.
+
+When enabled, a read request arriving while the same request of a caller
+with the same role is already being computed waits for it and is answered
+with its response data, instead of running the same queries and
+serialization again.
+"""
+import threading
+from concurrent.futures import Future
+
+
+class SingleFlight:
+    """Computations in flight, shared by the callers of the same key."""
+
+    def __init__(self):
+        self._futures = {}
+        self._lock = threading.Lock()
+        self.shared = 0
+
+    def run(self, key, compute):
+        """
+        Return the result of the computation of the key, joining the one
+        in flight if any, or raise its exception.
+        """
+        with self._lock:
+            future = self._futures.get(key)
+            is_leader = future is None
+            if is_leader:
+                future = self._futures[key] = Future()
+            else:
+                self.shared += 1
+        if not is_leader:
+            return future.result()
+
+        try:
+            result = compute()
+        except BaseException as exception:
+            self.forget(key)
+            future.set_exception(exception)
+            raise
+        self.forget(key)
+        future.set_result(result)
+
+        return result
+
+    def forget(self, key):
+        """Let the next callers of the key run a new computation."""
+        with self._lock:
+            del self._futures[key]
+
+
+single_flight = SingleFlight()
@@ -0,0 +1,2134 @@
+"""
+Tests of the "projects" application.
+"""
+import asyncio
+import gzip
+from datetime import timedelta
+import importlib
+import io
+import json
+import tempfile
+import threading
+import time
+from concurrent.futures import Future
+from unittest import mock
+from types import SimpleNamespace
+from asgiref.sync import async_to_sync
+from django.apps import apps
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import caches
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import IntegrityError, connection, transaction
+from django.test.utils import CaptureQueriesContext
+from django.http import HttpResponse, JsonResponse
+from django.test import RequestFactory, override_settings
+from django.test.client import encode_multipart
+from django.utils import timezone
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.test import (
+    APIClient,
+    APITestCase,
+    APITransactionTestCase,
+)
+from rest_framework_simplejwt.tokens import AccessToken, RefreshToken
+from .admin import EstimatedCountPaginator
+from .archive import archive_issues
+from .admission import (
+    AdmissionControlMiddleware,
+    RouteClassLimiter,
+    admission_controller,
+)
+from .capture import TrafficCaptureMiddleware
+from .checker import explain_integrity_error
+from .conf import DEFAULTS, get_setting
+from .compression import (
+    CompressedCache,
+    CompressionMiddleware,
+    negotiate_encoding,
+)
+from .coalescer import WriteCoalescer, WriteTimeout, write_coalescer
+from .events import EventStreamApplication, Subscription, broker
+from .history import (
+    BUCKET_COUNT,
+    add_to_rollup,
+    get_bucket,
+    get_bucket_bound,
+)
+from .idempotency import get_cache_key, get_store
+from .lookup import get_prefix_upper_bound, get_words, search_users
+from .models import (
+    ArchivedComment,
+    ArchivedIssue,
+    Project,
+    User,
+    Contributor,
+    Issue,
+    Comment,
+    IssueStatusChange,
+    IssueStatusRollup,
+    ProjectPlacement,
+)
+from .profiling import ProfilingMiddleware, get_profile_path, get_profiles
+from .provisioning import get_request_pool
+from .purge import purge_deleted
+from .revocation import (
+    BloomFilter,
+    RevocationFilter,
+    revocation_filter,
+    revoke_token,
+    revoke_user_tokens,
+)
+from .serializers import LabelChoiceField
+from .signals import publish_delete_event, publish_save_event
+from .singleflight import SingleFlight, single_flight
+from .sharding import (
+    get_project_shard,
+    place_existing_projects,
+    place_new_project,
+)
+
+
+class ProjectsTestMixin:
+    """Test case with an author, a project and its issue at hand."""
+
+    def setUp(self):
+        # Throttles and idempotency keys outlive the test transactions.
+        for cache in caches.all():
+            cache.clear()
+        self.author = self.create_user("author@softdesk.fr")
+        self.project = self.create_project(self.author)
+        self.issue = self.create_issue(self.project, self.author)
+
+    @staticmethod
+    def create_user(email, **extra_fields):
+        extra_fields = {
+            "first_name": "Prénom",
+            "last_name": "Nom",
+            **extra_fields,
+        }
+        return User.objects.create_user(email, "Azerty1234!", **extra_fields)
+
+    @staticmethod
+    def create_project(author, title="Projet"):
+        project = Project.objects.create(
+            title=title,
+            description="Description",
+            type="Back-End",
+            author_user=author,
+        )
+        Contributor.objects.create(
+            user=author,
+            project=project,
+            permission=Contributor.RESPONSIBLE,
+            role="Auteur",
+        )
+        return project
+
+    @staticmethod
+    def create_issue(project, author, **fields):
+        fields = {
+            "title": "Problème",
+            "desc": "Description",
+            "tag": Issue.BUG,
+            "priority": Issue.LOW,
+            "status": Issue.TO_DO,
+            **fields,
+        }
+        return Issue.objects.create(
+            project=project, author_user=author, **fields
+        )
+
+    @staticmethod
+    def create_comment(issue, author, description="Commentaire"):
+        return Comment.objects.create(
+            issue=issue, author_user=author, description=description
+        )
+
+    @staticmethod
+    def add_contributor(project, user, permission=Contributor.CONTRIBUTOR):
+        return Contributor.objects.create(
+            user=user, project=project, permission=permission
+        )
+
+    def authenticate(self, user):
+        """Send the requests of the client with an access token of the user."""
+        token = AccessToken.for_user(user)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+        return token
+
+
+@override_settings(
+    PASSWORD_HASHERS=["django.contrib.auth.hashers.MD5PasswordHasher"]
+)
+class ProjectsTestCase(ProjectsTestMixin, APITestCase):
+    pass
+
+
+class EventStreamTests(ProjectsTestCase):
+    async def run_stream(self, token, on_start):
+        """Run the event stream until its first event, return the messages."""
+        messages = []
+        received = asyncio.Event()
+
+        async def receive():
+            await received.wait()
+            return {"type": "http.disconnect"}
+
+        async def send(message):
+            messages.append(message)
+            if message["type"] == "http.response.start":
+                on_start()
+            elif message.get("body", b"").startswith(b"event:"):
+                received.set()
+
+        scope = {
+            "type": "http",
+            "path": "/events/",
+            "headers": [],
+            "query_string": f"token={token}".encode(),
+        }
+        application = EventStreamApplication(None)
+        await asyncio.wait_for(application(scope, receive, send), 5)
+
+        return messages
+
+    def test_stream_requires_a_valid_token(self):
+        messages = async_to_sync(self.run_stream)("invalid", lambda: None)
+        self.assertEqual(messages[0]["status"], 401)
+
+    def test_stream_only_pushes_events_of_the_projects_of_the_user(self):
+        other_project = self.create_project(self.create_user("x@softdesk.fr"))
+
+        def publish():
+            for project in (other_project, self.project):
+                broker.publish(
+                    {
+                        "type": "issue",
+                        "action": "created",
+                        "id": 1,
+                        "project_id": project.id,
+                    }
+                )
+
+        token = AccessToken.for_user(self.author)
+        messages = async_to_sync(self.run_stream)(token, publish)
+        self.assertEqual(messages[0]["status"], 200)
+        bodies = [message.get("body", b"") for message in messages[1:]]
+        events = [body for body in bodies if body.startswith(b"event:")]
+        self.assertEqual(len(events), 1)
+        self.assertIn(f'"project_id":{self.project.id}'.encode(), events[0])
+        self.assertFalse(broker.has_subscribers)
+
+    def test_saved_rows_are_published_on_commit(self):
+        loop = asyncio.new_event_loop()
+        self.addCleanup(loop.close)
+        subscription = Subscription(loop, self.author, [self.project.id])
+        broker.subscribe(subscription)
+        self.addCleanup(broker.unsubscribe, subscription)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            comment = self.create_comment(self.issue, self.author)
+        loop.run_until_complete(asyncio.sleep(0))
+
+        event = subscription.queue.get_nowait()
+        self.assertEqual(event["type"], "comment")
+        self.assertEqual(event["action"], "created")
+        self.assertEqual(event["id"], comment.id)
+        self.assertEqual(event["issue_id"], self.issue.id)
+
+    def test_stream_is_closed_when_the_token_expires(self):
+        token = AccessToken.for_user(self.author)
+        token.set_exp(lifetime=timedelta(seconds=2))
+
+        messages = async_to_sync(self.run_stream)(token, lambda: None)
+
+        self.assertEqual(messages[0]["status"], 200)
+        self.assertEqual(
+            messages[1:], [{"type": "http.response.body", "body": b""}]
+        )
+
+    def test_stream_is_closed_when_the_token_is_revoked(self):
+        def publish():
+            broker.publish(
+                {
+                    "type": "issue",
+                    "action": "created",
+                    "id": 1,
+                    "project_id": self.project.id,
+                }
+            )
+
+        token = AccessToken.for_user(self.author)
+        # Accepted at the connection, revoked before the first event.
+        with mock.patch.object(
+            revocation_filter, "is_revoked", side_effect=[False, True]
+        ):
+            messages = async_to_sync(self.run_stream)(token, publish)
+
+        self.assertEqual(messages[0]["status"], 200)
+        self.assertEqual(
+            messages[1:], [{"type": "http.response.body", "body": b""}]
+        )
+        self.assertFalse(broker.has_subscribers)
+
+    @override_settings(EVENT_STREAM={"QUEUE_SIZE": 2})
+    def test_slow_consumer_gets_an_overflow_event(self):
+        loop = asyncio.new_event_loop()
+        self.addCleanup(loop.close)
+        subscription = Subscription(loop, self.author, [self.project.id])
+        event = {"type": "issue", "project_id": self.project.id}
+        for _ in range(3):
+            subscription.offer(event)
+
+        self.assertTrue(subscription.overflowed)
+        self.assertEqual(subscription.queue.qsize(), 1)
+        self.assertEqual(subscription.queue.get_nowait()["type"], "overflow")
+
+
+class SettingsTests(ProjectsTestCase):
+    def test_missing_keys_take_their_default(self):
+        with override_settings(RESPONSE_COMPRESSION={"MIN_SIZE": 10}):
+            self.assertEqual(
+                get_setting("RESPONSE_COMPRESSION", "MIN_SIZE"), 10
+            )
+            self.assertEqual(
+                get_setting("RESPONSE_COMPRESSION", "GZIP_LEVEL"),
+                DEFAULTS["RESPONSE_COMPRESSION"]["GZIP_LEVEL"],
+            )
+
+    def test_missing_namespace_takes_its_defaults(self):
+        with override_settings():
+            del settings.EVENT_STREAM
+            self.assertEqual(get_setting("EVENT_STREAM", "PATH"), "/events/")
+
+
+class SoftDeleteTests(ProjectsTestCase):
+    def test_deleted_project_is_hidden_until_purged(self):
+        self.authenticate(self.author)
+        url = f"/projects/{self.project.id}/"
+
+        response = self.client.delete(url)
+
+        self.assertEqual(response.status_code, 204)
+        self.assertEqual(self.client.get(url).status_code, 404)
+        self.assertEqual(self.client.get("/projects/").data["count"], 0)
+        self.assertTrue(Project.objects.get(id=self.project.id).is_deleted)
+        self.assertTrue(Issue.objects.filter(id=self.issue.id).exists())
+
+    def test_deleted_user_is_hidden_and_deactivated(self):
+        admin = self.create_user("admin@softdesk.fr", is_staff=True)
+        self.authenticate(admin)
+
+        response = self.client.delete(f"/accounts/{self.author.id}/")
+
+        self.assertEqual(response.status_code, 204)
+        self.author.refresh_from_db()
+        self.assertTrue(self.author.is_deleted)
+        self.assertFalse(self.author.is_active)
+        users = self.client.get("/accounts/").data["results"]
+        self.assertNotIn(self.author.email, [user["email"] for user in users])
+
+    def test_purge_deletes_projects_with_their_rows_in_chunks(self):
+        for _ in range(5):
+            self.create_comment(self.issue, self.author)
+        kept_project = self.create_project(self.author, "Gardé")
+        self.project.is_deleted = True
+        self.project.save()
+
+        project_count, user_count = purge_deleted(chunk_size=2)
+
+        self.assertEqual((project_count, user_count), (1, 0))
+        self.assertFalse(Project.objects.filter(id=self.project.id).exists())
+        self.assertFalse(Issue.objects.exists())
+        self.assertFalse(Comment.objects.exists())
+        self.assertTrue(Project.objects.filter(id=kept_project.id).exists())
+
+    def test_purge_detaches_the_rows_authored_by_deleted_users(self):
+        user = self.create_user("user@softdesk.fr")
+        self.add_contributor(self.project, user)
+        comment = self.create_comment(self.issue, user)
+        user.is_deleted = True
+        user.save()
+
+        call_command("purge_deleted", stdout=io.StringIO())
+
+        self.assertFalse(User.objects.filter(id=user.id).exists())
+        self.assertFalse(Contributor.objects.filter(user_id=user.id).exists())
+        comment.refresh_from_db()
+        self.assertIsNone(comment.author_user_id)
+
+
+class LabelChoiceFieldTests(ProjectsTestCase):
+    def test_labels_round_trip_to_integer_codes(self):
+        field = LabelChoiceField(choices=Issue.ISSUE_PRIORITY)
+
+        self.assertEqual(field.to_internal_value("ÉLEVÉE"), Issue.HIGH)
+        self.assertEqual(field.to_representation(Issue.HIGH), "ÉLEVÉE")
+        with self.assertRaises(ValidationError):
+            field.to_internal_value(str(Issue.HIGH))
+
+    def test_issue_is_stored_as_codes_and_served_as_labels(self):
+        self.authenticate(self.author)
+
+        response = self.client.post(
+            f"/projects/{self.project.id}/issues/",
+            {
+                "title": "Problème",
+                "desc": "Description",
+                "tag": "AMÉLIORATION",
+                "priority": "MOYENNE",
+                "status": "EN COURS",
+                "assignee_user": self.author.email,
+            },
+        )
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data["tag"], "AMÉLIORATION")
+        self.assertEqual(response.data["priority"], "MOYENNE")
+        self.assertEqual(response.data["status"], "EN COURS")
+        issue = Issue.objects.get(id=response.data["id"])
+        self.assertEqual(
+            (issue.tag, issue.priority, issue.status),
+            (Issue.IMPROVEMENT, Issue.MEDIUM, Issue.IN_PROGRESS),
+        )
+
+    def test_unknown_label_is_rejected(self):
+        self.authenticate(self.author)
+
+        response = self.client.patch(
+            f"/projects/{self.project.id}/issues/{self.issue.id}/",
+            {"status": "FINI"},
+        )
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("status", response.data)
+
+    def test_contributor_permission_is_written_as_a_label(self):
+        user = self.create_user("user@softdesk.fr")
+        self.authenticate(self.author)
+
+        response = self.client.post(
+            f"/projects/{self.project.id}/users/",
+            {"user": user.email, "permission": "Contributeur", "role": "Dev"},
+        )
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data["permission"], "Contributeur")
+        contributor = Contributor.objects.get(user=user)
+        self.assertEqual(contributor.permission, Contributor.CONTRIBUTOR)
+
+
+class AdminTests(ProjectsTestCase):
+    def setUp(self):
+        super().setUp()
+        admin = User.objects.create_superuser("admin@softdesk.fr", "pw")
+        self.client.force_login(admin)
+
+    def count_changelist_queries(self, url):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(context)
+
+    def test_changelists_run_a_constant_number_of_queries(self):
+        for url in (
+            "/admin/projects/issue/",
+            "/admin/projects/comment/",
+            "/admin/projects/contributor/",
+        ):
+            with self.subTest(url=url):
+                self.create_comment(self.issue, self.author)
+                query_count = self.count_changelist_queries(url)
+                user = self.create_user(f"{len(url)}@softdesk.fr")
+                self.add_contributor(self.project, user)
+                for _ in range(3):
+                    issue = self.create_issue(self.project, user)
+                    self.create_comment(issue, user)
+                self.assertEqual(
+                    self.count_changelist_queries(url), query_count
+                )
+
+    def test_paginator_uses_the_estimate_of_huge_tables(self):
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE")
+            cursor.execute(
+                "UPDATE sqlite_stat1 SET stat = '500000 1' WHERE tbl = %s",
+                [Issue._meta.db_table],
+            )
+        paginator = EstimatedCountPaginator(Issue.objects.order_by("id"), 20)
+        paginator.threshold = 0
+
+        self.assertEqual(paginator.count, 500000)
+
+    def test_paginator_counts_filtered_lists(self):
+        self.create_issue(self.project, self.author, status=Issue.DONE)
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE")
+        paginator = EstimatedCountPaginator(
+            Issue.objects.filter(status=Issue.DONE).order_by("id"), 20
+        )
+        paginator.threshold = 0
+
+        self.assertEqual(paginator.count, 1)
+
+
+class BatchTests(ProjectsTestCase):
+    def post_batch(self, *paths):
+        return self.client.post(
+            "/projects/batch/",
+            {"requests": [{"path": path} for path in paths]},
+            format="json",
+        )
+
+    def test_sub_requests_are_answered_in_order(self):
+        self.authenticate(self.author)
+        project_url = f"/projects/{self.project.id}/"
+
+        response = self.post_batch(project_url, f"{project_url}issues/")
+
+        self.assertEqual(response.status_code, 200)
+        first, second = response.data["responses"]
+        self.assertEqual((first["path"], first["status"]), (project_url, 200))
+        self.assertEqual(first["data"]["title"], self.project.title)
+        self.assertEqual(second["status"], 200)
+        self.assertEqual(second["data"]["results"][0]["id"], self.issue.id)
+
+    def test_sub_requests_keep_their_own_permissions_and_errors(self):
+        other_project = self.create_project(self.create_user("x@softdesk.fr"))
+        self.authenticate(self.author)
+
+        response = self.post_batch(
+            f"/projects/{other_project.id}/",
+            "/projects/unknown/path/",
+            "/projects/batch/",
+        )
+
+        statuses = [item["status"] for item in response.data["responses"]]
+        self.assertEqual(statuses, [403, 404, 404])
+
+    def test_invalid_batches_are_rejected(self):
+        self.authenticate(self.author)
+
+        self.assertEqual(self.post_batch("/accounts/").status_code, 400)
+        paths = [f"/projects/{self.project.id}/"] * 21
+        self.assertEqual(self.post_batch(*paths).status_code, 400)
+
+    def test_batch_requires_authentication(self):
+        response = self.post_batch(f"/projects/{self.project.id}/")
+
+        self.assertEqual(response.status_code, 401)
+
+
+class TimelineTests(ProjectsTestCase):
+    def setUp(self):
+        super().setUp()
+        self.url = f"/projects/{self.project.id}/timeline/"
+        self.authenticate(self.author)
+
+    def test_cursor_pages_walk_every_event_once_newest_first(self):
+        for _ in range(3):
+            issue = self.create_issue(self.project, self.author)
+            self.create_comment(issue, self.author)
+        # Ties on the created time are ordered by kind and id.
+        Issue.objects.update(created_time=timezone.now())
+        events = []
+        url = f"{self.url}?limit=2"
+        while url is not None:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            self.assertLessEqual(len(response.data["results"]), 2)
+            events += response.data["results"]
+            url = response.data["next"]
+
+        self.assertEqual(len(events), 7)
+        keys = [(event["type"], event["id"]) for event in events]
+        self.assertEqual(len(set(keys)), 7)
+        times = [event["created_time"] for event in events]
+        self.assertEqual(times, sorted(times, reverse=True))
+        self.assertEqual(
+            sum(event["type"] == "comment_created" for event in events), 3
+        )
+
+    def test_each_table_is_read_by_an_index_seek_without_sorting(self):
+        for _ in range(3):
+            self.create_comment(self.issue, self.author)
+        next_url = self.client.get(f"{self.url}?limit=2").data["next"]
+        with CaptureQueriesContext(connection) as context:
+            self.client.get(next_url)
+
+        event_queries = [
+            query["sql"]
+            for query in context.captured_queries
+            if '"created_time" DESC' in query["sql"]
+        ]
+        self.assertEqual(len(event_queries), 3)
+        for sql in event_queries:
+            with connection.cursor() as cursor:
+                cursor.execute(f"EXPLAIN QUERY PLAN {sql}")
+                plan = " ".join(row[-1] for row in cursor.fetchall())
+            with self.subTest(plan=plan):
+                self.assertIn("USING INDEX", plan)
+                self.assertNotIn("TEMP B-TREE", plan)
+
+    def test_limit_is_clamped_between_one_and_the_maximum(self):
+        for limit in (0, -1):
+            with self.subTest(limit=limit):
+                response = self.client.get(f"{self.url}?limit={limit}")
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(len(response.data["results"]), 1)
+                self.assertIsNone(response.data["next"])
+
+    def test_invalid_limit_and_cursor_are_rejected(self):
+        response = self.client.get(f"{self.url}?limit=abc")
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("limit", response.data)
+        response = self.client.get(f"{self.url}?cursor=invalid")
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("cursor", response.data)
+
+    def test_timeline_is_reserved_to_contributors(self):
+        self.authenticate(self.create_user("x@softdesk.fr"))
+
+        self.assertEqual(self.client.get(self.url).status_code, 403)
+
+
+class StatusHistoryTests(ProjectsTestCase):
+    def setUp(self):
+        super().setUp()
+        self.url = f"/projects/{self.project.id}/issues/{self.issue.id}/"
+        self.authenticate(self.author)
+
+    def test_status_changes_are_recorded_and_rolled_up(self):
+        for status in ("EN COURS", "EN COURS", "TERMINÉ"):
+            response = self.client.patch(self.url, {"status": status})
+            self.assertEqual(response.status_code, 200)
+
+        changes = IssueStatusChange.objects.order_by("id")
+        self.assertEqual(
+            [(change.from_status, change.to_status) for change in changes],
+            [
+                (Issue.TO_DO, Issue.IN_PROGRESS),
+                (Issue.IN_PROGRESS, Issue.DONE),
+            ],
+        )
+        rollups = IssueStatusRollup.objects.filter(project=self.project)
+        self.assertEqual(sum(rollup.count for rollup in rollups), 2)
+        self.assertEqual(
+            set(rollups.values_list("bucket", flat=True)), {get_bucket(0)}
+        )
+
+    def test_identical_changes_share_their_rollup_row(self):
+        other_issue = self.create_issue(self.project, self.author)
+        for issue in (self.issue, other_issue):
+            self.client.patch(
+                f"/projects/{self.project.id}/issues/{issue.id}/",
+                {"status": "TERMINÉ"},
+            )
+
+        rollup = IssueStatusRollup.objects.get()
+        self.assertEqual(rollup.count, 2)
+
+    def test_buckets_grow_geometrically_up_to_the_last_one(self):
+        self.assertEqual(get_bucket(0), 0)
+        self.assertEqual(get_bucket(60), 0)
+        self.assertEqual(get_bucket(61), 1)
+        self.assertEqual(get_bucket(get_bucket_bound(5)), 5)
+        self.assertEqual(get_bucket(get_bucket_bound(5) + 1), 6)
+        self.assertEqual(get_bucket(10**12), BUCKET_COUNT - 1)
+
+    def test_cycle_time_report_reads_the_rollups(self):
+        self.client.patch(self.url, {"status": "TERMINÉ"})
+        today = timezone.localdate().isoformat()
+
+        response = self.client.get(
+            f"/projects/{self.project.id}/cycle-time/?since={today}"
+        )
+
+        self.assertEqual(response.status_code, 200)
+        (row,) = response.data["cycle_time"]
+        self.assertEqual((row["status"], row["count"]), ("À FAIRE", 1))
+        self.assertEqual(row["median"], get_bucket_bound(0))
+        self.assertEqual(response.data["throughput"][0]["count"], 1)
+
+    def test_cycle_time_rejects_invalid_days(self):
+        response = self.client.get(
+            f"/projects/{self.project.id}/cycle-time/?until=demain"
+        )
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("until", response.data)
+
+
+class WriteCoalescerTests(ProjectsTestCase):
+    def test_failed_write_is_rolled_back_alone(self):
+        def fail():
+            self.create_comment(self.issue, self.author, "Annulé")
+            raise ValueError("refusé")
+
+        def succeed():
+            return self.create_comment(self.issue, self.author)
+
+        futures = [Future(), Future(), Future()]
+        WriteCoalescer.write(list(zip([succeed, fail, succeed], futures)))
+
+        self.assertIsInstance(futures[0].result(), Comment)
+        self.assertIsInstance(futures[2].result(), Comment)
+        with self.assertRaisesMessage(ValueError, "refusé"):
+            futures[1].result()
+        self.assertEqual(Comment.objects.count(), 2)
+        self.assertFalse(Comment.objects.filter(description="Annulé"))
+
+    def test_concurrent_writes_are_grouped_in_batches(self):
+        batch_sizes = []
+
+        class RecordingCoalescer(WriteCoalescer):
+            @staticmethod
+            def write(batch, using="default"):
+                batch_sizes.append(len(batch))
+                for write, future in batch:
+                    future.set_result(write())
+
+        coalescer = RecordingCoalescer(window=0.2, max_batch=100, timeout=5)
+        results = []
+        threads = [
+            threading.Thread(
+                target=lambda value=value: results.append(
+                    coalescer.submit(lambda: value)
+                )
+            )
+            for value in range(8)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(sorted(results), list(range(8)))
+        self.assertEqual(sum(batch_sizes), 8)
+        self.assertLess(len(batch_sizes), 8)
+
+    def test_cancelled_writes_are_skipped(self):
+        futures = [Future(), Future()]
+        futures[0].cancel()
+
+        def write():
+            return self.create_comment(self.issue, self.author)
+
+        WriteCoalescer.write([(write, future) for future in futures])
+
+        self.assertEqual(Comment.objects.count(), 1)
+        self.assertIsInstance(futures[1].result(), Comment)
+
+    def test_caller_waits_at_most_the_timeout(self):
+        started, release = threading.Event(), threading.Event()
+        ran = []
+
+        class BlockingCoalescer(WriteCoalescer):
+            @staticmethod
+            def write(batch, using="default"):
+                for write, future in batch:
+                    if future.set_running_or_notify_cancel():
+                        future.set_result(write())
+
+        def block():
+            started.set()
+            release.wait(5)
+
+        coalescer = BlockingCoalescer(window=0, max_batch=1, timeout=0.01)
+        blocked = threading.Thread(target=coalescer.submit, args=[block])
+        blocked.start()
+        started.wait(5)
+
+        with self.assertRaises(WriteTimeout):
+            coalescer.submit(lambda: ran.append(True))
+        release.set()
+        blocked.join()
+
+        self.assertEqual(coalescer.submit(lambda: "suivant"), "suivant")
+        self.assertEqual(ran, [])
+
+    def test_worker_survives_a_failed_batch(self):
+        class FailingCoalescer(WriteCoalescer):
+            calls = 0
+
+            def write(self, batch, using="default"):
+                self.calls += 1
+                if self.calls == 1:
+                    raise KeyboardInterrupt
+                for write, future in batch:
+                    future.set_result(write())
+
+        coalescer = FailingCoalescer(window=0, max_batch=1, timeout=5)
+        with mock.patch(
+            "projects.coalescer.close_old_connections"
+        ) as close_old_connections:
+            with self.assertRaises(KeyboardInterrupt):
+                coalescer.submit(lambda: "perdu")
+            self.assertEqual(coalescer.submit(lambda: "écrit"), "écrit")
+
+        self.assertEqual(close_old_connections.call_count, 4)
+
+
+@override_settings(
+    PASSWORD_HASHERS=["django.contrib.auth.hashers.MD5PasswordHasher"],
+    WRITE_COALESCING={"ENABLED": True},
+)
+class CoalescedCreationTests(ProjectsTestMixin, APITransactionTestCase):
+    def test_comment_created_through_the_coalescer(self):
+        self.authenticate(self.author)
+
+        with mock.patch.object(
+            write_coalescer, "submit", wraps=write_coalescer.submit
+        ) as submit:
+            response = self.client.post(
+                f"/projects/{self.project.id}/issues/{self.issue.id}/"
+                "comments/",
+                {"description": "Groupé"},
+            )
+
+        self.assertEqual(response.status_code, 201)
+        submit.assert_called_once()
+        comment = Comment.objects.get(id=response.data["comment_id"])
+        self.assertEqual(comment.project_id, self.project.id)
+        self.assertEqual(comment.author_user_id, self.author.id)
+
+
+class ShardingTests(ProjectsTestCase):
+    sharded = override_settings(SHARDING={"SHARDS": ["default"]})
+
+    def test_migration_places_the_existing_projects(self):
+        migration = importlib.import_module(
+            "projects.migrations.0009_project_sharding"
+        )
+
+        migration.place_existing_projects(
+            apps, SimpleNamespace(connection=connection)
+        )
+
+        placement = ProjectPlacement.objects.get(id=self.project.id)
+        self.assertEqual(placement.shard, "default")
+        self.assertGreater(place_new_project("default").id, self.project.id)
+
+    def test_new_projects_keep_clear_of_the_existing_ids(self):
+        self.authenticate(self.author)
+        with self.sharded:
+            place_existing_projects()
+            created_ids = [
+                self.client.post(
+                    "/projects/",
+                    {"title": "Nouveau", "description": "D", "type": "iOs"},
+                ).data["project_id"]
+                for _ in range(2)
+            ]
+            response = self.client.get(f"/projects/{self.project.id}/")
+
+        self.assertEqual(len(set(created_ids)), 2)
+        self.assertGreater(min(created_ids), self.project.id)
+        self.assertEqual(response.data["title"], self.project.title)
+
+    def test_projects_are_routed_to_their_shard(self):
+        self.authenticate(self.author)
+        with self.sharded:
+            place_existing_projects()
+            self.assertEqual(get_project_shard(self.project.id), "default")
+            # Projects without placement are looked for on the first shard.
+            self.assertEqual(get_project_shard(10**9), "default")
+            response = self.client.get("/projects/")
+
+        self.assertEqual(response.data["count"], 1)
+        self.assertEqual(
+            response.data["results"][0]["project_id"], self.project.id
+        )
+
+    def test_events_wait_for_the_transaction_of_the_row_database(self):
+        comment = self.create_comment(self.issue, self.author)
+        with mock.patch.object(
+            type(broker), "has_subscribers", new_callable=mock.PropertyMock
+        ) as has_subscribers, mock.patch(
+            "projects.signals.transaction.on_commit"
+        ) as on_commit:
+            has_subscribers.return_value = True
+            publish_save_event(
+                Comment, instance=comment, created=True, using="shard1"
+            )
+            publish_delete_event(Comment, instance=comment, using="shard1")
+
+        self.assertEqual(
+            [call.kwargs["using"] for call in on_commit.call_args_list],
+            ["shard1", "shard1"],
+        )
+
+    def test_rollup_savepoint_is_on_the_database_of_the_change(self):
+        change = IssueStatusChange.objects.create(
+            issue=self.issue,
+            project_id=self.project.id,
+            from_status=Issue.TO_DO,
+            to_status=Issue.DONE,
+            author_user=self.author,
+        )
+        with self.sharded, mock.patch(
+            "projects.history.router.db_for_write", return_value="default"
+        ) as db_for_write, mock.patch(
+            "projects.history.transaction.atomic", wraps=transaction.atomic
+        ) as atomic:
+            add_to_rollup(self.issue, change, 60)
+
+        db_for_write.assert_called_once_with(
+            IssueStatusRollup, instance=change
+        )
+        atomic.assert_called_once_with(using="default")
+        self.assertEqual(IssueStatusRollup.objects.get().count, 1)
+
+    def delete_contributor_user(self):
+        user = self.create_user("user@softdesk.fr")
+        self.add_contributor(self.project, user)
+        admin = self.create_user("admin@softdesk.fr", is_staff=True)
+        self.authenticate(admin)
+        self.client.delete(f"/accounts/{user.id}/")
+        self.authenticate(self.author)
+        return user
+
+    def test_deleted_user_memberships_are_hidden_when_unsharded(self):
+        user = self.delete_contributor_user()
+
+        response = self.client.get(f"/projects/{self.project.id}/users/")
+
+        user_ids = [item["user_id"] for item in response.data["results"]]
+        self.assertEqual(user_ids, [self.author.id])
+        # Kept until the purge, the soft delete stays reversible.
+        self.assertTrue(Contributor.objects.filter(user=user).exists())
+
+    def test_deleted_user_memberships_are_removed_when_sharded(self):
+        with self.sharded:
+            user = self.delete_contributor_user()
+
+        self.assertFalse(Contributor.objects.filter(user=user).exists())
+
+
+class IntegrityRuleTests(ProjectsTestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = self.create_user("user@softdesk.fr")
+
+    def test_database_rejects_assignees_outside_the_project(self):
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            self.create_issue(
+                self.project, self.author, assignee_user=self.user
+            )
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            Issue.objects.filter(id=self.issue.id).update(
+                assignee_user=self.user
+            )
+
+    def test_database_rejects_comments_outside_the_project_of_the_issue(self):
+        other_project = self.create_project(self.author, "Autre")
+
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            Comment.objects.create(
+                issue=self.issue,
+                project=other_project,
+                author_user=self.author,
+                description="Commentaire",
+            )
+
+    def test_removed_contributor_is_unassigned(self):
+        contributor = self.add_contributor(self.project, self.user)
+        self.issue.assignee_user = self.user
+        self.issue.save()
+
+        contributor.delete()
+
+        self.issue.refresh_from_db()
+        self.assertIsNone(self.issue.assignee_user_id)
+
+    def test_rejected_writes_are_explained_by_the_checks(self):
+        self.authenticate(self.author)
+
+        response = self.client.patch(
+            f"/projects/{self.project.id}/issues/{self.issue.id}/",
+            {"assignee_user": self.user.email},
+        )
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(
+            response.data["detail"],
+            "Le contributeur indiqué n'existe pas pour ce projet.",
+        )
+
+        response = self.client.post(
+            f"/projects/{self.project.id}/users/",
+            {"user": self.author.email, "permission": "Contributeur"},
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("user", response.data)
+
+        other_project = self.create_project(self.author, "Autre")
+        response = self.client.post(
+            f"/projects/{other_project.id}/issues/{self.issue.id}/comments/",
+            {"description": "Commentaire"},
+        )
+        self.assertEqual(response.status_code, 404)
+        self.assertFalse(Comment.objects.exists())
+
+    def test_unexplained_errors_are_raised_unchanged(self):
+        def check():
+            pass
+
+        with self.assertRaises(IntegrityError):
+            with explain_integrity_error(check):
+                raise IntegrityError("inconnue")
+
+        def fail():
+            raise NotFound("expliquée")
+
+        with self.assertRaisesMessage(NotFound, "expliquée"):
+            with explain_integrity_error(check, fail):
+                raise IntegrityError("inconnue")
+
+
+class AdmissionControlTests(ProjectsTestCase):
+    def test_requests_are_sorted_into_route_classes(self):
+        factory = RequestFactory()
+        for request, route_class in (
+            (factory.post("/login/"), "auth"),
+            (factory.get("/projects/1/timeline/"), "export"),
+            (factory.post("/projects/batch/"), "export"),
+            (factory.get("/projects/1/issues/"), "read"),
+            (factory.delete("/projects/1/"), "write"),
+        ):
+            with self.subTest(path=request.path, method=request.method):
+                self.assertEqual(
+                    admission_controller.get_route_class(request), route_class
+                )
+
+    def test_full_class_sheds_at_once_when_its_queue_is_full(self):
+        limiter = RouteClassLimiter(limit=1, queue=0, timeout=10)
+
+        self.assertTrue(limiter.acquire())
+        self.assertFalse(limiter.acquire())
+        limiter.release()
+        self.assertTrue(limiter.acquire())
+        self.assertEqual(limiter.get_metrics()["shed"], 1)
+
+    def test_queued_request_waits_for_a_slot_or_its_timeout(self):
+        limiter = RouteClassLimiter(limit=1, queue=1, timeout=0.01)
+        limiter.acquire()
+        self.assertFalse(limiter.acquire())
+
+        limiter.timeout = 5
+        timer = threading.Timer(0.01, limiter.release)
+        timer.start()
+        self.assertTrue(limiter.acquire())
+        timer.join()
+        self.assertEqual(limiter.get_metrics()["running"], 1)
+
+    def test_middleware_answers_503_when_shedding(self):
+        middleware = AdmissionControlMiddleware(lambda request: HttpResponse())
+        limiter = RouteClassLimiter(limit=0, queue=0, timeout=0)
+
+        with mock.patch.dict(admission_controller.limiters, read=limiter):
+            response = middleware(RequestFactory().get("/projects/"))
+
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response["Retry-After"], "1")
+
+    def test_metrics_are_reserved_to_administrators(self):
+        self.authenticate(self.author)
+        self.assertEqual(self.client.get("/admission/").status_code, 403)
+
+        self.authenticate(self.create_user("a@softdesk.fr", is_staff=True))
+        response = self.client.get("/admission/")
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("admitted", response.data["auth"])
+
+
+class SingleFlightTests(ProjectsTestCase):
+    def setUp(self):
+        super().setUp()
+        self.started = threading.Event()
+        self.release = threading.Event()
+
+    def run_concurrently(self, flight, compute, count):
+        """Run the computation from several threads while it is in flight."""
+        outcomes = []
+
+        def call():
+            try:
+                outcomes.append(flight.run("key", compute))
+            except Exception as exception:
+                outcomes.append(exception)
+
+        leader = threading.Thread(target=call)
+        leader.start()
+        self.started.wait(5)
+        followers = [threading.Thread(target=call) for _ in range(count - 1)]
+        for follower in followers:
+            follower.start()
+        while flight.shared < count - 1:
+            time.sleep(0.001)
+        self.release.set()
+        for thread in [leader, *followers]:
+            thread.join()
+
+        return outcomes
+
+    def test_identical_calls_share_one_computation(self):
+        calls = []
+
+        def compute():
+            calls.append(1)
+            self.started.set()
+            self.release.wait(5)
+            return "résultat"
+
+        outcomes = self.run_concurrently(SingleFlight(), compute, 4)
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(outcomes, ["résultat"] * 4)
+
+    def test_failed_computation_is_raised_to_every_caller(self):
+        flight = SingleFlight()
+
+        def compute():
+            self.started.set()
+            self.release.wait(5)
+            raise ValueError("échec")
+
+        outcomes = self.run_concurrently(flight, compute, 3)
+
+        self.assertEqual(len(outcomes), 3)
+        for outcome in outcomes:
+            self.assertIsInstance(outcome, ValueError)
+        self.assertEqual(flight.run("key", lambda: "nouveau"), "nouveau")
+
+    @override_settings(SINGLE_FLIGHT={"ENABLED": True})
+    def test_flights_are_keyed_by_url_and_role(self):
+        user = self.create_user("user@softdesk.fr")
+        self.add_contributor(self.project, user)
+        url = f"/projects/{self.project.id}/issues/"
+        keys = []
+        run = single_flight.run
+
+        def record(key, compute):
+            keys.append(key)
+            return run(key, compute)
+
+        with mock.patch.object(single_flight, "run", side_effect=record):
+            responses = []
+            for caller in (self.author, user):
+                self.authenticate(caller)
+                responses.append(self.client.get(url))
+
+        self.assertEqual(responses[0].content, responses[1].content)
+        results = responses[0].json()["results"]
+        self.assertEqual(results[0]["id"], self.issue.id)
+        self.assertEqual(keys[0][:2], keys[1][:2])
+        self.assertEqual(
+            [key[2] for key in keys],
+            [Contributor.RESPONSIBLE, Contributor.CONTRIBUTOR],
+        )
+
+    @override_settings(SINGLE_FLIGHT={"ENABLED": True})
+    def test_batch_sub_requests_get_the_data_of_the_flight(self):
+        self.authenticate(self.author)
+        batch = {
+            "requests": [{"path": f"/projects/{self.project.id}/issues/"}]
+        }
+        results = []
+        run = single_flight.run
+
+        def lead(key, compute):
+            results.append(run(key, compute))
+            return results[-1]
+
+        def wait(key, compute):
+            # Answered by a flight led by another request.
+            return results[0]
+
+        responses = []
+        for side_effect in (lead, wait):
+            with mock.patch.object(
+                single_flight, "run", side_effect=side_effect
+            ):
+                responses.append(
+                    self.client.post("/projects/batch/", batch, format="json")
+                )
+
+        for response in responses:
+            self.assertEqual(response.status_code, 200)
+            (sub_response,) = response.data["responses"]
+            self.assertEqual(sub_response["status"], 200)
+            self.assertEqual(
+                sub_response["data"]["results"][0]["id"], self.issue.id
+            )
+
+
+class TrafficCaptureTests(ProjectsTestCase):
+    def setUp(self):
+        super().setUp()
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = f"{directory.name}/traffic.jsonl"
+
+    def read_log(self):
+        with open(self.path, encoding="utf-8") as log:
+            return [json.loads(line) for line in log]
+
+    def test_only_the_shape_of_the_requests_is_written(self):
+        self.authenticate(self.author)
+        with override_settings(
+            TRAFFIC_CAPTURE={"ENABLED": True, "PATH": self.path}
+        ):
+            self.client.get(
+                f"/projects/{self.project.id}/issues/?limit=5&search=secret"
+            )
+            self.client.post(
+                f"/projects/{self.project.id}/issues/",
+                {
+                    "title": "Titre secret",
+                    "desc": "Description",
+                    "tag": "BUG",
+                    "priority": "FAIBLE",
+                    "status": "À FAIRE",
+                    "assignee_user": self.author.email,
+                },
+                format="json",
+            )
+
+        listing, creation = self.read_log()
+        self.assertEqual(listing["route"], "issue-list")
+        self.assertEqual(
+            listing["kwargs"], {"project_pk": str(self.project.id)}
+        )
+        self.assertEqual(listing["query"], {"limit": "5"})
+        self.assertEqual(listing["role"], "responsible")
+        self.assertEqual(listing["status"], 200)
+        self.assertEqual(creation["method"], "POST")
+        self.assertEqual(creation["body"]["title"], len("Titre secret"))
+        self.assertEqual(creation["status"], 201)
+        self.assertEqual(creation["body"]["tag"], "BUG")
+        self.assertNotIn("secret", json.dumps(self.read_log()))
+
+    def test_nothing_is_written_when_disabled(self):
+        middleware = TrafficCaptureMiddleware(lambda request: HttpResponse())
+        middleware.log.path = self.path
+
+        middleware(RequestFactory().get("/projects/"))
+
+        with self.assertRaises(FileNotFoundError):
+            self.read_log()
+
+
+@override_settings(
+    PASSWORD_HASHERS=["django.contrib.auth.hashers.MD5PasswordHasher"]
+)
+class TrafficReplayTests(ProjectsTestMixin, APITransactionTestCase):
+    def replay(self, *records):
+        """Run the command on a log of the records, return its report."""
+        with tempfile.NamedTemporaryFile("w", suffix=".jsonl") as log:
+            for record in records:
+                log.write(json.dumps(record) + "\n")
+            log.flush()
+            stdout = io.StringIO()
+            call_command(
+                "replay_traffic",
+                log.name,
+                speed=0,
+                concurrency=1,
+                host="testserver",
+                stdout=stdout,
+            )
+        return stdout.getvalue()
+
+    def get_record(self, **fields):
+        return {
+            "at": 1.0,
+            "route": "issue-list",
+            "method": "GET",
+            "kwargs": {"project_pk": str(self.project.id)},
+            "query": {},
+            "body": None,
+            "size": 0,
+            "role": "responsible",
+            "status": 200,
+            "duration": 0.01,
+            **fields,
+        }
+
+    def test_writes_are_replayed_as_a_user_having_the_role(self):
+        report = self.replay(
+            self.get_record(),
+            self.get_record(
+                at=2.0,
+                method="POST",
+                body={
+                    "title": 5,
+                    "desc": 11,
+                    "tag": "BUG",
+                    "priority": "FAIBLE",
+                    "status": "À FAIRE",
+                    "assignee_user": 18,
+                },
+                status=201,
+            ),
+        )
+
+        issue = Issue.objects.latest("id")
+        self.assertEqual(issue.title, "xxxxx")
+        self.assertEqual(issue.author_user, self.author)
+        self.assertIn("POST issue-list", report)
+
+    def test_deletion_keeps_its_query_in_the_url(self):
+        with mock.patch.object(
+            APIClient, "delete", autospec=True, side_effect=APIClient.delete
+        ) as delete:
+            self.replay(
+                self.get_record(
+                    route="issue-detail",
+                    method="DELETE",
+                    kwargs={
+                        "project_pk": str(self.project.id),
+                        "pk": str(self.issue.id),
+                    },
+                    query={"archived": "false"},
+                    status=204,
+                )
+            )
+
+        _, path, data = delete.call_args.args
+        self.assertEqual(
+            path,
+            f"/projects/{self.project.id}/issues/{self.issue.id}/"
+            "?archived=false",
+        )
+        self.assertIsNone(data)
+        self.assertFalse(Issue.objects.filter(id=self.issue.id).exists())
+
+    def test_unknown_routes_are_counted_as_errors(self):
+        report = self.replay(self.get_record(route="removed-route"))
+
+        row = next(line for line in report.splitlines() if "removed" in line)
+        self.assertEqual(row.split()[-2:], ["1", "1"])
+
+
+class ProfilingTests(ProjectsTestCase):
+    def setUp(self):
+        super().setUp()
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        profiling = override_settings(
+            PROFILING={
+                "ENABLED": True,
+                "SECRET": "secret",
+                "PATH": self.directory.name,
+            }
+        )
+        profiling.enable()
+        self.addCleanup(profiling.disable)
+        self.superuser = self.create_user(
+            "admin@softdesk.fr", is_staff=True, is_superuser=True
+        )
+
+    def test_superusers_profile_a_request_with_the_header(self):
+        self.authenticate(self.superuser)
+
+        self.client.get("/projects/", HTTP_X_PROFILE="secret")
+
+        (profile,) = get_profiles()
+        self.assertEqual(profile["route"], "project-list")
+        response = self.client.get(
+            f"/profiles/{profile['route']}/{profile['name']}/"
+        )
+        self.assertEqual(response.status_code, 200)
+        response = self.client.get("/profiles/")
+        self.assertEqual(response.data[0]["name"], profile["name"])
+
+    def test_header_of_other_users_is_ignored_without_extra_queries(self):
+        self.authenticate(self.author)
+        # The first request fills the per-process caches.
+        self.client.get("/projects/")
+        with CaptureQueriesContext(connection) as plain:
+            self.client.get("/projects/")
+        with CaptureQueriesContext(connection) as profiled:
+            self.client.get("/projects/", HTTP_X_PROFILE="secret")
+
+        self.assertEqual(len(profiled), len(plain))
+        self.assertEqual(get_profiles(), [])
+
+    def test_header_without_the_secret_starts_no_profiler(self):
+        middleware = ProfilingMiddleware(lambda request: HttpResponse())
+        with override_settings(
+            PROFILING={"ENABLED": True, "PATH": self.directory.name}
+        ):
+            unconfigured = ProfilingMiddleware(lambda request: HttpResponse())
+        requests = [
+            (middleware, RequestFactory().get("/", HTTP_X_PROFILE="1")),
+            (unconfigured, RequestFactory().get("/", HTTP_X_PROFILE="")),
+        ]
+
+        with mock.patch("cProfile.Profile") as profile:
+            for handler, request in requests:
+                request.user = self.superuser
+                handler(request)
+
+        profile.assert_not_called()
+
+    def test_profile_paths_stay_in_the_profile_directory(self):
+        for route, name in [
+            ("..", "secret.prof"),
+            ("project-list", ".."),
+            (".", "x.prof"),
+            ("project-list", "../x.prof"),
+        ]:
+            with self.subTest(route=route, name=name):
+                self.assertIsNone(get_profile_path(route, name))
+
+    def test_sampled_requests_are_profiled_for_everyone(self):
+        with override_settings(
+            PROFILING={
+                "ENABLED": True,
+                "SAMPLE_RATE": 1.0,
+                "PATH": self.directory.name,
+            }
+        ):
+            middleware = ProfilingMiddleware(lambda request: HttpResponse())
+            request = RequestFactory().get("/projects/")
+            request.user = AnonymousUser()
+
+            middleware(request)
+
+            self.assertEqual(get_profiles()[0]["route"], "unresolved")
+
+    def test_profiling_is_disabled_by_default(self):
+        with override_settings(PROFILING={}):
+            middleware = ProfilingMiddleware(lambda request: HttpResponse())
+        request = RequestFactory().get("/projects/", HTTP_X_PROFILE="secret")
+        request.user = self.superuser
+
+        with mock.patch("cProfile.Profile") as profile:
+            middleware(request)
+
+        profile.assert_not_called()
+
+
+class TokenRevocationTests(ProjectsTestCase):
+    def setUp(self):
+        super().setUp()
+        self.filter = RevocationFilter()
+
+    def test_bloom_filter_has_no_false_negatives_and_few_false_positives(self):
+        bloom = BloomFilter(1000, 0.01)
+        for index in range(1000):
+            bloom.add(f"membre-{index}")
+
+        self.assertTrue(
+            all(f"membre-{index}" in bloom for index in range(1000))
+        )
+        false_positives = sum(
+            f"autre-{index}" in bloom for index in range(1000)
+        )
+        self.assertLess(false_positives, 50)
+
+    def test_tokens_issued_after_the_user_revocation_need_no_query(self):
+        old_token = AccessToken.for_user(self.author)
+        old_token["iat"] -= 60
+        revocation = revoke_user_tokens(self.author)
+        new_token = AccessToken.for_user(self.author)
+        new_token["iat"] = int(revocation.created_time.timestamp()) + 1
+        self.filter.sync()
+
+        with self.assertNumQueries(0):
+            self.assertFalse(self.filter.is_revoked(new_token))
+        with self.assertNumQueries(1):
+            self.assertTrue(self.filter.is_revoked(old_token))
+
+    def test_tokens_issued_in_the_second_of_the_user_revocation_are_kept(
+        self,
+    ):
+        revocation = revoke_user_tokens(self.author)
+        token = AccessToken.for_user(self.author)
+        token["iat"] = int(revocation.created_time.timestamp())
+        old_token = AccessToken.for_user(self.author)
+        old_token["iat"] = token["iat"] - 1
+        self.filter.sync()
+
+        with self.assertNumQueries(0):
+            self.assertFalse(self.filter.is_revoked(token))
+        self.assertTrue(self.filter.is_revoked(old_token))
+        # The table is read at the same precision.
+        self.filter._user_revoked_at[str(self.author.id)] = float("inf")
+        with self.assertNumQueries(1):
+            self.assertFalse(self.filter.is_revoked(token))
+        self.authenticate(self.author)
+        self.assertEqual(self.client.get("/projects/").status_code, 200)
+
+    @override_settings(
+        TOKEN_REVOCATION={"SYNC_INTERVAL": 0, "REBUILD_INTERVAL": 0}
+    )
+    def test_rebuilt_filter_is_swapped_in_once_filled(self):
+        token = AccessToken.for_user(self.author)
+        revoke_token(token)
+        self.filter.sync()
+        seen = []
+        add = BloomFilter.add
+
+        def check_and_add(bloom, key):
+            # What a concurrent reader sees during the rebuild.
+            seen.append(key in self.filter._bloom)
+            add(bloom, key)
+
+        with mock.patch.object(BloomFilter, "add", check_and_add):
+            self.filter.sync()
+
+        self.assertEqual(seen, [True])
+        self.assertTrue(self.filter.is_revoked(token))
+
+    def test_revoked_jti_is_looked_up_in_the_table(self):
+        token = AccessToken.for_user(self.author)
+        other_token = AccessToken.for_user(self.author)
+        revoke_token(token)
+        self.filter.sync()
+
+        with self.assertNumQueries(1):
+            self.assertTrue(self.filter.is_revoked(token))
+        with self.assertNumQueries(0):
+            self.assertFalse(self.filter.is_revoked(other_token))
+
+    def test_revoked_session_is_rejected(self):
+        refresh = RefreshToken.for_user(self.author)
+        self.client.credentials(
+            HTTP_AUTHORIZATION=f"Bearer {refresh.access_token}"
+        )
+
+        response = self.client.post(
+            "/login/revoke/", {"refresh": str(refresh)}
+        )
+
+        self.assertEqual(response.status_code, 204)
+        self.assertEqual(self.client.get("/projects/").status_code, 401)
+        response = self.client.post(
+            "/login/refresh/", {"refresh": str(refresh)}
+        )
+        self.assertEqual(response.status_code, 401)
+
+    def test_refresh_token_of_another_user_is_refused(self):
+        other = self.create_user("autre@softdesk.fr")
+        self.authenticate(self.author)
+
+        response = self.client.post(
+            "/login/revoke/", {"refresh": str(RefreshToken.for_user(other))}
+        )
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(self.client.get("/projects/").status_code, 200)
+
+    def test_administrators_revoke_every_token_of_a_user(self):
+        admin = self.create_user("admin@softdesk.fr", is_staff=True)
+        token = AccessToken.for_user(self.author)
+        token["iat"] -= 60
+        self.authenticate(admin)
+
+        response = self.client.post(
+            f"/accounts/{self.author.id}/revoke-tokens/"
+        )
+
+        self.assertEqual(response.status_code, 204)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+        self.assertEqual(self.client.get("/projects/").status_code, 401)
+
+
+class BulkSignUpTests(ProjectsTestCase):
+    CSV = (
+        "email,password,first_name,last_name\n"
+        "un@softdesk.fr,Azerty1234!,Un,Nom\n"
+        "deux@softdesk.fr,1234,Deux,Nom\n"
+        "author@softdesk.fr,Azerty1234!,Auteur,Nom\n"
+        "un@SOFTDESK.fr,Azerty1234!,Un,Nom\n"
+    )
+
+    def setUp(self):
+        super().setUp()
+        self.authenticate(
+            self.create_user("admin@softdesk.fr", is_staff=True)
+        )
+
+    def post(self, content, name="users.csv", **data):
+        file = SimpleUploadedFile(name, content.encode())
+        return self.client.post(
+            "/signup/bulk/", {"file": file, **data}, format="multipart"
+        )
+
+    def test_valid_rows_are_created_and_the_other_ones_reported(self):
+        with mock.patch(
+            "projects.provisioning.ProcessPoolExecutor"
+        ) as process_pool:
+            response = self.post(self.CSV)
+
+        process_pool.assert_not_called()
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data["created"], 1)
+        self.assertEqual(
+            [error["row"] for error in response.data["errors"]], [2, 3, 4]
+        )
+        self.assertIn("password", response.data["errors"][0]["errors"])
+        user = User.objects.get(email="un@softdesk.fr")
+        self.assertTrue(user.check_password("Azerty1234!"))
+
+    def test_requests_share_one_thread_pool(self):
+        self.post(self.CSV)
+        pool = get_request_pool()
+
+        self.post(self.CSV.replace("un@", "trois@"))
+
+        self.assertIs(get_request_pool(), pool)
+        self.assertTrue(
+            User.objects.filter(email="trois@softdesk.fr").exists()
+        )
+
+    def test_file_without_valid_rows_is_refused(self):
+        response = self.post('{"email": "x"}\n[]\n', name="users.ndjson")
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data["created"], 0)
+        self.assertEqual(len(response.data["errors"]), 2)
+
+        response = self.post(self.CSV, name="users.txt")
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("format", response.data)
+
+    @override_settings(USER_PROVISIONING={"MAX_REQUEST_ROWS": 3})
+    def test_larger_files_are_refused_without_creating_users(self):
+        response = self.post(self.CSV)
+
+        self.assertEqual(response.status_code, 413)
+        self.assertIn("provision_users", response.data["file"][0])
+        self.assertFalse(User.objects.filter(email="un@softdesk.fr").exists())
+
+        response = self.post(self.CSV.rsplit("\n", 2)[0] + "\n")
+        self.assertEqual(response.status_code, 201)
+
+    def test_bulk_sign_up_is_reserved_to_administrators(self):
+        self.authenticate(self.author)
+        self.assertEqual(self.post(self.CSV).status_code, 403)
+
+    def test_bulk_sign_up_is_an_export_for_the_admission_control(self):
+        factory = RequestFactory()
+
+        self.assertEqual(
+            admission_controller.get_route_class(
+                factory.post("/signup/bulk/")
+            ),
+            "export",
+        )
+        self.assertEqual(
+            admission_controller.get_route_class(factory.post("/signup/")),
+            "auth",
+        )
+
+    def test_command_hashes_in_a_process_pool(self):
+        with tempfile.NamedTemporaryFile("w", suffix=".csv") as file:
+            file.write(self.CSV)
+            file.flush()
+            stdout, stderr = io.StringIO(), io.StringIO()
+            call_command(
+                "provision_users",
+                file.name,
+                workers=1,
+                stdout=stdout,
+                stderr=stderr,
+            )
+
+        self.assertIn(
+            "1 user(s) created, 3 row(s) refused.", stdout.getvalue()
+        )
+        self.assertIn("Row 2:", stderr.getvalue())
+
+
+class ProjectCloneTests(ProjectsTestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = self.create_user("user@softdesk.fr")
+        self.add_contributor(self.project, self.user)
+        self.second_issue = self.create_issue(
+            self.project, self.author, title="Second"
+        )
+        self.create_comment(self.issue, self.author, "Premier")
+        self.create_comment(self.second_issue, self.user, "Second")
+
+    def clone(self, **data):
+        return self.client.post(
+            f"/projects/{self.project.id}/clone/", data, format="json"
+        )
+
+    def test_issues_and_comments_are_attached_to_their_copies(self):
+        self.authenticate(self.user)
+
+        response = self.clone(issues=True, comments=True)
+
+        self.assertEqual(response.status_code, 201)
+        clone = Project.objects.get(id=response.data["project_id"])
+        self.assertEqual(clone.title, "Projet (copie)")
+        self.assertEqual(clone.author_user, self.user)
+        self.assertEqual(
+            dict(
+                Contributor.objects.filter(project=clone).values_list(
+                    "user__email", "permission"
+                )
+            ),
+            {
+                "user@softdesk.fr": Contributor.RESPONSIBLE,
+                "author@softdesk.fr": Contributor.RESPONSIBLE,
+            },
+        )
+        self.assertEqual(
+            list(
+                Comment.objects.filter(project=clone)
+                .order_by("id")
+                .values_list("issue__title", "issue__project", "description")
+            ),
+            [
+                ("Problème", clone.id, "Premier"),
+                ("Second", clone.id, "Second"),
+            ],
+        )
+        self.assertEqual(
+            Issue.objects.filter(project=self.project).count(), 2
+        )
+
+    def test_issues_are_only_copied_on_demand(self):
+        self.authenticate(self.author)
+
+        response = self.clone(title="Modèle")
+
+        clone = Project.objects.get(id=response.data["project_id"])
+        self.assertEqual(clone.title, "Modèle")
+        self.assertFalse(Issue.objects.filter(project=clone).exists())
+
+        response = self.clone(comments=True)
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("comments", response.data)
+
+    def test_outsiders_cannot_clone_the_project(self):
+        self.authenticate(self.create_user("autre@softdesk.fr"))
+
+        self.assertEqual(self.clone().status_code, 403)
+        self.assertEqual(Project.objects.count(), 1)
+
+    def test_clone_is_placed_on_the_shard_of_the_project(self):
+        self.authenticate(self.author)
+        with override_settings(SHARDING={"SHARDS": ["default"]}):
+            place_existing_projects()
+            response = self.clone(issues=True)
+
+        placement = ProjectPlacement.objects.get(
+            id=response.data["project_id"]
+        )
+        self.assertEqual(placement.shard, "default")
+        self.assertGreater(placement.id, self.project.id)
+
+
+class IssueArchiveTests(ProjectsTestCase):
+    def setUp(self):
+        super().setUp()
+        self.comment = self.create_comment(self.issue, self.author)
+        self.active_issue = self.create_issue(
+            self.project, self.author, status=Issue.DONE, title="Actif"
+        )
+        self.create_comment(self.active_issue, self.author, "Récent")
+        self.open_issue = self.create_issue(self.project, self.author)
+        old = timezone.now() - timedelta(days=400)
+        Issue.objects.update(created_time=old)
+        Comment.objects.filter(issue=self.issue).update(created_time=old)
+        Issue.objects.filter(id=self.issue.id).update(status=Issue.DONE)
+        self.issue_url = f"/projects/{self.project.id}/issues/{self.issue.id}/"
+        self.authenticate(self.author)
+
+    def test_only_finished_issues_without_activity_are_archived(self):
+        self.assertEqual(archive_issues(batch_size=1), 1)
+
+        self.assertEqual(
+            set(Issue.objects.values_list("id", flat=True)),
+            {self.active_issue.id, self.open_issue.id},
+        )
+        archived = ArchivedIssue.objects.get()
+        self.assertEqual(archived.id, self.issue.id)
+        self.assertIsNotNone(archived.archived_time)
+        self.assertEqual(ArchivedComment.objects.get().id, self.comment.id)
+        self.assertFalse(Comment.objects.filter(id=self.comment.id).exists())
+        self.assertEqual(archive_issues(), 0)
+
+    def test_archived_issues_are_still_served_read_only(self):
+        call_command("archive_issues", stdout=io.StringIO())
+
+        response = self.client.get(self.issue_url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["id"], self.issue.id)
+        response = self.client.get(f"{self.issue_url}comments/")
+        self.assertEqual(
+            [comment["comment_id"] for comment in response.data["results"]],
+            [self.comment.id],
+        )
+        response = self.client.get(
+            f"{self.issue_url}comments/{self.comment.id}/"
+        )
+        self.assertEqual(response.status_code, 200)
+
+        response = self.client.patch(self.issue_url, {"title": "Nouveau"})
+        self.assertEqual(response.status_code, 403)
+        response = self.client.post(
+            f"{self.issue_url}comments/", {"description": "Nouveau"}
+        )
+        self.assertEqual(response.status_code, 403)
+        self.assertEqual(
+            response.data["detail"],
+            "Ce problème est archivé, il ne peut plus être modifié.",
+        )
+
+    def test_lists_show_the_archived_issues_on_demand(self):
+        archive_issues()
+        url = f"/projects/{self.project.id}/issues/"
+
+        response = self.client.get(url, {"archived": "true"})
+        self.assertEqual(
+            [issue["id"] for issue in response.data["results"]],
+            [self.issue.id],
+        )
+        response = self.client.get(url)
+        self.assertNotIn(
+            self.issue.id,
+            [issue["id"] for issue in response.data["results"]],
+        )
+        response = self.client.get(url, {"archived": "peut-être"})
+        self.assertEqual(response.status_code, 400)
+
+    def test_outsiders_cannot_read_archived_issues(self):
+        archive_issues()
+        self.authenticate(self.create_user("autre@softdesk.fr"))
+
+        self.assertEqual(self.client.get(self.issue_url).status_code, 403)
+
+
+class UserLookupTests(ProjectsTestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = self.create_user(
+            "jean.dupont@softdesk.fr", first_name="Jean", last_name="Dupont"
+        )
+        self.add_contributor(self.project, self.user)
+        self.outsider = self.create_user(
+            "jeanne.durand@softdesk.fr",
+            first_name="Jeanne",
+            last_name="Durand",
+        )
+
+    def test_words_are_normalized(self):
+        self.assertEqual(
+            get_words("Élodie O'Brien-Zoë"), ["elodie", "o", "brien", "zoe"]
+        )
+
+    def test_prefix_upper_bound_follows_every_completion(self):
+        for prefix, upper_bound in (
+            ("dup", "duq"),
+            ("a9", "aa"),
+            ("az", "b"),
+            ("zz", None),
+        ):
+            with self.subTest(prefix=prefix):
+                self.assertEqual(get_prefix_upper_bound(prefix), upper_bound)
+
+    def test_users_match_every_word_of_the_query(self):
+        users = User.objects.all()
+
+        self.assertEqual(
+            set(search_users(users, "jea").values_list("email", flat=True)),
+            {self.user.email, self.outsider.email},
+        )
+        self.assertEqual(list(search_users(users, "jean dup")), [self.user])
+        self.assertEqual(
+            list(search_users(users, "DURAND jeanne")), [self.outsider]
+        )
+        self.assertFalse(search_users(users, "!?").exists())
+
+    def test_renamed_users_are_indexed_again(self):
+        self.author.last_name = "Martin"
+        self.author.save()
+
+        users = User.objects.all()
+        self.assertEqual(list(search_users(users, "martin")), [self.author])
+        self.assertFalse(search_users(users, "nom").exists())
+
+    def test_lookup_is_limited_to_the_co_contributors(self):
+        self.authenticate(self.author)
+
+        response = self.client.get("/accounts/lookup/", {"q": "jean"})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [user["email"] for user in response.data], [self.user.email]
+        )
+        response = self.client.get("/accounts/lookup/", {"q": " "})
+        self.assertEqual(response.status_code, 400)
+
+    def test_superusers_look_up_every_user(self):
+        self.authenticate(
+            self.create_user("admin@softdesk.fr", is_superuser=True)
+        )
+
+        response = self.client.get("/accounts/lookup/", {"q": "jean"})
+
+        self.assertEqual(
+            [user["email"] for user in response.data],
+            [self.user.email, self.outsider.email],
+        )
+
+    def test_admin_search_uses_the_lookup_terms(self):
+        self.client.force_login(
+            User.objects.create_superuser("root@softdesk.fr", "pw")
+        )
+
+        response = self.client.get("/admin/projects/user/", {"q": "durand"})
+
+        self.assertEqual(
+            list(response.context["cl"].result_list), [self.outsider]
+        )
+
+
+@mock.patch("projects.compression.brotli", None)
+class ResponseCompressionTests(ProjectsTestCase):
+    def setUp(self):
+        super().setUp()
+        self.factory = RequestFactory()
+
+    def compress(self, data, accept_encoding="gzip", **headers):
+        def get_response(request):
+            response = JsonResponse(data, safe=False)
+            for name, value in headers.items():
+                response[name] = value
+            return response
+
+        request = self.factory.get(
+            "/projects/", HTTP_ACCEPT_ENCODING=accept_encoding
+        )
+        return CompressionMiddleware(get_response)(request)
+
+    def test_encoding_is_negotiated_with_the_qualities(self):
+        for accept_encoding, encoding in (
+            ("gzip, deflate", "gzip"),
+            ("GZIP;q=0.5", "gzip"),
+            ("*", "gzip"),
+            ("gzip;q=0", None),
+            ("*;q=0, identity", None),
+            ("deflate, gzip;q=invalid", None),
+            ("", None),
+        ):
+            with self.subTest(accept_encoding=accept_encoding):
+                self.assertEqual(
+                    negotiate_encoding(accept_encoding), encoding
+                )
+
+    def test_large_responses_are_compressed(self):
+        data = [{"title": f"Problème {index}"} for index in range(100)]
+
+        response = self.compress(data, ETag='"abc"')
+
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertEqual(response["Vary"], "Accept-Encoding")
+        self.assertEqual(response["ETag"], 'W/"abc"')
+        self.assertEqual(
+            int(response["Content-Length"]), len(response.content)
+        )
+        self.assertEqual(
+            gzip.decompress(response.content),
+            JsonResponse(data, safe=False).content,
+        )
+
+    def test_small_or_unaccepted_responses_are_left_unchanged(self):
+        response = self.compress({"title": "Problème"})
+        self.assertFalse(response.has_header("Content-Encoding"))
+        self.assertFalse(response.has_header("Vary"))
+
+        data = [{"title": f"Problème {index}"} for index in range(100)]
+        response = self.compress(data, accept_encoding="identity")
+        self.assertFalse(response.has_header("Content-Encoding"))
+        self.assertEqual(response["Vary"], "Accept-Encoding")
+
+    def test_identical_contents_are_compressed_once(self):
+        cache = CompressedCache()
+        content = b"x" * 2000
+
+        first = cache.get_compressed(content, "gzip")
+        second = cache.get_compressed(content, "gzip")
+
+        self.assertIs(second, first)
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+
+    def test_cache_keeps_the_latest_contents(self):
+        cache = CompressedCache()
+        with override_settings(RESPONSE_COMPRESSION={"CACHE_SIZE": 1}):
+            cache.get_compressed(b"a" * 2000, "gzip")
+            cache.get_compressed(b"b" * 2000, "gzip")
+            cache.get_compressed(b"a" * 2000, "gzip")
+
+        self.assertEqual(cache.misses, 3)
+
+    def test_api_lists_are_compressed(self):
+        for index in range(20):
+            self.create_issue(self.project, self.author, title=f"P{index}")
+        self.authenticate(self.author)
+
+        response = self.client.get(
+            f"/projects/{self.project.id}/issues/",
+            HTTP_ACCEPT_ENCODING="gzip",
+        )
+
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertIn(b'"P19"', gzip.decompress(response.content))
+
+
+class IdempotencyTests(ProjectsTestCase):
+    def setUp(self):
+        super().setUp()
+        self.url = f"/projects/{self.project.id}/issues/"
+        self.data = {
+            "title": "Nouveau",
+            "desc": "Description",
+            "tag": "BUG",
+            "priority": "FAIBLE",
+            "status": "À FAIRE",
+            "assignee_user": self.author.email,
+        }
+        self.authenticate(self.author)
+
+    def post(self, data=None, key="clé-1", url=None):
+        return self.client.post(
+            url or self.url,
+            data or self.data,
+            format="json",
+            HTTP_IDEMPOTENCY_KEY=key,
+        )
+
+    def test_retry_gets_the_stored_response(self):
+        first = self.post()
+        second = self.post()
+
+        self.assertEqual(first.status_code, 201)
+        self.assertEqual(second.status_code, 201)
+        self.assertEqual(second["Idempotent-Replayed"], "true")
+        self.assertEqual(second.json(), first.json())
+        self.assertEqual(Issue.objects.filter(title="Nouveau").count(), 1)
+        self.assertEqual(self.post(key="clé-2").status_code, 201)
+        self.assertEqual(Issue.objects.filter(title="Nouveau").count(), 2)
+
+    def test_retry_while_the_first_request_runs_is_refused(self):
+        cache_key = get_cache_key(self.author.pk, self.url, "clé-1")
+        get_store().add(cache_key, {"fingerprint": "fp", "response": None})
+
+        with mock.patch("projects.views.get_fingerprint", return_value="fp"):
+            response = self.post()
+
+        self.assertEqual(response.status_code, 409)
+        self.assertFalse(Issue.objects.filter(title="Nouveau").exists())
+
+    def test_key_reused_with_another_body_is_refused(self):
+        self.post()
+
+        response = self.post({**self.data, "title": "Autre"})
+
+        self.assertEqual(response.status_code, 422)
+        self.assertFalse(Issue.objects.filter(title="Autre").exists())
+
+    def test_keys_are_scoped_to_the_user(self):
+        user = self.create_user("user@softdesk.fr")
+        self.add_contributor(self.project, user)
+        self.post()
+
+        self.authenticate(user)
+        response = self.post({**self.data, "assignee_user": user.email})
+
+        self.assertEqual(response.status_code, 201)
+        self.assertFalse(response.has_header("Idempotent-Replayed"))
+        self.assertEqual(Issue.objects.filter(title="Nouveau").count(), 2)
+
+    def test_too_long_key_is_refused(self):
+        response = self.post(key="x" * 256)
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("Idempotency-Key", response.data)
+
+    def test_key_is_released_after_a_refusal(self):
+        user = self.create_user("user@softdesk.fr")
+        self.authenticate(user)
+        data = {**self.data, "assignee_user": user.email}
+        self.assertEqual(self.post(data).status_code, 403)
+
+        self.add_contributor(self.project, user)
+        response = self.post(data)
+
+        self.assertEqual(response.status_code, 201)
+        self.assertFalse(response.has_header("Idempotent-Replayed"))
+
+    def test_validation_errors_are_stored(self):
+        data = {**self.data, "tag": "INCONNU"}
+        self.assertEqual(self.post(data).status_code, 400)
+
+        response = self.post(data)
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response["Idempotent-Replayed"], "true")
+
+    def test_sign_up_views_are_idempotent(self):
+        self.authenticate(
+            self.create_user("admin@softdesk.fr", is_staff=True)
+        )
+        data = {
+            "email": "nouveau@softdesk.fr",
+            "password": "Azerty1234!",
+            "first_name": "Nouveau",
+            "last_name": "Nom",
+        }
+
+        first = self.post(data, url="/signup/")
+        second = self.post(data, url="/signup/")
+
+        self.assertEqual(first.status_code, 201)
+        self.assertEqual(second["Idempotent-Replayed"], "true")
+        self.assertEqual(second.json(), first.json())
+
+        responses = []
+        for boundary in ("premier", "second"):
+            # Each try of the client draws its own multipart boundary.
+            content = encode_multipart(
+                boundary,
+                {
+                    "file": SimpleUploadedFile(
+                        "users.csv",
+                        b"email,password,first_name,last_name\n"
+                        b"csv@softdesk.fr,Azerty1234!,Csv,Nom\n",
+                    )
+                },
+            )
+            responses.append(
+                self.client.post(
+                    "/signup/bulk/",
+                    content,
+                    content_type=f"multipart/form-data; boundary={boundary}",
+                    HTTP_IDEMPOTENCY_KEY="clé-bulk",
+                )
+            )
+
+        self.assertEqual(responses[0].status_code, 201)
+        self.assertEqual(responses[1]["Idempotent-Replayed"], "true")
+        self.assertEqual(responses[1].json(), responses[0].json())
+        self.assertEqual(
+            User.objects.filter(email="csv@softdesk.fr").count(), 1
+        )
+
+    def test_project_clone_is_idempotent(self):
+        url = f"/projects/{self.project.id}/clone/"
+
+        first = self.post({"title": "Copie"}, url=url)
+        second = self.post({"title": "Copie"}, url=url)
+
+        self.assertEqual(second.json(), first.json())
+        self.assertEqual(Project.objects.filter(title="Copie").count(), 1)
@@ -0,0 +1,138 @@
+"""
+Provides the activity timeline of a project.
+
+The events of the project (issue and comment creations, issue status
+changes) are read from each table by an index seek on its (project,
+created_time, id) index, stopped after one page, and the pages are merged
+on the (created time, kind, id) key. The timeline is paged with a cursor
+on this key instead of an offset, so any page costs the same whatever the
+size of the project.
+"""
+import base64
+import heapq
+from itertools import islice
+from django.db.models import Case, CharField, F, Q, Value, When
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import ValidationError
+from .models import Issue, Comment, IssueStatusChange
+
+ISSUE_CREATED = 1
+COMMENT_CREATED = 2
+STATUS_CHANGED = 3
+
+EVENT_TYPES = {
+    ISSUE_CREATED: "issue_created",
+    COMMENT_CREATED: "comment_created",
+    STATUS_CHANGED: "status_changed",
+}
+
+FIELDS = (
+    "created_time",
+    "id",
+    "author_user_id",
+    "kind",
+    "event_issue_id",
+    "label",
+)
+
+
+def get_event_querysets(project_id):
+    """Return the queryset of each kind of event of the project."""
+    return {
+        ISSUE_CREATED: Issue.objects.filter(project_id=project_id).annotate(
+            kind=Value(ISSUE_CREATED), event_issue_id=F("id"), label=F("title")
+        ),
+        COMMENT_CREATED: Comment.objects.filter(
+            project_id=project_id
+        ).annotate(
+            kind=Value(COMMENT_CREATED),
+            event_issue_id=F("issue_id"),
+            label=F("description"),
+        ),
+        STATUS_CHANGED: IssueStatusChange.objects.filter(
+            project_id=project_id
+        ).annotate(
+            kind=Value(STATUS_CHANGED),
+            event_issue_id=F("issue_id"),
+            label=Case(
+                *[
+                    When(to_status=status, then=Value(label))
+                    for status, label in Issue.ISSUE_STATUS
+                ],
+                output_field=CharField(),
+            ),
+        ),
+    }
+
+
+def encode_cursor(event):
+    """Return the cursor pointing after the event."""
+    position = f"{event[0].isoformat()}|{event[3]}|{event[1]}"
+    return base64.urlsafe_b64encode(position.encode()).decode()
+
+
+def decode_cursor(cursor):
+    """Return the created time, kind and id of the cursor position."""
+    try:
+        position = base64.urlsafe_b64decode(cursor.encode()).decode()
+        created_time, kind, id = position.split("|")
+        created_time = parse_datetime(created_time)
+        if created_time is None:
+            raise ValueError
+        return created_time, int(kind), int(id)
+    except ValueError:
+        raise ValidationError({"cursor": "Le curseur indiqué est invalide."})
+
+
+def get_after_filter(kind, cursor):
+    """
+    Return the filter of the events of this kind placed after the cursor
+    in (created time, kind, id) descending order.
+    """
+    created_time, cursor_kind, cursor_id = cursor
+    if kind < cursor_kind:
+        return Q(created_time__lte=created_time)
+    if kind > cursor_kind:
+        return Q(created_time__lt=created_time)
+    # Bounded by the created time, for the index range to be used.
+    return Q(created_time__lte=created_time) & (
+        Q(created_time__lt=created_time) | Q(id__lt=cursor_id)
+    )
+
+
+def get_timeline_page(project_id, cursor=None, limit=50):
+    """
+    Return the events of the project following the cursor, newest first,
+    and the cursor of the next page or None on the last page.
+    """
+    pages = []
+    for kind, queryset in get_event_querysets(project_id).items():
+        if cursor is not None:
+            queryset = queryset.filter(get_after_filter(kind, cursor))
+        # The kind is constant in a table, the order follows its index.
+        pages.append(
+            queryset.order_by("-created_time", "-id").values_list(*FIELDS)[
+                : limit + 1
+            ]
+        )
+    merged = heapq.merge(
+        *pages, key=lambda event: (event[0], event[3], event[1]), reverse=True
+    )
+    events = list(islice(merged, limit + 1))
+
+    next_cursor = None
+    if len(events) > limit:
+        events = events[:limit]
+        next_cursor = encode_cursor(events[-1])
+
+    return [
+        {
+            "type": EVENT_TYPES[kind],
+            "id": id,
+            "issue_id": issue_id,
+            "author_user_id": author_user_id,
+            "label": label,
+            "created_time": created_time,
+        }
+        for created_time, id, author_user_id, kind, issue_id, label in events
+    ], next_cursor
@@ -18,6 +18,7 @@ issues_router = routers.NestedSimpleRouter(
 issues_router.register(r"comments", views.CommentViewSet)
 
 urlpatterns = [
+    path(r"batch/", views.BatchView.as_view(), name="batch"),
     path(r"", include(router.urls)),
     path(r"", include(projects_router.urls)),
     path(r"", include(issues_router.urls)),
@@ -1,25 +1,61 @@
 """
 Manage all the views of the "projects" application.
 """
-from rest_framework import generics, viewsets, mixins
+import io
+from itertools import islice
+from urllib.parse import urlsplit
+from rest_framework import generics, viewsets, mixins, status
+from rest_framework.decorators import action
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.parsers import MultiPartParser
 from rest_framework.response import Response
+from rest_framework.views import APIView
 from rest_framework.permissions import (
     IsAdminUser,
     IsAuthenticated,
     SAFE_METHODS,
 )
-from django.shortcuts import get_object_or_404
-from .models import Project, User, Contributor, Issue, Comment
-from .permissions import IsAuthor, IsContributor, IsResponsibleContributor
+from datetime import timedelta
+from django.db import router, transaction
+from django.http import (
+    FileResponse,
+    Http404,
+    HttpRequest,
+    QueryDict,
+)
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+from django.urls import Resolver404, resolve
+from .models import (
+    Project,
+    User,
+    Contributor,
+    Issue,
+    Comment,
+    ArchivedIssue,
+    ArchivedComment,
+)
+from .permissions import (
+    IsAuthor,
+    IsContributor,
+    IsResponsibleContributor,
+    get_connected_contributor,
+    get_membership_cache,
+)
 from .serializers import (
     SignUpSerializer,
     UserSerializer,
     ProjectSerializer,
+    ProjectCloneSerializer,
     ContributorSerializer,
     ContributorAutoAssignUserSerializer,
     IssueSerializer,
     CommentSerializer,
+    BatchSerializer,
+    TimelineEventSerializer,
+    TokenRevokeSerializer,
 )
+from .cloning import clone_project
 from .checker import (
     check_and_get_contributor_id,
     check_project_exist_in_db,
@@ -27,10 +63,196 @@ from .checker import (
     check_comment_exist_in_db,
     check_project_is_issue_attribut,
     check_issue_is_comment_attribut,
+    check_issue_in_project,
+    check_issue_is_not_archived,
+    check_user_is_not_contributor,
+    explain_integrity_error,
+    get_archived_comment,
+    get_archived_issue,
+)
+from .admission import admission_controller
+from .coalescer import save_serializer
+from .conf import get_setting
+from .lookup import MAX_RESULTS, filter_co_contributors, search_users
+from .idempotency import (
+    IdempotentReplay,
+    get_cache_key,
+    get_fingerprint,
+    release,
+    reserve,
+    store_response,
 )
+from .profiling import get_profile_path, get_profiles
+from .provisioning import (
+    FORMATS,
+    get_format,
+    get_request_pool,
+    provision_users,
+    read_rows,
+)
+from .revocation import revoke_token, revoke_user_tokens
+from .history import get_cycle_time_report, record_status_change
+from .singleflight import single_flight
+from .sharding import (
+    ShardedQuerySet,
+    get_project_databases,
+    get_shards,
+    place_new_project,
+    use_project_shard,
+)
+from .timeline import decode_cursor, get_timeline_page
+
+
+class ProjectShardMixin:
+    """Route the queries of the request to the shard of its project."""
+
+    shard_url_kwarg = "project_pk"
+
+    def dispatch(self, request, *args, **kwargs):
+        with use_project_shard(kwargs.get(self.shard_url_kwarg)):
+            return super().dispatch(request, *args, **kwargs)
+
+
+class SingleFlightMixin:
+    """
+    Share the response data of the list and retrieve actions between
+    identical concurrent requests of callers with the same role.
+    """
+
+    def list(self, request, *args, **kwargs):
+        return self.run_single_flight(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.run_single_flight(
+            super().retrieve, request, *args, **kwargs
+        )
 
+    def run_single_flight(self, handler, request, *args, **kwargs):
+        """Return the response of the handler, computed once per flight."""
+        # The browsable API pages show the connected user, only JSON is
+        # shared.
+        if (
+            not get_setting("SINGLE_FLIGHT", "ENABLED")
+            or request.accepted_renderer.format != "json"
+        ):
+            return handler(request, *args, **kwargs)
+        key = (
+            request.accepted_media_type,
+            # Absolute, as the links of the pages carry the host.
+            request.build_absolute_uri(),
+            self.get_role(),
+        )
+
+        leader_response = None
+
+        def compute():
+            nonlocal leader_response
+            leader_response = handler(request, *args, **kwargs)
+            return (
+                leader_response.status_code,
+                leader_response.data,
+                dict(leader_response.items()),
+            )
+
+        status_code, data, headers = single_flight.run(key, compute)
+        if leader_response is not None:
+            return leader_response
+
+        # A response of its own, rendered and finalized by this request.
+        return Response(data, status=status_code, headers=headers)
+
+    def get_role(self):
+        """Return the role of the connected user in the project."""
+        if self.request.user.is_superuser:
+            return "superuser"
+        contributor = get_connected_contributor(
+            self.request, self.kwargs["project_pk"]
+        )
+        return contributor.permission if contributor else None
+
+
+class IdempotencyMixin:
+    """
+    Answer the retries of the create requests sent with an idempotency key
+    with the stored response of the first request.
+
+    Every POST request is a create request of a view, only the POST
+    requests of the idempotent_actions are ones of a viewset.
+    """
+
+    idempotent_actions = ("create",)
+    idempotency_cache_key = None
+
+    def initial(self, request, *args, **kwargs):
+        key = self.get_idempotency_key(request)
+        if key is not None:
+            # The keys are scoped to the user, authenticated beforehand.
+            self.perform_authentication(request)
+            if request.user.is_authenticated:
+                cache_key = get_cache_key(request.user.pk, request.path, key)
+                fingerprint = get_fingerprint(request._request)
+                # May raise the replay of the stored response
+                reserve(cache_key, fingerprint)
+                self.idempotency_cache_key = cache_key
+                self.idempotency_fingerprint = fingerprint
+        super().initial(request, *args, **kwargs)
+
+    def get_idempotency_key(self, request):
+        """Return the idempotency key of the create request, or None."""
+        # Views other than viewsets have no action.
+        action = getattr(self, "action", None)
+        if request.method != "POST" or (
+            action is not None and action not in self.idempotent_actions
+        ):
+            return None
+        header = get_setting("IDEMPOTENCY", "HEADER")
+        key = request.headers.get(header)
+        if not key:
+            return None
+        max_length = get_setting("IDEMPOTENCY", "MAX_KEY_LENGTH")
+        if len(key) > max_length:
+            raise ValidationError(
+                {
+                    header: "La clé d'idempotence ne doit pas dépasser "
+                    f"{max_length} caractères."
+                }
+            )
+
+        return key
+
+    def handle_exception(self, exc):
+        if isinstance(exc, IdempotentReplay):
+            return exc.response
+        try:
+            return super().handle_exception(exc)
+        except Exception:
+            if self.idempotency_cache_key is not None:
+                release(self.idempotency_cache_key)
+                self.idempotency_cache_key = None
+            raise
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        """Store the response of the key, or release the key on failure."""
+        response = super().finalize_response(
+            request, response, *args, **kwargs
+        )
+        cache_key = self.idempotency_cache_key
+        if cache_key is None:
+            return response
+        self.idempotency_cache_key = None
+        # Other errors may be transient, the key can be retried.
+        if status.is_success(response.status_code) or (
+            response.status_code == status.HTTP_400_BAD_REQUEST
+        ):
+            response.render()
+            store_response(cache_key, self.idempotency_fingerprint, response)
+        else:
+            release(cache_key)
+
+        return response
 
-class SignUp(generics.CreateAPIView):
+
+class SignUp(IdempotencyMixin, generics.CreateAPIView):
     """Concrete view for creating a model instance of user object."""
 
     queryset = User.objects.all()
@@ -38,6 +260,53 @@ class SignUp(generics.CreateAPIView):
     permission_classes = [IsAdminUser]
 
 
+class BulkSignUp(IdempotencyMixin, APIView):
+    """
+    View creating the users of an uploaded CSV or NDJSON file, reporting
+    the errors of the refused rows.
+    """
+
+    permission_classes = [IsAdminUser]
+    parser_classes = [MultiPartParser]
+
+    def post(self, request):
+        file = request.FILES.get("file")
+        if file is None:
+            raise ValidationError({"file": ["Ce champ est obligatoire."]})
+        format = request.data.get("format") or get_format(file.name)
+        if format not in FORMATS:
+            raise ValidationError(
+                {"format": ["Le format doit être csv ou ndjson."]}
+            )
+        max_rows = get_setting("USER_PROVISIONING", "MAX_REQUEST_ROWS")
+        with io.TextIOWrapper(file, encoding="utf-8-sig", newline="") as lines:
+            rows = list(islice(read_rows(lines, format), max_rows + 1))
+        if len(rows) > max_rows:
+            return Response(
+                {
+                    "file": [
+                        f"Le fichier dépasse {max_rows} lignes, utilisez "
+                        "la commande provision_users."
+                    ]
+                },
+                status=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            )
+        # Hashed in the threads shared by the requests, the processes of
+        # the command would be forked again for each request.
+        result = provision_users(
+            rows,
+            workers=get_setting("USER_PROVISIONING", "REQUEST_WORKERS"),
+            pool=get_request_pool(),
+        )
+        response_status = (
+            status.HTTP_201_CREATED
+            if result["created"]
+            else status.HTTP_400_BAD_REQUEST
+        )
+
+        return Response(result, status=response_status)
+
+
 class UserViewSet(
     mixins.RetrieveModelMixin,
     mixins.UpdateModelMixin,
@@ -47,10 +316,51 @@ class UserViewSet(
 ):
     """A viewset that provides actions for user object."""
 
-    queryset = User.objects.all()
+    queryset = User.objects.filter(is_deleted=False)
     serializer_class = UserSerializer
     permission_classes = [IsAdminUser]
 
+    def perform_destroy(self, instance):
+        """
+        Hide and deactivate the user, its rows are purged in background by
+        the "purge_deleted" command.
+        """
+        instance.is_deleted = True
+        instance.is_active = False
+        instance.save(update_fields=["is_deleted", "is_active"])
+        if get_shards():
+            # Contributors live on the shards, out of reach of a join on
+            # the user: they are removed right away.
+            for database in get_project_databases():
+                Contributor.objects.using(database).filter(
+                    user=instance
+                ).delete()
+        revoke_user_tokens(instance)
+
+    @action(detail=False, permission_classes=[IsAuthenticated])
+    def lookup(self, request):
+        """
+        Return the users whose email and names have words starting with the
+        words of the "q" parameter, among the contributors of the projects
+        of the connected user.
+        """
+        query = request.query_params.get("q", "")
+        if not query.strip():
+            raise ValidationError({"q": "Ce paramètre est obligatoire."})
+        users = User.objects.filter(is_active=True, is_deleted=False)
+        if not request.user.is_superuser:
+            users = filter_co_contributors(users, request.user)
+        users = search_users(users, query).order_by("email")[:MAX_RESULTS]
+
+        return Response(self.get_serializer(users, many=True).data)
+
+    @action(detail=True, methods=["post"], url_path="revoke-tokens")
+    def revoke_tokens(self, request, pk=None):
+        """Revoke every token issued to the user until now."""
+        revoke_user_tokens(self.get_object())
+
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
 
 class MyInfo(generics.RetrieveAPIView):
     queryset = User.objects.all()
@@ -76,10 +386,69 @@ class MyInfo(generics.RetrieveAPIView):
         return Response(data)
 
 
-class ProjectViewSet(viewsets.ModelViewSet):
+class TokenRevoke(APIView):
+    """
+    View revoking the access token of the request, and the refresh token
+    of the session when given.
+    """
+
+    def post(self, request):
+        serializer = TokenRevokeSerializer(
+            data=request.data, context={"request": request}
+        )
+        serializer.is_valid(raise_exception=True)
+        revoke_token(request.auth)
+        if "refresh" in serializer.validated_data:
+            revoke_token(serializer.validated_data["refresh"])
+
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class AdmissionMetrics(APIView):
+    """View returning the admission control metrics of each route class."""
+
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        return Response(admission_controller.get_metrics())
+
+
+class ProfileList(APIView):
+    """View listing the saved request profiles, newest first."""
+
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        profiles = get_profiles()
+        for profile in profiles:
+            profile["url"] = request.build_absolute_uri(
+                f"{profile['route']}/{profile['name']}/"
+            )
+
+        return Response(profiles)
+
+
+class ProfileDownload(APIView):
+    """View downloading a saved request profile as a pstats file."""
+
+    permission_classes = [IsAdminUser]
+
+    def get(self, request, route, name):
+        path = get_profile_path(route, name)
+        if path is None:
+            raise Http404
+
+        return FileResponse(open(path, "rb"), as_attachment=True)
+
+
+class ProjectViewSet(
+    ProjectShardMixin, IdempotencyMixin, viewsets.ModelViewSet
+):
     """A viewset that provides actions for project object."""
 
-    queryset = Project.objects.all()
+    shard_url_kwarg = "pk"
+    idempotent_actions = ("create", "clone")
+    queryset = Project.objects.filter(is_deleted=False)
     serializer_class = ProjectSerializer
     permission_classes = [IsAuthenticated, IsContributor]
 
@@ -87,7 +456,8 @@ class ProjectViewSet(viewsets.ModelViewSet):
         """
         Instantiates and returns the list of permissions that this view requires.
         """
-        if self.request.method not in SAFE_METHODS:
+        # Cloning is a read of the project for the contributors.
+        if self.request.method not in SAFE_METHODS and self.action != "clone":
             return [permission() for permission in [IsAuthor, IsAuthenticated]]
 
         return [permission() for permission in self.permission_classes]
@@ -97,33 +467,131 @@ class ProjectViewSet(viewsets.ModelViewSet):
         if self.detail is True:
             project_id = self.kwargs["pk"]
             return super().get_queryset().filter(id=project_id)
-        project_id_list = self.create_project_id_list_connected_user()
-        return super().get_queryset().filter(id__in=project_id_list)
+        queryset = (
+            super()
+            .get_queryset()
+            .filter(contributor__user_id=self.request.user.id)
+            .order_by("id")
+        )
+        if get_shards():
+            return ShardedQuerySet(queryset, key=lambda project: project.id)
+        return queryset
 
     def perform_create(self, serializer):
         """Create a model instance of project and author contributor."""
-        serializer.save(author_user=self.request.user)
-        author_contributor = Contributor(
-            user=self.request.user,
-            project_id=serializer.instance.id,
-            permission="Responsable",
-            role="Auteur",
+        placement = {}
+        if get_shards():
+            placement["id"] = place_new_project().id
+        with use_project_shard(placement.get("id")):
+            serializer.save(author_user=self.request.user, **placement)
+            author_contributor = Contributor(
+                user=self.request.user,
+                project_id=serializer.instance.id,
+                permission=Contributor.RESPONSIBLE,
+                role="Auteur",
+            )
+            author_contributor.save()
+
+    def perform_destroy(self, instance):
+        """
+        Hide the project, its rows are purged in background by the
+        "purge_deleted" command.
+        """
+        instance.is_deleted = True
+        instance.save(update_fields=["is_deleted"])
+
+    @action(detail=True, methods=["post"])
+    def clone(self, request, pk=None):
+        """
+        Create a copy of the project authored by the connected user, with
+        its contributors and, on demand, its issues and their comments.
+        """
+        project = self.get_object()
+        serializer = ProjectCloneSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        clone = clone_project(
+            project, request.user, **serializer.validated_data
         )
-        author_contributor.save()
-
-    def create_project_id_list_connected_user(self):
-        """Return project id list of the connected user."""
-        project_id_list = []
-        connected_user_id = self.request.user.id
-        for contributor in Contributor.objects.filter(
-            user_id=connected_user_id
-        ):
-            project_id_list.append(contributor.project_id)
 
-        return project_id_list
+        return Response(
+            ProjectSerializer(clone).data, status=status.HTTP_201_CREATED
+        )
 
+    @action(detail=True)
+    def timeline(self, request, pk=None):
+        """
+        Return the latest issue and comment events of the project, paged
+        with the "cursor" parameter of the "next" link.
+        """
+        project = self.get_object()
+        cursor = request.query_params.get("cursor")
+        if cursor is not None:
+            cursor = decode_cursor(cursor)
+        limit = self.get_limit_parameter(default=50, maximum=100)
+        events, next_cursor = get_timeline_page(project.id, cursor, limit)
+        next_url = None
+        if next_cursor is not None:
+            next_url = request.build_absolute_uri(
+                f"{request.path}?cursor={next_cursor}&limit={limit}"
+            )
+
+        return Response(
+            {
+                "next": next_url,
+                "results": TimelineEventSerializer(events, many=True).data,
+            }
+        )
 
-class ContributorViewSet(viewsets.ModelViewSet):
+    def get_limit_parameter(self, default, maximum):
+        """Return the "limit" query parameter, between 1 and the maximum."""
+        value = self.request.query_params.get("limit")
+        if value is None:
+            return default
+        try:
+            limit = int(value)
+        except ValueError:
+            raise ValidationError(
+                {"limit": "La limite doit être un nombre entier."}
+            )
+
+        return max(1, min(limit, maximum))
+
+    @action(detail=True, url_path="cycle-time")
+    def cycle_time(self, request, pk=None):
+        """
+        Return the cycle time and throughput report of the project between
+        the "since" and "until" days (the last 30 days by default).
+        """
+        project = self.get_object()
+        until = self.get_day_parameter("until", timezone.localdate())
+        since = self.get_day_parameter("since", until - timedelta(days=30))
+        report = get_cycle_time_report(project.id, since, until)
+
+        return Response(report)
+
+    def get_day_parameter(self, name, default):
+        """Return the day of the query parameter or the default day."""
+        value = self.request.query_params.get(name)
+        if value is None:
+            return default
+        try:
+            day = parse_date(value)
+        except ValueError:
+            day = None
+        if day is None:
+            raise ValidationError(
+                {name: "La date indiquée doit être au format AAAA-MM-JJ."}
+            )
+
+        return day
+
+
+class ContributorViewSet(
+    ProjectShardMixin,
+    SingleFlightMixin,
+    IdempotencyMixin,
+    viewsets.ModelViewSet,
+):
     """A viewset that provides actions for contributor object."""
 
     queryset = Contributor.objects.all()
@@ -151,13 +619,15 @@ class ContributorViewSet(viewsets.ModelViewSet):
     def get_object(self):
         """Returns the object the view is displaying."""
         queryset = self.filter_queryset(self.get_queryset())
-        kwargs = {}
         user_id = self.kwargs["pk"]
         project_id = self.kwargs["project_pk"]
-        contributor_id = check_and_get_contributor_id(project_id, user_id)
-        kwargs["pk"] = contributor_id
-
-        obj = get_object_or_404(queryset, **kwargs)
+        try:
+            obj = queryset.filter(user_id=int(user_id)).first()
+        except ValueError:
+            obj = None
+        if obj is None:
+            check_and_get_contributor_id(project_id, user_id)
+            raise Http404
 
         # May raise a permission denied
         self.check_object_permissions(self.request, obj)
@@ -167,13 +637,22 @@ class ContributorViewSet(viewsets.ModelViewSet):
     def get_queryset(self):
         """Get the list of items for this view."""
         project_id = self.kwargs["project_pk"]
-        return super().get_queryset().filter(project_id=project_id)
+        queryset = super().get_queryset().filter(project_id=project_id)
+        if get_shards():
+            # Contributors of deleted users are removed from the shards.
+            return queryset
+        return queryset.filter(user__is_deleted=False)
 
     def perform_create(self, serializer):
         """Create a model instance."""
-        project_id = int(self.kwargs["project_pk"])
-        project = Project.objects.get(id=project_id)
-        serializer.save(project=project)
+        project_id = self.kwargs["project_pk"]
+        user = serializer.validated_data["user"]
+        with explain_integrity_error(
+            lambda: check_project_exist_in_db(project_id),
+            lambda: check_user_is_not_contributor(project_id, user.id),
+            using=router.db_for_write(Contributor),
+        ):
+            serializer.save(project_id=int(project_id))
 
     def perform_update(self, serializer):
         """Update a model instance."""
@@ -182,7 +661,12 @@ class ContributorViewSet(viewsets.ModelViewSet):
         serializer.save(user=user)
 
 
-class IssueViewSet(viewsets.ModelViewSet):
+class IssueViewSet(
+    ProjectShardMixin,
+    SingleFlightMixin,
+    IdempotencyMixin,
+    viewsets.ModelViewSet,
+):
     """A viewset that provides actions for issue object."""
 
     queryset = Issue.objects.all()
@@ -201,23 +685,90 @@ class IssueViewSet(viewsets.ModelViewSet):
 
         return [permission() for permission in self.permission_classes]
 
-    def get_queryset(self):
-        """Get the list of items for this view."""
-        project_id = self.kwargs["project_pk"]
-        if self.detail is True:
+    def get_object(self):
+        """
+        Returns the object the view is displaying, looked for in the archive
+        when it isn't an active issue.
+        """
+        try:
+            return super().get_object()
+        except Http404:
+            project_id = self.kwargs["project_pk"]
             issue_id = self.kwargs["pk"]
+            archived_issue = get_archived_issue(project_id, issue_id)
+            if archived_issue is not None:
+                if self.request.method not in SAFE_METHODS:
+                    check_issue_is_not_archived(project_id, issue_id)
+                # May raise a permission denied
+                self.check_object_permissions(self.request, archived_issue)
+                return archived_issue
             check_issue_exist_in_db(issue_id)
             check_project_is_issue_attribut(project_id, issue_id)
+            raise
+
+    def get_queryset(self):
+        """
+        Get the list of items for this view, the archived issues when the
+        "archived" query parameter is true.
+        """
+        project_id = self.kwargs["project_pk"]
+        if self.detail is False and self.get_archived_parameter():
+            return ArchivedIssue.objects.filter(project_id=project_id)
         return super().get_queryset().filter(project_id=project_id)
 
+    def get_archived_parameter(self):
+        """Return the value of the "archived" query parameter."""
+        value = self.request.query_params.get("archived", "false").lower()
+        if value not in ("true", "false"):
+            raise ValidationError(
+                {"archived": "Le paramètre doit valoir true ou false."}
+            )
+
+        return value == "true"
+
     def perform_create(self, serializer):
         """Create a model instance."""
-        project_id = int(self.kwargs["project_pk"])
-        project = Project.objects.get(id=project_id)
-        serializer.save(project=project, author_user=self.request.user)
-
+        project_id = self.kwargs["project_pk"]
+        with explain_integrity_error(
+            lambda: check_project_exist_in_db(project_id),
+            lambda: self.check_assignee_user(serializer),
+            using=router.db_for_write(Issue),
+        ):
+            save_serializer(
+                serializer,
+                project_id=int(project_id),
+                author_user=self.request.user,
+            )
 
-class CommentViewSet(viewsets.ModelViewSet):
+    def perform_update(self, serializer):
+        """Update a model instance and record its status change."""
+        previous_status = serializer.instance.status
+        using = router.db_for_write(Issue, instance=serializer.instance)
+        with explain_integrity_error(
+            lambda: self.check_assignee_user(serializer)
+        ):
+            with transaction.atomic(using=using):
+                issue = serializer.save()
+                if issue.status != previous_status:
+                    record_status_change(
+                        issue, previous_status, self.request.user
+                    )
+
+    def check_assignee_user(self, serializer):
+        """Raise exception if the assignee isn't a project contributor."""
+        assignee_user = serializer.validated_data.get("assignee_user")
+        if assignee_user is not None:
+            check_and_get_contributor_id(
+                self.kwargs["project_pk"], assignee_user.id
+            )
+
+
+class CommentViewSet(
+    ProjectShardMixin,
+    SingleFlightMixin,
+    IdempotencyMixin,
+    viewsets.ModelViewSet,
+):
     """A viewset that provides actions for comment object."""
 
     queryset = Comment.objects.all()
@@ -236,23 +787,146 @@ class CommentViewSet(viewsets.ModelViewSet):
 
         return [permission() for permission in self.permission_classes]
 
-    def get_queryset(self):
-        """Get the list of items for this view."""
-        project_id = self.kwargs["project_pk"]
-        issue_id = self.kwargs["issue_pk"]
-        check_issue_exist_in_db(issue_id)
-        check_project_is_issue_attribut(project_id, issue_id)
-        if self.detail is True:
+    def get_object(self):
+        """
+        Returns the object the view is displaying, looked for in the archive
+        when it isn't a comment of an active issue.
+        """
+        try:
+            return super().get_object()
+        except Http404:
+            project_id = self.kwargs["project_pk"]
+            issue_id = self.kwargs["issue_pk"]
             comment_id = self.kwargs["pk"]
+            if self.request.method not in SAFE_METHODS:
+                check_issue_is_not_archived(project_id, issue_id)
+            elif get_archived_issue(project_id, issue_id) is not None:
+                archived_comment = get_archived_comment(issue_id, comment_id)
+                if archived_comment is None:
+                    raise NotFound(
+                        "Le numéro de commentaire indiqué n'existe pas pour "
+                        "cet issue."
+                    )
+                # May raise a permission denied
+                self.check_object_permissions(self.request, archived_comment)
+                return archived_comment
+            check_issue_in_project(project_id, issue_id)
             check_comment_exist_in_db(comment_id)
             check_issue_is_comment_attribut(issue_id, comment_id)
-        return super().get_queryset().filter(issue_id=issue_id)
+            raise
+
+    def get_queryset(self):
+        """
+        Get the list of items for this view, the archived comments when the
+        issue is archived.
+        """
+        project_id = self.kwargs["project_pk"]
+        issue_id = self.kwargs["issue_pk"]
+        if self.detail is False:
+            try:
+                check_issue_in_project(project_id, issue_id)
+            except NotFound:
+                if get_archived_issue(project_id, issue_id) is None:
+                    raise
+                return ArchivedComment.objects.filter(
+                    project_id=project_id, issue_id=issue_id
+                )
+        return (
+            super()
+            .get_queryset()
+            .filter(project_id=project_id, issue_id=issue_id)
+        )
 
     def perform_create(self, serializer):
-        """Create a model instance."""
+        """
+        Create a model instance, the database rejects it if the issue isn't
+        one of the project.
+        """
         project_id = self.kwargs["project_pk"]
-        check_project_exist_in_db(project_id)
         issue_id = self.kwargs["issue_pk"]
-        check_issue_exist_in_db(issue_id)
-        issue = Issue.objects.get(id=int(issue_id))
-        serializer.save(issue=issue, author_user=self.request.user)
+        with explain_integrity_error(
+            lambda: check_project_exist_in_db(project_id),
+            lambda: check_issue_is_not_archived(project_id, issue_id),
+            lambda: check_issue_in_project(project_id, issue_id),
+            using=router.db_for_write(Comment),
+        ):
+            save_serializer(
+                serializer,
+                issue_id=int(issue_id),
+                project_id=int(project_id),
+                author_user=self.request.user,
+            )
+
+
+class BatchView(APIView):
+    """
+    View running a batch of read requests of the "projects" application in
+    one round trip.
+
+    The connected user is authenticated and throttled once, the sub-requests
+    share its project memberships and run in one read transaction.
+    """
+
+    batched_views = {}
+
+    def post(self, request):
+        serializer = BatchSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        responses = []
+        with transaction.atomic():
+            for sub_request in serializer.validated_data["requests"]:
+                responses.append(
+                    self.run_sub_request(request, sub_request["path"])
+                )
+
+        return Response({"responses": responses})
+
+    def run_sub_request(self, request, path):
+        """Return the status and data of the response to the sub-request."""
+        url = urlsplit(path)
+        try:
+            match = resolve(url.path)
+        except Resolver404:
+            match = None
+        if match is None or getattr(match.func, "cls", BatchView) is BatchView:
+            return {
+                "path": path,
+                "status": status.HTTP_404_NOT_FOUND,
+                "data": {"detail": "Le chemin indiqué n'existe pas."},
+            }
+
+        sub_request = HttpRequest()
+        sub_request.method = "GET"
+        sub_request.path = sub_request.path_info = url.path
+        sub_request.META = {
+            **request.META,
+            "REQUEST_METHOD": "GET",
+            "PATH_INFO": url.path,
+            "QUERY_STRING": url.query,
+        }
+        sub_request.GET = QueryDict(url.query)
+        sub_request.resolver_match = match
+        sub_request._force_auth_user = request.user
+        sub_request._force_auth_token = request.auth
+        sub_request.membership_cache = get_membership_cache(request)
+
+        view = self.get_batched_view(match.func)
+        response = view(sub_request, *match.args, **match.kwargs)
+
+        return {
+            "path": path,
+            "status": response.status_code,
+            "data": getattr(response, "data", None),
+        }
+
+    def get_batched_view(self, view):
+        """Return the view function without throttling of the view."""
+        if view not in self.batched_views:
+            initkwargs = {**view.initkwargs, "throttle_classes": []}
+            if getattr(view, "actions", None):
+                batched_view = view.cls.as_view(view.actions, **initkwargs)
+            else:
+                batched_view = view.cls.as_view(**initkwargs)
+            self.batched_views[view] = batched_view
+
+        return self.batched_views[view]
@@ -3,6 +3,9 @@ ASGI config for softdesk project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+The live event stream of the "projects" application is served in front of
+the Django application, see ``projects.events``.
+
 For more information on this file, see
 https://docs.djangoproject.com/en/4.0/howto/deployment/asgi/
 """
@@ -13,4 +16,9 @@ from django.core.asgi import get_asgi_application
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "softdesk.settings")
 
-application = get_asgi_application()
+django_application = get_asgi_application()
+
+# Imported once Django is set up by get_asgi_application().
+from projects.events import EventStreamApplication  # noqa: E402
+
+application = EventStreamApplication(django_application)
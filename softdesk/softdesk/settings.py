@@ -46,6 +46,10 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "projects.capture.TrafficCaptureMiddleware",
+    "projects.admission.AdmissionControlMiddleware",
+    "projects.profiling.ProfilingMiddleware",
+    "projects.compression.CompressionMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -139,7 +143,7 @@ REST_FRAMEWORK = {
         "rest_framework.permissions.IsAuthenticated",
     ],
     "DEFAULT_AUTHENTICATION_CLASSES": [
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "projects.authentication.RevocableJWTAuthentication",
     ],
     "DEFAULT_THROTTLE_CLASSES": [
         "rest_framework.throttling.AnonRateThrottle",
@@ -151,4 +155,117 @@ REST_FRAMEWORK = {
 SIMPLE_JWT = {
     "ACCESS_TOKEN_LIFETIME": timedelta(minutes=30),
     "REFRESH_TOKEN_LIFETIME": timedelta(days=1),
+    "TOKEN_REFRESH_SERIALIZER": (
+        "projects.serializers.RevocableTokenRefreshSerializer"
+    ),
+}
+
+# Settings of the features of the "projects" application. Their defaults
+# are the DEFAULTS of projects/conf.py, only the changed keys are set here.
+
+# Live event stream served by the ASGI application (see projects/events.py)
+# at PATH. Slow consumers are disconnected once QUEUE_SIZE events are
+# pending, idle streams get a comment every KEEPALIVE seconds.
+
+EVENT_STREAM = {}
+
+# Group commit of issue and comment creations (see projects/coalescer.py).
+# When ENABLED, creations arriving within WINDOW seconds are saved in one
+# transaction of at most MAX_BATCH rows. A creation not started within
+# TIMEOUT seconds is dropped and answered 503.
+
+WRITE_COALESCING = {}
+
+# Single-flight reads of issues, comments and contributors (see
+# projects/singleflight.py). When ENABLED, identical concurrent requests of
+# callers with the same role share one computation and its response.
+
+SINGLE_FLIGHT = {}
+
+# Horizontal sharding of the projects (see projects/sharding.py). List the
+# aliases of the shard databases in SHARDS, "default" first when existing
+# projects are kept on it, and migrate each of them with --database. Once
+# enabled, migrating the default database places the existing projects.
+
+SHARDING = {}
+
+DATABASE_ROUTERS = ["projects.sharding.ProjectShardRouter"]
+
+# Admission control of the requests (see projects/admission.py). Requests
+# take the class of the first matching ROUTES pattern, other ones are reads
+# or writes by method.
+# Each of the CLASSES runs at most LIMIT requests at once, keep the sum of
+# the limits under the number of workers. A request waits at most TIMEOUT
+# seconds for a slot and is answered 503 at once when QUEUE requests
+# already wait.
+
+ADMISSION_CONTROL = {}
+
+# Capture of the shape of the API requests (see projects/capture.py), to be
+# replayed with the "replay_traffic" command. When ENABLED, SAMPLE_RATE of
+# the requests are written to PATH. Only the QUERY_PARAMS and BODY_FIELDS
+# keep their values.
+
+TRAFFIC_CAPTURE = {
+    "PATH": BASE_DIR / "traffic.jsonl",
+}
+
+# Profiling of the requests (see projects/profiling.py). Once ENABLED, a
+# request is profiled when a superuser sends the HEADER set to the SECRET,
+# ignored while None, or at SAMPLE_RATE. The last MAX_PROFILES pstats files
+# are saved by route in PATH and listed at /profiles/.
+
+PROFILING = {
+    "PATH": BASE_DIR / "profiles",
+}
+
+# Revocation of the JSON web tokens (see projects/revocation.py). Each
+# worker checks the tokens against a Bloom filter sized for CAPACITY
+# revocations at ERROR_RATE, fed with the new revocations every
+# SYNC_INTERVAL seconds and rebuilt every REBUILD_INTERVAL seconds.
+
+TOKEN_REVOCATION = {}
+
+# Bulk provisioning of users (see projects/provisioning.py), used by
+# /signup/bulk/ and the "provision_users" command. The command hashes the
+# passwords in WORKERS processes, one per core when None, /signup/bulk/ in
+# the REQUEST_WORKERS threads shared by the requests of the process and
+# refuses files of more than MAX_REQUEST_ROWS rows. The users are inserted
+# by batches of BATCH_SIZE.
+
+USER_PROVISIONING = {}
+
+# Archive of the finished issues (see projects/archive.py). The
+# "archive_issues" command moves the issues finished and without activity
+# for AGE_DAYS days, with their comments, to the archive tables by batches
+# of BATCH_SIZE issues.
+
+ISSUE_ARCHIVE = {}
+
+# Compression of the responses (see projects/compression.py). When ENABLED,
+# the responses of CONTENT_TYPES of at least MIN_SIZE bytes are compressed
+# with brotli at BROTLI_QUALITY, when the "brotli" package is installed, or
+# gzip at GZIP_LEVEL. The compressed bytes of the last CACHE_SIZE contents
+# are cached.
+
+RESPONSE_COMPRESSION = {}
+
+# Idempotency keys of the create requests (see projects/idempotency.py).
+# The responses are stored for TIMEOUT seconds in the CACHE, bounded by its
+# MAX_ENTRIES. Use a shared cache (Redis, Memcached) with several workers.
+
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    },
+    "idempotency": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "idempotency",
+        "TIMEOUT": 86400,
+        "OPTIONS": {"MAX_ENTRIES": 10000},
+    },
+}
+
+IDEMPOTENCY = {
+    "CACHE": "idempotency",
 }
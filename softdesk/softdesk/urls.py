@@ -17,7 +17,16 @@ from django.contrib import admin
 from django.urls import path, include
 from rest_framework_simplejwt import views as jwt_views
 from rest_framework.routers import SimpleRouter
-from projects.views import SignUp, UserViewSet, MyInfo
+from projects.views import (
+    SignUp,
+    BulkSignUp,
+    UserViewSet,
+    MyInfo,
+    TokenRevoke,
+    AdmissionMetrics,
+    ProfileList,
+    ProfileDownload,
+)
 
 router = SimpleRouter()
 router.register(r"accounts", UserViewSet, basename="user")
@@ -37,6 +46,11 @@ urlpatterns += [
         jwt_views.TokenRefreshView.as_view(),
         name="token_refresh",
     ),
+    path("login/revoke/", TokenRevoke.as_view(), name="token_revoke"),
     path("signup/", SignUp.as_view()),
+    path("signup/bulk/", BulkSignUp.as_view()),
     path("myinfo/", MyInfo.as_view()),
+    path("admission/", AdmissionMetrics.as_view()),
+    path("profiles/", ProfileList.as_view()),
+    path("profiles/<str:route>/<str:name>/", ProfileDownload.as_view()),
 ]